@@ -15,6 +15,9 @@ from ..models.staff import Staff, StaffPerformance
 from ..models.menu import MenuItem
 from ..utils.predictions import DemandPredictor
 from ..utils.optimization import BusinessOptimizer
+from ..services.inventory import InventoryService
+from ..services.waste import WasteAnalyticsService
+from ..services.labor_analytics import LaborAnalyticsService
 
 
 router = APIRouter()
@@ -122,17 +125,56 @@ def get_inventory_optimization(
     current_user: User = Depends(get_current_active_user_or_owner)
 ) -> Any:
     """
-    Optimize inventory levels based on demand patterns
+    Optimize inventory levels based on usage statistics and supplier lead times
     """
-    # This would require integration with inventory models
-    # For now, return a placeholder structure
+    return InventoryService.get_inventory_optimization(db)
+
+
+@router.get("/waste")
+def get_waste_analytics(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Waste by item, category, reason and weekday with cost impact
+    (served from the daily waste summary, rolled up in the background)
+    """
+    if not start_date:
+        start_date = date.today() - timedelta(days=30)
     
-    return {
-        "recommended_stock_levels": [],
-        "reorder_points": [],
-        "seasonal_adjustments": [],
-        "cost_saving_opportunities": []
-    }
+    if not end_date:
+        end_date = date.today()
+    
+    return WasteAnalyticsService.get_waste_analytics(db, start_date, end_date)
+
+
+@router.get("/labor")
+def get_labor_analytics(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    basis: str = Query(default="auto", pattern="^(auto|scheduled|worked)$", description="auto, scheduled, worked"),
+    include_hourly: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Sales per labor hour and labor cost percentage by hour, day and position
+    """
+    if not start_date:
+        start_date = date.today() - timedelta(days=30)
+    
+    if not end_date:
+        end_date = date.today()
+    
+    if end_date < start_date or (end_date - start_date).days > 366:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Date range must be between 0 and 366 days"
+        )
+    
+    return LaborAnalyticsService.get_labor_metrics(db, start_date, end_date, basis, include_hourly)
 
 
 @router.get("/optimization/staff")
@@ -196,7 +238,7 @@ def get_staff_optimization(
             "daily": daily_demand
         },
         "optimization_recommendations": optimization,
-        "cost_impact": _calculate_staff_cost_impact(optimization)
+        "cost_impact": _calculate_staff_cost_impact(db, start_date, end_date)
     }
 
 
@@ -375,14 +417,9 @@ def _analyze_economic_cycles(orders: List[Order]) -> Dict:
     }
 
 
-def _calculate_staff_cost_impact(optimization: Dict) -> Dict:
+def _calculate_staff_cost_impact(db: Session, start_date: date, end_date: date) -> Dict:
     """Calculate cost impact of staff optimization"""
-    return {
-        "current_labor_cost": 0,
-        "optimized_labor_cost": 0,
-        "potential_savings": 0,
-        "efficiency_gain": 0
-    }
+    return LaborAnalyticsService.get_staff_cost_impact(db, start_date, end_date)
 
 
 def _generate_business_insights(predictions: Dict) -> List[str]:
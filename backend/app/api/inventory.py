@@ -0,0 +1,180 @@
+from typing import Any, List, Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from ..core.database import get_db
+from ..core.auth import get_current_active_user_or_owner, get_current_active_owner
+from ..models.users import User
+from ..models.inventory import InventoryItem, InventoryBatch
+from ..schemas.menu import RecipeIngredient
+from ..schemas.inventory import (
+    StockConsumptionCreate, StockConsumptionResult,
+    InventoryBatchCreate, InventoryBatch as InventoryBatchSchema, ExpiringBatch
+)
+from ..services.inventory import InventoryService
+from ..services.prep import PrepListService
+
+
+router = APIRouter()
+
+
+def _get_inventory_item_or_404(db: Session, item_id: int) -> InventoryItem:
+    item = db.query(InventoryItem).filter(InventoryItem.id == item_id).first()
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory item not found"
+        )
+    return item
+
+
+# Batches
+@router.post("/batches/", response_model=InventoryBatchSchema)
+def receive_inventory_batch(
+    batch_data: InventoryBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Receive a batch into stock outside of a purchase order
+    """
+    _get_inventory_item_or_404(db, batch_data.inventory_item_id)
+
+    batch = InventoryService.receive_batch(
+        db,
+        item_id=batch_data.inventory_item_id,
+        quantity=batch_data.quantity,
+        user_id=current_user.id,
+        batch_number=batch_data.batch_number,
+        expiry_date=batch_data.expiry_date,
+        unit_cost=batch_data.unit_cost,
+        notes=batch_data.notes
+    )
+    db.commit()
+    db.refresh(batch)
+    return batch
+
+
+@router.get("/batches/expiring", response_model=List[ExpiringBatch])
+def read_expiring_batches(
+    hours: int = Query(default=48, ge=1, le=24 * 30, description="Look-ahead window in hours"),
+    limit: int = Query(default=200, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Batches with stock left that expire within the next `hours`
+    """
+    return InventoryService.get_expiring_batches(db, hours, limit)
+
+
+@router.get("/items/{item_id}/batches", response_model=List[InventoryBatchSchema])
+def read_item_batches(
+    item_id: int,
+    include_depleted: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Batches of an inventory item in FEFO order
+    """
+    query = db.query(InventoryBatch).filter(InventoryBatch.inventory_item_id == item_id)
+
+    if not include_depleted:
+        query = query.filter(InventoryBatch.quantity_remaining > 0)
+
+    return query.order_by(
+        InventoryBatch.expiry_date.is_(None),
+        InventoryBatch.expiry_date,
+        InventoryBatch.received_at
+    ).all()
+
+
+# Stock movements
+@router.post("/movements/consume", response_model=StockConsumptionResult)
+def consume_stock(
+    consumption: StockConsumptionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Record usage, waste or a negative adjustment, depleting batches
+    first-expired-first-out
+    """
+    _get_inventory_item_or_404(db, consumption.inventory_item_id)
+
+    result = InventoryService.consume_fefo(
+        db,
+        item_id=consumption.inventory_item_id,
+        quantity=consumption.quantity,
+        user_id=current_user.id,
+        movement_type=consumption.movement_type.value,
+        reference_type=consumption.reference_type,
+        reference_id=consumption.reference_id,
+        notes=consumption.notes,
+        reason=consumption.reason
+    )
+    db.commit()
+    return result
+
+
+@router.put("/items/{item_id}/recipe")
+def update_inventory_item_recipe(
+    item_id: int,
+    recipe: List[RecipeIngredient],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Set the sub-recipe of a prepared item (dough balls, sliced toppings).
+    An empty list turns it back into a raw ingredient.
+    """
+    item = _get_inventory_item_or_404(db, item_id)
+
+    ingredient_ids = {ingredient.ingredient_id for ingredient in recipe}
+    if item_id in ingredient_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="An item cannot be an ingredient of itself"
+        )
+
+    found = db.query(InventoryItem.id).filter(InventoryItem.id.in_(ingredient_ids)).count() if ingredient_ids else 0
+    if found != len(ingredient_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ingredient not found"
+        )
+
+    item.recipe = [
+        {"ingredient_id": ingredient.ingredient_id, "quantity": float(ingredient.quantity), "unit": ingredient.unit}
+        for ingredient in recipe
+    ] or None
+    db.commit()
+    PrepListService.invalidate()
+    return {"item_id": item.id, "recipe": item.recipe}
+
+
+@router.get("/prep-list")
+def get_prep_list(
+    service_date: Optional[date] = Query(default=None, description="Defaults to the next service"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Get the kitchen prep list for the next service (precomputed on a schedule)
+    """
+    return PrepListService.get_prep_list(db, service_date)
+
+
+@router.get("/prep-list/print", response_class=PlainTextResponse)
+def print_prep_list(
+    service_date: Optional[date] = Query(default=None, description="Defaults to the next service"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Printable / kitchen display version of the prep list
+    """
+    return PrepListService.render_text(PrepListService.get_prep_list(db, service_date))
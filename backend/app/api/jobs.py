@@ -0,0 +1,119 @@
+from typing import Any, List, Optional
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import desc, func, case
+
+from ..core.database import get_db
+from ..core.auth import get_current_active_owner
+from ..core.scheduler import scheduler
+from ..models.users import User
+from ..models.jobs import JobRun, JobLease
+
+
+router = APIRouter()
+
+
+@router.get("/")
+def read_jobs(
+    days: int = Query(default=7, ge=1, le=90, description="Window for run statistics"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Background jobs with this worker's timing metrics, run statistics across
+    all workers and current leases
+    """
+    since = datetime.now() - timedelta(days=days)
+    stats = {
+        row.job_name: row
+        for row in db.query(
+            JobRun.job_name,
+            func.count(JobRun.id).label("runs"),
+            func.sum(case((JobRun.status == "failed", 1), else_=0)).label("failures"),
+            func.avg(JobRun.duration_ms).label("average_duration_ms"),
+            func.max(JobRun.duration_ms).label("max_duration_ms"),
+            func.max(JobRun.started_at).label("last_started_at")
+        ).filter(JobRun.started_at >= since).group_by(JobRun.job_name).all()
+    }
+    leases = {lease.job_name: lease for lease in db.query(JobLease).all()}
+
+    jobs = []
+    for metrics in scheduler.get_metrics():
+        row = stats.get(metrics["name"])
+        lease = leases.get(metrics["name"])
+        jobs.append({
+            **metrics,
+            "history": {
+                "runs": row.runs,
+                "failures": int(row.failures or 0),
+                "average_duration_ms": round(float(row.average_duration_ms), 1),
+                "max_duration_ms": row.max_duration_ms,
+                "last_started_at": row.last_started_at
+            } if row else None,
+            "lease": {
+                "owner": lease.owner,
+                "expires_at": lease.expires_at
+            } if lease else None
+        })
+
+    return {
+        "worker": scheduler.worker_id,
+        "period_days": days,
+        "jobs": jobs
+    }
+
+
+@router.get("/runs", response_model=List[dict])
+def read_job_runs(
+    job_name: Optional[str] = None,
+    status: Optional[str] = Query(default=None, description="success, failed"),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Job run history, most recent first
+    """
+    query = db.query(JobRun)
+
+    if job_name:
+        query = query.filter(JobRun.job_name == job_name)
+
+    if status:
+        query = query.filter(JobRun.status == status)
+
+    runs = query.order_by(desc(JobRun.started_at)).limit(limit).all()
+    return [
+        {
+            "id": run.id,
+            "job_name": run.job_name,
+            "worker": run.worker,
+            "status": run.status,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+            "duration_ms": run.duration_ms,
+            "result": run.result,
+            "error": run.error
+        }
+        for run in runs
+    ]
+
+
+@router.post("/{job_name}/run")
+async def run_job_now(
+    job_name: str,
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Run a background job immediately on this worker
+    """
+    job = scheduler.get_job(job_name)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    await scheduler.run_job(job)
+    return job.metrics()
@@ -6,6 +6,8 @@ from ..core.database import get_db
 from ..core.auth import get_current_active_user_or_owner, get_current_active_owner
 from ..models.users import User
 from ..models.menu import MenuCategory, MenuItem, MenuItemVariation
+from ..services.recipes import RecipeService
+from ..services.prep import PrepListService
 from ..schemas.menu import (
     MenuCategoryCreate, MenuCategoryUpdate, MenuCategory as MenuCategorySchema,
     MenuItemCreate, MenuItemUpdate, MenuItem as MenuItemSchema,
@@ -128,6 +130,7 @@ def create_menu_item(
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    RecipeService.invalidate()
     return db_item
 
 
@@ -201,6 +204,8 @@ def update_menu_item(
     
     db.commit()
     db.refresh(item)
+    RecipeService.invalidate()
+    PrepListService.invalidate()
     return item
 
 
@@ -1,19 +1,27 @@
 from typing import Any, List, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func, desc
 
-from ..core.database import get_db
-from ..core.auth import get_current_active_user_or_owner
+from ..core.config import settings
+from ..core.database import get_db, SessionLocal
+from ..core.auth import get_current_active_user_or_owner, authenticate_token
+from ..core.events import order_events
 from ..models.users import User
 from ..models.orders import Order, OrderItem
 from ..models.menu import MenuItem
 from ..schemas.orders import (
     OrderCreate, Order as OrderSchema, OrderUpdate, OrderSummary,
+    OrderStatusUpdate, OrderStatusBatch, OrderStatusChange,
     SalesReport, DailySalesReport, WeeklySalesReport, MonthlySalesReport
 )
-from ..services.orders import OrderService
+from ..services.orders import OrderService, OrderTransitionError, PlatformPausedError
+from ..services.kitchen import KitchenService
 
 
 router = APIRouter()
@@ -26,9 +34,21 @@ def create_order(
     current_user: User = Depends(get_current_active_user_or_owner)
 ) -> Any:
     """
-    Create a new order
+    Create a new order; resending an order with the same platform and
+    platform_order_id returns the existing one
     """
-    return OrderService.create_order(db, order_data, current_user.id)
+    try:
+        return OrderService.create_order(db, order_data, current_user.id)
+    except PlatformPausedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.get("/", response_model=List[OrderSummary])
@@ -75,6 +95,80 @@ def read_orders(
     ]
 
 
+def _authenticate(token: Optional[str]) -> Optional[User]:
+    # Blocking database lookup: call it through run_in_threadpool from async handlers
+    db = SessionLocal()
+    try:
+        return authenticate_token(db, token)
+    finally:
+        db.close()
+
+
+@router.websocket("/events/ws")
+async def order_events_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    platform: Optional[List[str]] = Query(default=None),
+    status_filter: Optional[List[str]] = Query(default=None, alias="status")
+):
+    """
+    Push order.created and order.status_changed events, optionally only for
+    some platforms / statuses (?platform=uber_eats&status=pending).
+    Authenticate with ?token=<access token>.
+    """
+    if await run_in_threadpool(_authenticate, token) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscription = order_events.subscribe(platform, status_filter)
+    try:
+        while True:
+            event = await subscription.get(settings.EVENT_HEARTBEAT_SECONDS)
+            await websocket.send_json(event if event is not None else {"type": "heartbeat"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        order_events.unsubscribe(subscription)
+
+
+@router.get("/events/stream")
+async def order_events_stream(
+    request: Request,
+    token: Optional[str] = None,
+    platform: Optional[List[str]] = Query(default=None),
+    status_filter: Optional[List[str]] = Query(default=None, alias="status")
+) -> Any:
+    """
+    Server-sent events version of /events/ws for clients that only need to
+    listen (EventSource). Authenticate with ?token=<access token>.
+    """
+    if await run_in_threadpool(_authenticate, token) is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    
+    subscription = order_events.subscribe(platform, status_filter)
+    
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                event = await subscription.get(settings.EVENT_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            order_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{order_id}", response_model=OrderSchema)
 def read_order(
     order_id: int,
@@ -111,14 +205,127 @@ def update_order(
         )
     
     update_data = order_update.dict(exclude_unset=True)
+    new_status = update_data.pop("status", None)
+    change = None
+    if new_status is not None and new_status.value != order.status:
+        change = _transition_or_raise(db, order_id, new_status.value, order.status)
+        db.expire(order)
+    
     for field, value in update_data.items():
         setattr(order, field, value)
     
     db.commit()
+    if change:
+        OrderService.publish_status_changes([change])
     db.refresh(order)
     return order
 
 
+def _transition_or_raise(db: Session, order_id: int, new_status: str, expected_status: Optional[str]) -> dict:
+    try:
+        return OrderService.transition_status(db, order_id, new_status, expected_status)
+    except OrderTransitionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=jsonable_encoder({"message": str(e), "current_status": e.current_status})
+        )
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.patch("/{order_id}/status", response_model=OrderStatusChange)
+def update_order_status(
+    order_id: int,
+    status_update: OrderStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Move an order along pending -> preparing -> ready -> delivered (or to
+    cancelled) atomically; 409 if another device changed it first or the
+    transition is not allowed
+    """
+    change = _transition_or_raise(
+        db,
+        order_id,
+        status_update.status.value,
+        status_update.expected_status.value if status_update.expected_status else None
+    )
+    db.commit()
+    OrderService.publish_status_changes([change])
+    return change
+
+
+@router.post("/status/batch")
+def update_order_status_batch(
+    batch: OrderStatusBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Apply several kitchen status changes at once; each order is reported as
+    updated, conflict or not_found
+    """
+    transitions = [
+        {
+            "order_id": item.order_id,
+            "status": item.status.value,
+            "expected_status": item.expected_status.value if item.expected_status else None
+        }
+        for item in batch.transitions
+    ]
+    try:
+        results = OrderService.transition_many(db, transitions)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    db.commit()
+    OrderService.publish_status_changes([r for r in results if r["result"] == "updated"])
+    return {
+        "updated": sum(1 for r in results if r["result"] == "updated"),
+        "conflicts": sum(1 for r in results if r["result"] == "conflict"),
+        "not_found": sum(1 for r in results if r["result"] == "not_found"),
+        "results": results
+    }
+
+
+@router.get("/kitchen/queue")
+def get_kitchen_queue(
+    limit: int = Query(default=20, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Kitchen load (pending / preparing orders, backlog, ETA correction) and
+    the next pending orders by quoted ready time
+    """
+    return KitchenService.get_queue(limit)
+
+
+@router.get("/kitchen/eta-accuracy")
+def get_kitchen_eta_accuracy(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Quoted vs actual ready times (default: last 7 days)
+    """
+    end = end_date.date() if end_date else datetime.now().date()
+    start = start_date.date() if start_date else end - timedelta(days=6)
+    return KitchenService.get_eta_accuracy(db, start, end)
+
+
 @router.get("/reports/daily", response_model=DailySalesReport)
 def get_daily_sales_report(
     date: Optional[datetime] = Query(default=None, description="Date for the report (defaults to today)"),
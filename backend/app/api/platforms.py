@@ -1,15 +1,24 @@
 from typing import Any, List, Optional, Dict
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import json
+import time
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Header
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, and_, func
+from sqlalchemy.exc import SQLAlchemyError
 from decimal import Decimal
 
 from ..core.database import get_db
-from ..core.auth import get_current_active_user_or_owner
+from ..core.auth import get_current_active_user_or_owner, get_current_active_owner
 from ..models.users import User
 from ..models.orders import Order
 from ..core.config import settings
+from ..schemas.orders import Platform
+from ..schemas.platforms import LoadSimulationRequest
+from ..services.kitchen import KitchenService
+from ..services.platform_ingestion import order_ingestion, verify_signature
+from ..utils.platform_adapters import ADAPTERS
 
 
 router = APIRouter()
@@ -316,6 +325,136 @@ def get_integration_status(
     }
 
 
+@router.get("/load")
+def get_kitchen_load(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Current intake level (normal / busy / overloaded), order arrivals in the
+    sliding window, quote extension and paused platforms (shared by all
+    workers)
+    """
+    return KitchenService.get_load(db)
+
+
+@router.post("/load/simulate")
+def simulate_kitchen_load(
+    simulation: LoadSimulationRequest,
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Simulate an arrival pattern (e.g. a Friday night rush) against the
+    current throttling settings without touching live state
+    """
+    return KitchenService.simulate_load(
+        {platform.value: rate for platform, rate in simulation.arrivals_per_hour.items()},
+        simulation.minutes,
+        simulation.items_per_order,
+        simulation.prep_minutes,
+        simulation.seed
+    )
+
+
+@router.post("/webhooks/{platform}", status_code=status.HTTP_202_ACCEPTED)
+async def receive_platform_order(
+    platform: str,
+    request: Request,
+    x_webhook_signature: Optional[str] = Header(default=None)
+) -> Any:
+    """
+    Order webhook for uber_eats, pedidos_ya and bis, signed with
+    X-Webhook-Signature (HMAC-SHA256 of the body). Orders are acknowledged
+    once stored in the webhook inbox and committed in batches; retries of
+    the same platform order are ignored. New orders from a paused platform
+    are refused with 409.
+    """
+    received_at = time.perf_counter()
+    if platform not in ADAPTERS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No webhook for platform {platform}"
+        )
+    
+    body = await request.body()
+    if not verify_signature(platform, body, x_webhook_signature):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook signature"
+        )
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    platform_order_id = ADAPTERS[platform][0](payload) if isinstance(payload, dict) else None
+    if not platform_order_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Payload must be a JSON order with an id"
+        )
+    
+    if KitchenService.is_paused(platform) and not await run_in_threadpool(
+        order_ingestion.is_known, platform, platform_order_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": f"{platform} is paused and not accepting orders", "accepting_orders": False}
+        )
+    
+    try:
+        await order_ingestion.accept(platform, platform_order_id, payload, received_at)
+    except SQLAlchemyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Order intake is unavailable, retry later",
+            headers={"Retry-After": "5"}
+        )
+    
+    order_ingestion.record_ack(received_at)
+    return {
+        "accepted": True,
+        "platform": platform,
+        "platform_order_id": platform_order_id,
+        "accepting_orders": not KitchenService.is_paused(platform)
+    }
+
+
+@router.get("/webhooks/stats")
+def get_webhook_stats(
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Ingestion counters, batch sizes, p50/p99 acknowledgement time and
+    commit lag, and the latest rejected orders
+    """
+    return order_ingestion.stats()
+
+
+@router.post("/{platform}/pause")
+def pause_platform(
+    platform: Platform,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Stop taking orders from a platform until resumed by hand
+    """
+    return KitchenService.set_platform_paused(db, platform.value, True)
+
+
+@router.post("/{platform}/resume")
+def resume_platform(
+    platform: Platform,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Resume a paused platform (manual or automatic pause)
+    """
+    return KitchenService.set_platform_paused(db, platform.value, False)
+
+
 # Helper functions
 def _generate_platform_recommendations(platform_stats: Dict) -> List[str]:
     """Generate recommendations based on platform performance"""
@@ -9,11 +9,17 @@ from ..core.auth import get_current_active_user_or_owner, get_current_active_own
 from ..models.users import User
 from ..models.purchases import PurchaseOrder, PurchaseOrderItem, PurchaseSchedule
 from ..models.inventory import Supplier
+from ..services.inventory import InventoryService
+from ..services.purchases import PurchaseService
+from ..services.purchase_schedules import PurchaseScheduleService
+from ..services.purchase_analytics import PurchaseAnalyticsService
+from ..services.supplier_prices import SupplierPriceService
 from ..schemas.purchases import (
-    PurchaseOrderCreate, PurchaseOrder as PurchaseOrderSchema, 
+    PurchaseOrderCreate, PurchaseOrderBulkCreate, PurchaseOrder as PurchaseOrderSchema, 
     PurchaseOrderUpdate, PurchaseOrderSummary,
+    PurchaseOrderReceive, PurchaseOrderReceiveResult,
     PurchaseScheduleCreate, PurchaseSchedule as PurchaseScheduleSchema,
-    SupplierCreate, Supplier as SupplierSchema,
+    SupplierCreate, Supplier as SupplierSchema, SupplierBasketRequest,
     PurchaseAnalytics
 )
 
@@ -58,6 +64,51 @@ def read_suppliers(
     return suppliers
 
 
+@router.get("/suppliers/price-index", response_model=List[dict])
+def read_supplier_price_index(
+    item_id: Optional[int] = None,
+    supplier_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Latest, average and volatility of each supplier's price per inventory item
+    """
+    return SupplierPriceService.get_price_index(db, item_id, supplier_id)
+
+
+@router.post("/suppliers/price-index/rebuild")
+def rebuild_supplier_price_index(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Rebuild the supplier price index from received purchase orders
+    """
+    pairs = SupplierPriceService.rebuild(db)
+    db.commit()
+    return {"indexed_pairs": pairs}
+
+
+@router.post("/suppliers/recommend")
+def recommend_suppliers(
+    basket: SupplierBasketRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Cheapest supplier combination for a basket of items, including shipping
+    and lead time
+    """
+    return SupplierPriceService.recommend_basket(
+        db,
+        [item.dict() for item in basket.items],
+        max_lead_time_days=basket.max_lead_time_days,
+        lead_time_cost_per_day=float(basket.lead_time_cost_per_day),
+        price_basis=basket.price_basis.value
+    )
+
+
 # Purchase Orders
 @router.post("/", response_model=PurchaseOrderSchema)
 def create_purchase_order(
@@ -68,62 +119,32 @@ def create_purchase_order(
     """
     Create a new purchase order
     """
-    # Verify supplier exists
-    supplier = db.query(Supplier).filter(Supplier.id == order_data.supplier_id).first()
-    if not supplier:
+    try:
+        return PurchaseService.create_purchase_order(db, order_data, current_user.id)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Supplier not found"
+            detail=str(e)
         )
-    
-    # Generate purchase number
-    purchase_count = db.query(PurchaseOrder).count()
-    purchase_number = f"PO{datetime.now().strftime('%Y%m%d')}{purchase_count + 1:04d}"
-    
-    # Calculate totals
-    subtotal = sum(item.quantity_ordered * item.unit_cost for item in order_data.items)
-    tax_amount = subtotal * 0.12  # 12% IVA in Ecuador
-    total_cost = subtotal + tax_amount + order_data.shipping_cost
-    
-    # Create purchase order
-    db_order = PurchaseOrder(
-        purchase_number=purchase_number,
-        supplier_id=order_data.supplier_id,
-        priority=order_data.priority,
-        subtotal=subtotal,
-        tax_amount=tax_amount,
-        shipping_cost=order_data.shipping_cost,
-        total_cost=total_cost,
-        expected_delivery_date=order_data.expected_delivery_date,
-        notes=order_data.notes,
-        payment_terms=order_data.payment_terms,
-        created_by=current_user.id
-    )
-    
-    db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
-    
-    # Create order items
-    for item_data in order_data.items:
-        total_item_cost = item_data.quantity_ordered * item_data.unit_cost
-        
-        db_item = PurchaseOrderItem(
-            purchase_order_id=db_order.id,
-            inventory_item_id=item_data.inventory_item_id,
-            quantity_ordered=item_data.quantity_ordered,
-            unit=item_data.unit,
-            unit_cost=item_data.unit_cost,
-            total_cost=total_item_cost,
-            batch_number=item_data.batch_number,
-            expiry_date=item_data.expiry_date,
-            notes=item_data.notes
+
+
+@router.post("/bulk", response_model=List[PurchaseOrderSchema])
+def create_purchase_orders_bulk(
+    bulk_data: PurchaseOrderBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Create several purchase orders at once (e.g. the weekly restock, one
+    order per supplier). Either all orders are created or none.
+    """
+    try:
+        return PurchaseService.create_purchase_orders(db, bulk_data.orders, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-        db.add(db_item)
-    
-    db.commit()
-    db.refresh(db_order)
-    return db_order
 
 
 @router.get("/", response_model=List[PurchaseOrderSummary])
@@ -140,7 +161,16 @@ def read_purchase_orders(
     """
     Retrieve purchase orders with filters
     """
-    query = db.query(PurchaseOrder).join(Supplier)
+    # Project only the summary columns; the supplier name comes from the join
+    query = db.query(
+        PurchaseOrder.id,
+        PurchaseOrder.purchase_number,
+        Supplier.name.label("supplier_name"),
+        PurchaseOrder.status,
+        PurchaseOrder.total_cost,
+        PurchaseOrder.order_date,
+        PurchaseOrder.expected_delivery_date
+    ).join(Supplier, Supplier.id == PurchaseOrder.supplier_id)
     
     if status:
         query = query.filter(PurchaseOrder.status == status)
@@ -160,7 +190,7 @@ def read_purchase_orders(
         PurchaseOrderSummary(
             id=order.id,
             purchase_number=order.purchase_number,
-            supplier_name=order.supplier.name,
+            supplier_name=order.supplier_name,
             status=order.status,
             total_cost=order.total_cost,
             order_date=order.order_date,
@@ -179,7 +209,7 @@ def read_purchase_order(
     """
     Get purchase order by ID
     """
-    order = db.query(PurchaseOrder).filter(PurchaseOrder.id == order_id).first()
+    order = PurchaseService.get_purchase_order(db, order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -210,8 +240,46 @@ def update_purchase_order(
         setattr(order, field, value)
     
     db.commit()
-    db.refresh(order)
-    return order
+    return PurchaseService.get_purchase_order(db, order_id)
+
+
+@router.post("/{order_id}/receive", response_model=PurchaseOrderReceiveResult)
+def receive_purchase_order(
+    order_id: int,
+    receive_data: PurchaseOrderReceive,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Receive a delivery: record received quantities, quality and batches per
+    line, put the stock in and update ingredient and menu costs
+    """
+    order = db.query(PurchaseOrder).filter(PurchaseOrder.id == order_id).with_for_update().first()
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Purchase order not found"
+        )
+    
+    if order.status in ("received", "cancelled"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Purchase order is already {order.status}"
+        )
+    
+    if order.status == "draft":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Draft purchase orders must be confirmed before receiving"
+        )
+    
+    try:
+        return PurchaseService.receive_purchase_order(db, order, receive_data, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 # Purchase Schedules
@@ -270,31 +338,51 @@ def get_weekly_schedule(
     current_user: User = Depends(get_current_active_user_or_owner)
 ) -> Any:
     """
-    Get weekly purchase schedule
+    Get weekly purchase schedule (weekly, biweekly and monthly schedules)
     """
     if not week_start:
         today = date.today()
         week_start = today - timedelta(days=today.weekday())
     
-    # Get active weekly schedules
-    schedules = db.query(PurchaseSchedule).filter(
-        PurchaseSchedule.is_active == True,
-        PurchaseSchedule.frequency == "weekly"
-    ).all()
+    return PurchaseScheduleService.get_occurrences(db, week_start, week_start + timedelta(days=6))
+
+
+@router.get("/schedules/occurrences", response_model=List[dict])
+def get_schedule_occurrences(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    All purchase schedule occurrences in a date range (default: next 30 days)
+    """
+    if not start_date:
+        start_date = date.today()
+    
+    if not end_date:
+        end_date = start_date + timedelta(days=30)
     
-    weekly_schedule = []
-    for schedule in schedules:
-        if schedule.day_of_week is not None:
-            scheduled_date = week_start + timedelta(days=schedule.day_of_week)
-            weekly_schedule.append({
-                "schedule_id": schedule.id,
-                "name": schedule.name,
-                "date": scheduled_date,
-                "items": schedule.scheduled_items,
-                "auto_create": schedule.auto_create
-            })
+    if end_date < start_date or (end_date - start_date).days > 366:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Date range must be between 0 and 366 days"
+        )
     
-    return sorted(weekly_schedule, key=lambda x: x["date"])
+    return PurchaseScheduleService.get_occurrences(db, start_date, end_date)
+
+
+@router.get("/requirements/forecast")
+def get_ingredient_requirements(
+    days: int = Query(default=7, ge=1, le=60, description="Days to project ahead"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Forecast ingredient consumption from sales forecasts and recipes, and flag
+    shortfalls against current stock and open purchase orders
+    """
+    return InventoryService.get_ingredient_requirements(db, days)
 
 
 @router.get("/analytics/", response_model=PurchaseAnalytics)
@@ -305,46 +393,7 @@ def get_purchase_analytics(
     current_user: User = Depends(get_current_active_user_or_owner)
 ) -> Any:
     """
-    Get purchase analytics
+    Get purchase analytics: spend, top suppliers, unit cost trends and
+    delivery performance
     """
-    query = db.query(PurchaseOrder).filter(PurchaseOrder.status != "cancelled")
-    
-    if start_date:
-        query = query.filter(PurchaseOrder.order_date >= start_date)
-    
-    if end_date:
-        query = query.filter(PurchaseOrder.order_date <= end_date)
-    
-    orders = query.all()
-    
-    total_orders = len(orders)
-    total_spent = sum(order.total_cost for order in orders) if orders else 0
-    average_order_value = total_spent / total_orders if total_orders > 0 else 0
-    
-    # Top suppliers
-    supplier_stats = {}
-    for order in orders:
-        supplier_name = order.supplier.name
-        if supplier_name not in supplier_stats:
-            supplier_stats[supplier_name] = {
-                "name": supplier_name,
-                "orders": 0,
-                "total_spent": 0
-            }
-        supplier_stats[supplier_name]["orders"] += 1
-        supplier_stats[supplier_name]["total_spent"] += float(order.total_cost)
-    
-    top_suppliers = sorted(
-        supplier_stats.values(),
-        key=lambda x: x["total_spent"],
-        reverse=True
-    )[:5]
-    
-    return PurchaseAnalytics(
-        total_orders=total_orders,
-        total_spent=total_spent,
-        average_order_value=average_order_value,
-        top_suppliers=top_suppliers,
-        cost_trends={},  # Would need more complex calculation
-        delivery_performance={}  # Would need delivery tracking
-    )
\ No newline at end of file
+    return PurchaseAnalyticsService.get_purchase_analytics(db, start_date, end_date)
@@ -1,6 +1,9 @@
 from typing import Any, List, Optional
 from datetime import datetime, date, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, and_
 
@@ -8,6 +11,14 @@ from ..core.database import get_db
 from ..core.auth import get_current_active_user_or_owner, get_current_active_owner
 from ..models.users import User
 from ..models.staff import Staff, WorkSchedule, StaffPerformance
+from ..schemas.staff import (
+    WorkScheduleCreate, WorkSchedule as WorkScheduleSchema,
+    TimePunchCreate, TimePunchBatch, TimePunch as TimePunchSchema
+)
+from ..services.staff import StaffService, ScheduleConflictError
+from ..services.time_clock import TimeClockService
+from ..services.staff_performance import StaffPerformanceService
+from ..utils.streaming import json_array_stream
 
 
 router = APIRouter()
@@ -37,6 +48,102 @@ def read_staff(
     return staff
 
 
+def _punch_time(punched_at: Optional[datetime], now: datetime) -> datetime:
+    """Punch time as naive local time (server receive time if not given)"""
+    if punched_at is None:
+        return now
+    if punched_at.tzinfo is not None:
+        return punched_at.astimezone().replace(tzinfo=None)
+    return punched_at
+
+
+def _clock_punch(punch_type: str, punch: TimePunchCreate, idempotency_key: Optional[str]) -> dict:
+    result = TimeClockService.submit_punches([{
+        "staff_id": punch.staff_id,
+        "punch_type": punch_type,
+        "punched_at": _punch_time(punch.punched_at, datetime.now()),
+        "idempotency_key": idempotency_key or punch.idempotency_key or str(uuid.uuid4()),
+        "source": punch.source
+    }])[0]
+    
+    if result["status"] == "rejected":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=result["detail"]
+        )
+    return result
+
+
+@router.post("/clock/in")
+def clock_in(
+    punch: TimePunchCreate,
+    idempotency_key: Optional[str] = Header(default=None, max_length=100),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Clock in. Retries with the same Idempotency-Key header (or body key)
+    return the original punch.
+    """
+    return _clock_punch("in", punch, idempotency_key)
+
+
+@router.post("/clock/out")
+def clock_out(
+    punch: TimePunchCreate,
+    idempotency_key: Optional[str] = Header(default=None, max_length=100),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Clock out. Retries with the same Idempotency-Key header (or body key)
+    return the original punch.
+    """
+    return _clock_punch("out", punch, idempotency_key)
+
+
+@router.post("/clock/batch")
+def clock_batch(
+    batch: TimePunchBatch,
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Upload punches collected by a terminal (e.g. after being offline);
+    each needs its own idempotency key
+    """
+    now = datetime.now()
+    punches = []
+    for punch in batch.punches:
+        punches.append({
+            "staff_id": punch.staff_id,
+            "punch_type": punch.punch_type.value,
+            "punched_at": _punch_time(punch.punched_at, now),
+            "idempotency_key": punch.idempotency_key,
+            "source": punch.source
+        })
+    
+    results = TimeClockService.submit_punches(punches)
+    return {
+        "recorded": sum(1 for r in results if r["status"] == "recorded"),
+        "duplicates": sum(1 for r in results if r["status"] == "duplicate"),
+        "rejected": sum(1 for r in results if r["status"] == "rejected"),
+        "results": results
+    }
+
+
+@router.get("/clock/punches", response_model=List[TimePunchSchema])
+def read_time_punches(
+    staff_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(default=500, le=5000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Punch log, newest first
+    """
+    return TimeClockService.get_punches(db, staff_id, start_date, end_date, limit)
+
+
 @router.get("/{staff_id}")
 def read_staff_member(
     staff_id: int,
@@ -70,37 +177,95 @@ def get_weekly_staff_schedule(
     
     week_end = week_start + timedelta(days=6)
     
-    # Get schedules for the week
-    schedules = db.query(WorkSchedule).join(Staff).filter(
-        and_(
-            WorkSchedule.schedule_date >= week_start,
-            WorkSchedule.schedule_date <= week_end,
-            Staff.employment_status == "active"
+    return StaffService.get_schedule(db, week_start, week_end)
+
+
+@router.get("/schedules/range")
+def get_staff_schedule_range(
+    start_date: date,
+    end_date: date,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Get staff schedule for a date range (multi-week / month roster view)
+    """
+    if end_date < start_date or (end_date - start_date).days > 92:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Date range must be between 0 and 92 days"
         )
-    ).order_by(WorkSchedule.schedule_date, WorkSchedule.start_time).all()
-    
-    # Group by date
-    weekly_schedule = {}
-    current_date = week_start
-    while current_date <= week_end:
-        date_str = current_date.strftime('%Y-%m-%d')
-        daily_schedules = [s for s in schedules if s.schedule_date == current_date]
-        
-        weekly_schedule[date_str] = [
-            {
-                "staff_id": schedule.staff_id,
-                "staff_name": f"{schedule.staff_member.first_name} {schedule.staff_member.last_name}",
-                "position": schedule.staff_member.position,
-                "start_time": schedule.start_time.strftime('%H:%M'),
-                "end_time": schedule.end_time.strftime('%H:%M'),
-                "status": schedule.status
-            }
-            for schedule in daily_schedules
-        ]
-        
-        current_date += timedelta(days=1)
-    
-    return weekly_schedule
+    
+    return StaffService.get_schedule(db, start_date, end_date)
+
+
+@router.post("/schedules")
+def create_work_schedule(
+    schedule_data: WorkScheduleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Create a shift, rejecting double-bookings (409) and reporting the
+    position's remaining coverage gaps that day
+    """
+    try:
+        result = StaffService.create_schedule(db, schedule_data.dict())
+    except ScheduleConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=jsonable_encoder({"message": str(e), "conflicts": e.conflicts})
+        )
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {
+        "schedule": WorkScheduleSchema.model_validate(result["schedule"]),
+        "coverage_gaps": result["coverage_gaps"]
+    }
+
+
+@router.get("/schedules/coverage")
+def get_schedule_coverage(
+    week_start: Optional[date] = Query(default=None, description="Start of week (Monday)"),
+    position: Optional[List[str]] = Query(default=None, description="Positions to check (default: those with a minimum on duty)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_or_owner)
+) -> Any:
+    """
+    Double-bookings and coverage gaps per position for a week
+    """
+    if not week_start:
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+    
+    return StaffService.get_coverage_report(db, week_start, position)
+
+
+@router.post("/schedules/propose")
+def propose_staff_schedule(
+    start_date: Optional[date] = Query(default=None, description="First day (default: next Monday)"),
+    weeks: int = Query(default=1, ge=1, le=8),
+    apply: bool = Query(default=False, description="Save the proposed shifts as work schedules"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Propose minimum-cost shifts that cover the historical hourly demand
+    """
+    if not start_date:
+        today = date.today()
+        start_date = today + timedelta(days=7 - today.weekday())
+    
+    return StaffService.propose_schedule(db, start_date, weeks, apply=apply)
 
 
 @router.get("/performance/summary")
@@ -143,15 +308,43 @@ def get_staff_performance_summary(
     return summary
 
 
+@router.post("/performance/recompute")
+def recompute_staff_performance(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_owner)
+) -> Any:
+    """
+    Recompute monthly performance rows (orders, hours, tardiness, overtime,
+    speed) from orders and punches (default: current month)
+    """
+    if not end_date:
+        end_date = date.today()
+    
+    if not start_date:
+        start_date = end_date.replace(day=1)
+    
+    if end_date < start_date or (end_date - start_date).days > 366:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Date range must be between 0 and 366 days"
+        )
+    
+    result = StaffPerformanceService.recompute(db, start_date, end_date)
+    db.commit()
+    return result
+
+
 @router.get("/analytics/utilization")
 def get_staff_utilization(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_or_owner)
 ) -> Any:
     """
-    Get staff utilization analytics
+    Get staff utilization analytics (scheduled vs worked hours per active
+    staff member, streamed as a JSON array)
     """
     if not start_date:
         start_date = date.today() - timedelta(days=30)
@@ -159,44 +352,7 @@ def get_staff_utilization(
     if not end_date:
         end_date = date.today()
     
-    # Get active staff
-    staff_members = db.query(Staff).filter(Staff.employment_status == "active").all()
-    
-    utilization_data = []
-    for staff in staff_members:
-        # Get schedules for the period
-        schedules = db.query(WorkSchedule).filter(
-            and_(
-                WorkSchedule.staff_id == staff.id,
-                WorkSchedule.schedule_date >= start_date,
-                WorkSchedule.schedule_date <= end_date
-            )
-        ).all()
-        
-        total_scheduled_hours = 0
-        total_worked_hours = 0
-        
-        for schedule in schedules:
-            # Calculate scheduled hours
-            start_datetime = datetime.combine(schedule.schedule_date, schedule.start_time)
-            end_datetime = datetime.combine(schedule.schedule_date, schedule.end_time)
-            scheduled_hours = (end_datetime - start_datetime).total_seconds() / 3600
-            total_scheduled_hours += scheduled_hours
-            
-            # Calculate actual worked hours if available
-            if schedule.actual_start_time and schedule.actual_end_time:
-                worked_hours = (schedule.actual_end_time - schedule.actual_start_time).total_seconds() / 3600
-                total_worked_hours += worked_hours
-        
-        utilization_rate = (total_worked_hours / total_scheduled_hours * 100) if total_scheduled_hours > 0 else 0
-        
-        utilization_data.append({
-            "staff_id": staff.id,
-            "staff_name": f"{staff.first_name} {staff.last_name}",
-            "position": staff.position,
-            "scheduled_hours": total_scheduled_hours,
-            "worked_hours": total_worked_hours,
-            "utilization_rate": round(utilization_rate, 2)
-        })
-    
-    return utilization_data
\ No newline at end of file
+    return StreamingResponse(
+        json_array_stream(StaffService.iter_utilization(start_date, end_date)),
+        media_type="application/json"
+    )
@@ -22,6 +22,23 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
 
+def authenticate_token(db: Session, token: Optional[str]) -> Optional[User]:
+    """
+    Active user for a raw bearer token, or None. For connections that cannot
+    send an Authorization header (WebSocket, EventSource).
+    """
+    if not token:
+        return None
+    username = decode_token(token)
+    if username is None:
+        return None
+    
+    user = get_user_by_username(db, username=username)
+    if user is None or not user.is_active or user.role not in ["owner", "staff"]:
+        return None
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
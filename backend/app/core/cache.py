@@ -0,0 +1,45 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class VersionedCache:
+    """
+    Thread-safe in-process cache where every entry is bound to a version token.
+    An entry is only served while the caller's current version matches the one
+    it was stored with, so a cheap watermark query is enough to invalidate it.
+    With `max_entries`, the oldest stored entries are evicted first.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._entries: Dict[Hashable, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, version: Any, value: Any) -> Any:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (version, value)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+        return value
+
+    def get_or_compute(self, key: Hashable, version: Any, compute: Callable[[], Any]) -> Any:
+        cached = self.get(key, version)
+        if cached is not None:
+            return cached
+        return self.set(key, version, compute())
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -41,12 +41,91 @@ class Settings(BaseSettings):
         "utensils": 0.03,
     }
     
+    # Inventory optimization
+    INVENTORY_USAGE_WINDOW_DAYS: int = 60  # History used for daily usage statistics
+    INVENTORY_SERVICE_LEVEL_Z: float = 1.65  # ~95% cycle service level
+    INVENTORY_ORDER_COST: float = 10.0  # Fixed cost per purchase order (USD)
+    INVENTORY_HOLDING_RATE: float = 0.25  # Annual holding cost as fraction of unit cost
+    DEFAULT_SUPPLIER_LEAD_TIME_DAYS: float = 3.0
+    DEMAND_HISTORY_DAYS: int = 56  # Sales history used for item-level forecasts
+    PRICE_INDEX_EWMA_ALPHA: float = 0.3  # Weight of the newest price in the supplier price index
+    SUPPLIER_BASKET_EXHAUSTIVE_LIMIT: int = 12  # Max suppliers for exact basket optimization
+
+    # Kitchen prep
+    KITCHEN_OPENING_HOUR: int = 11
+    KITCHEN_CLOSING_HOUR: int = 23
+    PREP_PAR_MARGIN: float = 0.15  # Safety margin over forecast usage
+    PREP_LIST_REFRESH_MINUTES: int = 30
+    KITCHEN_OVEN_CAPACITY: int = 4  # Items that can be prepared in parallel
+    KITCHEN_DEFAULT_PREP_MINUTES: int = 15  # For items without a preparation time
+    KITCHEN_ETA_CALIBRATION_ALPHA: float = 0.1  # Weight of each ready order in the ETA correction
+    KITCHEN_ETA_CALIBRATION_SAMPLES: int = 200  # Recent orders used to seed the correction at startup
+    KITCHEN_ETA_TOLERANCE_MINUTES: int = 5  # Quotes within this many minutes count as accurate
+    KITCHEN_QUEUE_RESYNC_SECONDS: int = 300  # Reload the queue from the database (multi-worker)
+    
+    # Intake throttling (kitchen load governor)
+    LOAD_WINDOW_MINUTES: int = 15  # Sliding window for the order arrival rate
+    LOAD_BUSY_BACKLOG_MINUTES: float = 30  # Kitchen backlog that extends quotes
+    LOAD_OVERLOAD_BACKLOG_MINUTES: float = 50  # Kitchen backlog that pauses platforms
+    LOAD_BUSY_ORDERS_PER_WINDOW: int = 20
+    LOAD_OVERLOAD_ORDERS_PER_WINDOW: int = 30
+    LOAD_QUOTE_EXTRA_MINUTES: float = 10  # Added to quotes per load level (busy x1, overloaded x2)
+    LOAD_PAUSABLE_PLATFORMS: list = ["uber_eats", "pedidos_ya", "bis"]
+    LOAD_RESUME_RATIO: float = 0.7  # Load must drop below this fraction of a threshold to step down
+    LOAD_MIN_PAUSE_MINUTES: int = 10  # Shortest automatic platform pause
+    LOAD_SYNC_SECONDS: int = 10  # Reload arrivals and pauses shared by all workers from the database
+    
+    # Platform webhooks
+    PLATFORM_WEBHOOK_SECRETS: dict = {}  # platform -> HMAC secret; unsigned webhooks only in development
+    PLATFORM_INGESTION_USERNAME: Optional[str] = None  # Creator of platform orders (first owner if unset)
+    INGESTION_WORKERS: int = 4  # Concurrent batch writers
+    INGESTION_BATCH_SIZE: int = 50  # Max orders committed per transaction
+    INGESTION_BATCH_WAIT_MS: int = 20  # How long a batch waits to fill
+    INGESTION_QUEUE_SIZE: int = 5000  # Webhooks beyond this wait in the inbox for recovery
+    INGESTION_RETRY_BASE_MS: int = 500  # First backoff after a database error, doubled per attempt
+    INGESTION_MAX_ATTEMPTS: int = 6  # In-memory retries before a webhook is left to recovery
+    INGESTION_RECOVER_AFTER_SECONDS: int = 120  # Pending inbox rows older than this are requeued
+    INGESTION_RECOVER_INTERVAL_SECONDS: int = 60
+    INGESTION_INBOX_RETENTION_DAYS: int = 7  # Processed webhooks kept for auditing
+    
+    # Staff scheduling
+    STAFF_ORDERS_PER_HOUR: dict = {  # Orders one person in each role handles per hour
+        "cook": 6.0,
+        "assistant": 10.0,
+        "delivery": 3.0,
+        "cashier": 15.0,
+    }
+    STAFF_MIN_ON_DUTY: dict = {"cook": 1, "cashier": 1}  # Staff required whenever open
+    SHIFT_LENGTHS_HOURS: list = [4, 6, 8]
+    SHIFT_NON_PREFERRED_DAY_PENALTY: float = 0.15  # Cost markup for shifts outside preferred days
+    SHIFT_SCHEDULER_TIME_BUDGET_SECONDS: float = 5.0
+    DEFAULT_STAFF_HOURLY_RATE: float = 3.0
+    
+    # Time clock
+    TIME_CLOCK_GRACE_MINUTES: int = 5  # Lateness / overtime below this is not counted
+    TIME_CLOCK_BATCH_SIZE: int = 200  # Max punches written per batch
+    TIME_CLOCK_BATCH_WAIT_MS: int = 25  # How long a batch waits for more punches
+    ORDER_TARGET_MINUTES: float = 35.0  # Order-to-delivery time scored 3/5; half scores 5, double scores 1
+    PREP_TARGET_MINUTES: float = 15.0  # Kitchen time (preparing -> ready) scored 3/5, used when the stages were recorded
+    
+    # Background jobs
+    SCHEDULER_ENABLED: bool = True
+    WASTE_ROLLUP_INTERVAL_MINUTES: int = 60
+    PURCHASE_SCHEDULE_INTERVAL_MINUTES: int = 15
+    STAFF_PERFORMANCE_INTERVAL_MINUTES: int = 60
+    
     # Timezone
     TIMEZONE: str = "America/Guayaquil"
     
     # Redis for caching and celery
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Real-time order events
+    EVENT_BROKER: str = "memory"  # memory (single worker) or redis (shared across workers)
+    EVENT_CHANNEL: str = "orders"  # Redis pub/sub channel
+    EVENT_QUEUE_SIZE: int = 100  # Events buffered per client before the oldest are dropped
+    EVENT_HEARTBEAT_SECONDS: int = 15  # Keep-alive interval for idle streams
+    
     # Security settings
     ENVIRONMENT: str = "development"
     SQL_ECHO: bool = False
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from .config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One connected client: a bounded queue on the client's event loop plus
+    the platforms / statuses it wants (None means all). When a slow client's
+    queue is full its oldest event is dropped rather than blocking others.
+    """
+
+    def __init__(
+        self,
+        platforms: Optional[Iterable[str]] = None,
+        statuses: Optional[Iterable[str]] = None,
+        max_queue: int = 100
+    ):
+        self.platforms: Optional[Set[str]] = set(platforms) if platforms else None
+        self.statuses: Optional[Set[str]] = set(statuses) if statuses else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.platforms is not None and event.get("platform") not in self.platforms:
+            return False
+        if self.statuses is not None and event.get("status") not in self.statuses:
+            return False
+        return True
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if nothing arrived within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """
+    Process-local pub/sub for order events. `publish` may be called from
+    sync route handlers (worker threads) or from the event loop; events are
+    handed to each matching subscriber on its own loop.
+
+    With EVENT_BROKER = "redis" events are published to a Redis channel and a
+    listener task fans them out locally, so clients connected to any API
+    worker see events raised by every worker. Without the redis package (or
+    if Redis is unreachable at startup) it falls back to process-local mode.
+    """
+
+    def __init__(self, backend: str = "memory", redis_url: Optional[str] = None, channel: str = "orders"):
+        self.backend = backend
+        self.redis_url = redis_url
+        self.channel = channel
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+
+    def subscribe(
+        self,
+        platforms: Optional[Iterable[str]] = None,
+        statuses: Optional[Iterable[str]] = None
+    ) -> Subscription:
+        subscription = Subscription(platforms, statuses, settings.EVENT_QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: str, payload: Dict[str, Any]) -> None:
+        """Broadcast an event; never raises, a lost event must not fail the request"""
+        event = jsonable_encoder({"type": event_type, "at": datetime.now(), **payload})
+        self.published += 1
+        if self._redis is not None:
+            try:
+                self._redis.publish(self.channel, json.dumps(event))
+                return
+            except Exception:
+                logger.exception("Could not publish %s to Redis; delivering locally", event_type)
+        self._fan_out(event)
+
+    def _fan_out(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            targets = [s for s in self._subscriptions if s.matches(event)]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                self.unsubscribe(subscription)  # Its event loop is gone
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        return {
+            "backend": "redis" if self._redis is not None else "memory",
+            "subscribers": len(subscriptions),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in subscriptions)
+        }
+
+    async def start(self) -> None:
+        if self.backend != "redis":
+            return
+        try:
+            import redis
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning("EVENT_BROKER is redis but the redis package is not installed; using in-process events")
+            return
+
+        try:
+            client = redis.Redis.from_url(self.redis_url)
+            await asyncio.to_thread(client.ping)
+        except Exception:
+            logger.exception("Redis is unreachable; using in-process events")
+            return
+
+        pubsub = redis_asyncio.Redis.from_url(self.redis_url).pubsub()
+        await pubsub.subscribe(self.channel)
+        self._redis = client
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self._redis = None
+
+    async def _listen(self, pubsub) -> None:
+        try:
+            while True:
+                try:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                except Exception:
+                    logger.exception("Redis event listener failed; retrying")
+                    await asyncio.sleep(1)
+                    continue
+                if message and message.get("type") == "message":
+                    try:
+                        self._fan_out(json.loads(message["data"]))
+                    except ValueError:
+                        logger.warning("Ignoring malformed event on %s", self.channel)
+        finally:
+            await pubsub.aclose()
+
+
+order_events = EventBroker(settings.EVENT_BROKER, settings.REDIS_URL, settings.EVENT_CHANNEL)
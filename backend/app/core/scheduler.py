@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from .database import SessionLocal
+from ..models.jobs import JobLease, JobRun
+from ..utils.sql import dialect_insert
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval_seconds: float,
+        run_at_startup: bool = True,
+        exclusive: bool = False
+    ):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.run_at_startup = run_at_startup
+        self.exclusive = exclusive
+
+        # Timing metrics for this process
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.total_duration_ms = 0
+        self.last_duration_ms: Optional[int] = None
+        self.last_started_at: Optional[datetime] = None
+        self.last_status: Optional[str] = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "exclusive": self.exclusive,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_status": self.last_status,
+            "last_started_at": self.last_started_at,
+            "last_duration_ms": self.last_duration_ms,
+            "average_duration_ms": round(self.total_duration_ms / self.runs, 1) if self.runs else None
+        }
+
+
+class JobScheduler:
+    """
+    Minimal in-process periodic job runner. Jobs are plain sync callables run
+    in a worker thread so they can open their own SQLAlchemy sessions without
+    blocking the event loop.
+
+    Exclusive jobs are guarded by a lease row in job_leases so that only one
+    of several API workers runs them per interval. Every run is recorded in
+    job_runs with its duration and outcome.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval_seconds: float,
+        run_at_startup: bool = True,
+        exclusive: bool = False
+    ) -> None:
+        self._jobs[name] = ScheduledJob(name, func, interval_seconds, run_at_startup, exclusive)
+
+    def get_job(self, name: str) -> Optional[ScheduledJob]:
+        return self._jobs.get(name)
+
+    def get_metrics(self) -> List[Dict[str, Any]]:
+        return [job.metrics() for job in self._jobs.values()]
+
+    async def start(self) -> None:
+        for job in self._jobs.values():
+            self._tasks.append(asyncio.create_task(self._run_loop(job)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_job(self, job: ScheduledJob) -> None:
+        try:
+            await asyncio.to_thread(self._execute, job)
+        except Exception:
+            logger.exception("Scheduled job %s could not be run", job.name)
+
+    def _execute(self, job: ScheduledJob) -> None:
+        if job.exclusive and not self._acquire_lease(job):
+            job.skipped += 1
+            return
+
+        started_at = datetime.now()
+        start = time.perf_counter()
+        status, result, error = "success", None, None
+        try:
+            result = job.func()
+        except Exception:
+            logger.exception("Scheduled job %s failed", job.name)
+            status, error = "failed", traceback.format_exc()
+        duration_ms = int((time.perf_counter() - start) * 1000)
+
+        job.runs += 1
+        job.total_duration_ms += duration_ms
+        job.last_duration_ms = duration_ms
+        job.last_started_at = started_at
+        job.last_status = status
+        if status == "failed":
+            job.failures += 1
+            if job.exclusive:
+                self._release_lease(job)  # Let another worker retry
+
+        self._record_run(job, started_at, duration_ms, status, result, error)
+
+    def _acquire_lease(self, job: ScheduledJob) -> bool:
+        """
+        Take or renew the job's lease for one interval. The upsert only
+        overwrites an expired lease or one we already hold, so exactly one
+        worker gets a row back.
+        """
+        now = datetime.now()
+        db = SessionLocal()
+        try:
+            leases = JobLease.__table__
+            stmt = dialect_insert(db, JobLease).values(
+                job_name=job.name,
+                owner=self.worker_id,
+                acquired_at=now,
+                expires_at=now + timedelta(seconds=job.interval_seconds)
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["job_name"],
+                set_={
+                    "owner": stmt.excluded.owner,
+                    "acquired_at": stmt.excluded.acquired_at,
+                    "expires_at": stmt.excluded.expires_at
+                },
+                where=(leases.c.expires_at <= now) | (leases.c.owner == self.worker_id)
+            ).returning(leases.c.owner)
+            acquired = db.execute(stmt).first() is not None
+            db.commit()
+            return acquired
+        finally:
+            db.close()
+
+    def _release_lease(self, job: ScheduledJob) -> None:
+        db = SessionLocal()
+        try:
+            db.query(JobLease).filter(
+                JobLease.job_name == job.name,
+                JobLease.owner == self.worker_id
+            ).update({"expires_at": datetime.now()}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            logger.exception("Could not release lease of job %s", job.name)
+        finally:
+            db.close()
+
+    def _record_run(
+        self,
+        job: ScheduledJob,
+        started_at: datetime,
+        duration_ms: int,
+        status: str,
+        result: Any,
+        error: Optional[str]
+    ) -> None:
+        db = SessionLocal()
+        try:
+            db.add(JobRun(
+                job_name=job.name,
+                worker=self.worker_id,
+                status=status,
+                started_at=started_at,
+                finished_at=started_at + timedelta(milliseconds=duration_ms),
+                duration_ms=duration_ms,
+                result=result if isinstance(result, (dict, list)) else None,
+                error=error
+            ))
+            db.commit()
+        except Exception:
+            logger.exception("Could not record run of job %s", job.name)
+        finally:
+            db.close()
+
+    async def _run_loop(self, job: ScheduledJob) -> None:
+        if not job.run_at_startup:
+            await asyncio.sleep(job.interval_seconds)
+        while True:
+            await self.run_job(job)
+            await asyncio.sleep(job.interval_seconds)
+
+
+scheduler = JobScheduler()
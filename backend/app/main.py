@@ -1,12 +1,21 @@
+import asyncio
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 
 from .core.config import settings
-from .core.database import create_tables, get_db
+from .core.database import create_tables, get_db, SessionLocal
 from .core.auth import get_current_user
-from .api import auth, orders, purchases, menu, staff, analytics, customers, platforms
+from .core.scheduler import scheduler
+from .core.events import order_events
+from .api import auth, orders, purchases, menu, staff, analytics, customers, platforms, inventory, jobs
+from .services.prep import PrepListService
+from .services.waste import WasteAnalyticsService
+from .services.purchase_schedules import PurchaseScheduleService
+from .services.staff_performance import StaffPerformanceService
+from .services.kitchen import KitchenService
+from .services.platform_ingestion import order_ingestion
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,8 +27,50 @@ app = FastAPI(
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
+    """Initialize database tables, the order event broker and background jobs on startup"""
     create_tables()
+    await order_events.start()
+    await order_ingestion.start()
+    app.state.load_listener = asyncio.create_task(KitchenService.follow_shared_load())
+    
+    db = SessionLocal()
+    try:
+        KitchenService.rebuild(db, calibrate=True)
+    finally:
+        db.close()
+    
+    if settings.SCHEDULER_ENABLED:
+        scheduler.add_job("prep_list", PrepListService.refresh_job, settings.PREP_LIST_REFRESH_MINUTES * 60)
+        scheduler.add_job("waste_rollup", WasteAnalyticsService.rollup_job, settings.WASTE_ROLLUP_INTERVAL_MINUTES * 60, exclusive=True)
+        scheduler.add_job(
+            "purchase_schedules",
+            PurchaseScheduleService.auto_create_job,
+            settings.PURCHASE_SCHEDULE_INTERVAL_MINUTES * 60,
+            exclusive=True
+        )
+        scheduler.add_job(
+            "staff_performance",
+            StaffPerformanceService.refresh_job,
+            settings.STAFF_PERFORMANCE_INTERVAL_MINUTES * 60,
+            exclusive=True
+        )
+        scheduler.add_job(
+            "kitchen_queue",
+            KitchenService.rebuild_job,
+            settings.KITCHEN_QUEUE_RESYNC_SECONDS,
+            run_at_startup=False
+        )
+        await scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs, platform order ingestion and the order event broker"""
+    await scheduler.stop()
+    app.state.load_listener.cancel()
+    await asyncio.gather(app.state.load_listener, return_exceptions=True)
+    await order_ingestion.stop()
+    await order_events.stop()
 
 # Security
 security = HTTPBearer()
@@ -64,6 +115,8 @@ app.include_router(staff.router, prefix=f"{settings.API_V1_STR}/staff", tags=["S
 app.include_router(analytics.router, prefix=f"{settings.API_V1_STR}/analytics", tags=["Analytics"])
 app.include_router(customers.router, prefix=f"{settings.API_V1_STR}/customers", tags=["Customers"])
 app.include_router(platforms.router, prefix=f"{settings.API_V1_STR}/platforms", tags=["Platforms"])
+app.include_router(inventory.router, prefix=f"{settings.API_V1_STR}/inventory", tags=["Inventory"])
+app.include_router(jobs.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["Jobs"])
 
 
 if __name__ == "__main__":
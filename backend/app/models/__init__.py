@@ -1,28 +1,39 @@
 from .users import User
-from .orders import Order, OrderItem
+from .orders import Order, OrderItem, PlatformWebhook, PlatformPause
 from .menu import MenuCategory, MenuItem, MenuItemVariation
-from .inventory import Supplier, InventoryItem, StockMovement
-from .purchases import PurchaseOrder, PurchaseOrderItem, PurchaseSchedule
-from .staff import Staff, WorkSchedule, StaffPerformance
+from .inventory import Supplier, InventoryItem, StockMovement, InventoryBatch, WasteDailySummary
+from .purchases import PurchaseOrder, PurchaseOrderItem, PurchaseSchedule, SupplierPriceIndex
+from .staff import Staff, WorkSchedule, StaffPerformance, TimePunch
 from .customers import Customer, CustomerFeedback, MarketingCampaign
+from .sequences import DocumentSequence
+from .jobs import JobLease, JobRun
 
 __all__ = [
     "User",
     "Order",
     "OrderItem", 
+    "PlatformWebhook",
+    "PlatformPause",
     "MenuCategory",
     "MenuItem",
     "MenuItemVariation",
     "Supplier",
     "InventoryItem", 
     "StockMovement",
+    "InventoryBatch",
+    "WasteDailySummary",
     "PurchaseOrder",
     "PurchaseOrderItem",
     "PurchaseSchedule",
+    "SupplierPriceIndex",
     "Staff",
     "WorkSchedule", 
     "StaffPerformance",
+    "TimePunch",
     "Customer",
     "CustomerFeedback",
-    "MarketingCampaign"
+    "MarketingCampaign",
+    "DocumentSequence",
+    "JobLease",
+    "JobRun"
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Date, Text, Boolean, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -38,6 +38,10 @@ class InventoryItem(Base):
     # Supplier information
     primary_supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=True)
     
+    # Sub-recipe for prepared items such as dough balls or sliced toppings
+    # (JSON array with ingredient_id, quantity and unit per unit of this item)
+    recipe = Column(JSON, nullable=True)
+    
     # Expiration tracking
     has_expiration = Column(Boolean, default=False)
     average_shelf_life = Column(Integer, nullable=True)  # days
@@ -66,8 +70,10 @@ class StockMovement(Base):
     
     # Additional information
     notes = Column(Text, nullable=True)
+    reason = Column(String(50), nullable=True)  # Waste reason: expired, spoiled, burnt, dropped, overproduction
     batch_number = Column(String(50), nullable=True)
     expiry_date = Column(DateTime(timezone=True), nullable=True)
+    batch_id = Column(Integer, ForeignKey("inventory_batches.id"), nullable=True)
     
     # User and timestamp
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -75,4 +81,70 @@ class StockMovement(Base):
     
     # Relationships
     inventory_item = relationship("InventoryItem", backref="stock_movements")
-    creator = relationship("User")
\ No newline at end of file
+    batch = relationship("InventoryBatch")
+    creator = relationship("User")
+    
+    __table_args__ = (
+        # Incremental rollups and usage statistics scan by type and date range
+        Index("ix_stock_movements_type_created", "movement_type", "created_at"),
+    )
+
+
+class InventoryBatch(Base):
+    __tablename__ = "inventory_batches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
+    batch_number = Column(String(50), nullable=True)
+    expiry_date = Column(DateTime(timezone=True), nullable=True)
+    
+    # Quantities
+    quantity_received = Column(DECIMAL(10, 3), nullable=False)
+    quantity_remaining = Column(DECIMAL(10, 3), nullable=False)
+    unit_cost = Column(DECIMAL(10, 4), nullable=True)
+    
+    # Origin
+    purchase_order_item_id = Column(Integer, ForeignKey("purchase_order_items.id"), nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    inventory_item = relationship("InventoryItem", backref="batches")
+    
+    __table_args__ = (
+        # FEFO lookup of open batches for one item
+        Index(
+            "ix_inventory_batches_item_expiry_open",
+            "inventory_item_id", "expiry_date",
+            postgresql_where=quantity_remaining > 0,
+            sqlite_where=quantity_remaining > 0
+        ),
+        # Expiring-soon range scans only touch batches that still hold stock
+        Index(
+            "ix_inventory_batches_expiry_open",
+            "expiry_date",
+            postgresql_where=quantity_remaining > 0,
+            sqlite_where=quantity_remaining > 0
+        ),
+    )
+
+
+class WasteDailySummary(Base):
+    __tablename__ = "waste_daily_summary"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    summary_date = Column(Date, nullable=False, index=True)
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
+    category = Column(String(50), nullable=False)
+    reason = Column(String(50), nullable=False, default="unspecified")
+    
+    # Aggregates rolled up from waste stock movements
+    quantity = Column(DECIMAL(12, 3), nullable=False, default=0)
+    total_cost = Column(DECIMAL(12, 2), nullable=False, default=0)
+    movement_count = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("summary_date", "inventory_item_id", "reason", name="uq_waste_daily_summary_day_item_reason"),
+    )
\ No newline at end of file
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class JobLease(Base):
+    __tablename__ = "job_leases"
+    
+    # One row per exclusive job; the holder runs it until the lease expires
+    job_name = Column(String(50), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    acquired_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class JobRun(Base):
+    __tablename__ = "job_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String(50), nullable=False)
+    worker = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False)  # success, failed
+    
+    # Timing
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=False)
+    duration_ms = Column(Integer, nullable=False)
+    
+    # Outcome
+    result = Column(JSON, nullable=True)  # Whatever the job returned (counts, ids)
+    error = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_job_runs_job_started", "job_name", "started_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, JSON, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, JSON, ForeignKey, Text, Index, Boolean
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -42,13 +42,59 @@ class Order(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    preparing_at = Column(DateTime(timezone=True), nullable=True)
+    ready_at = Column(DateTime(timezone=True), nullable=True)
+    quoted_ready_at = Column(DateTime(timezone=True), nullable=True)  # Kitchen ETA given at creation
     delivered_at = Column(DateTime(timezone=True), nullable=True)
     
     # Foreign keys
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    assigned_staff_id = Column(Integer, ForeignKey("staff.id"), nullable=True, index=True)  # Staff who handled it
     
     # Relationships
     creator = relationship("User", foreign_keys=[created_by])
+    assigned_staff = relationship("Staff", foreign_keys=[assigned_staff_id])
+    
+    __table_args__ = (
+        # One order per platform order; retried deliveries upsert onto it
+        Index(
+            "uq_orders_platform_order",
+            "platform", "platform_order_id",
+            unique=True,
+            postgresql_where=platform_order_id.isnot(None),
+            sqlite_where=platform_order_id.isnot(None)
+        ),
+    )
+
+
+class PlatformWebhook(Base):
+    __tablename__ = "platform_webhooks"
+    
+    # Inbox of platform order webhooks, stored before they are acknowledged
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String(50), nullable=False)
+    platform_order_id = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, processed, rejected
+    error = Column(Text, nullable=True)  # Why the order was rejected
+    
+    # Timestamps
+    received_at = Column(DateTime(timezone=True), nullable=False)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_platform_webhooks_status_received", "status", "received_at"),
+        Index("ix_platform_webhooks_platform_order", "platform", "platform_order_id"),
+    )
+
+
+class PlatformPause(Base):
+    __tablename__ = "platform_pauses"
+    
+    # A row per paused platform, shared by every API worker
+    platform = Column(String(50), primary_key=True)
+    manual = Column(Boolean, nullable=False, default=False)  # Paused by hand; never lifted automatically
+    paused_at = Column(DateTime(timezone=True), nullable=False)
 
 
 class OrderItem(Base):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Text, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Text, Boolean, JSON, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -12,7 +12,7 @@ class PurchaseOrder(Base):
     supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=False)
     
     # Order details
-    status = Column(String(20), nullable=False, default="pending")  # pending, ordered, received, cancelled
+    status = Column(String(20), nullable=False, default="pending")  # draft, pending, ordered, received, cancelled
     priority = Column(String(20), nullable=False, default="normal")  # urgent, high, normal, low
     
     # Financial information
@@ -95,4 +95,32 @@ class PurchaseSchedule(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    last_run = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
+    last_run = Column(DateTime(timezone=True), nullable=True)
+
+
+class SupplierPriceIndex(Base):
+    __tablename__ = "supplier_price_index"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=False, index=True)
+    
+    # Price statistics per unit of the inventory item
+    latest_price = Column(DECIMAL(10, 4), nullable=False)
+    average_price = Column(DECIMAL(10, 4), nullable=False)  # Exponentially weighted moving average
+    price_variance = Column(DECIMAL(14, 6), nullable=False, default=0)  # Exponentially weighted variance
+    min_price = Column(DECIMAL(10, 4), nullable=False)
+    max_price = Column(DECIMAL(10, 4), nullable=False)
+    observations = Column(Integer, nullable=False, default=1)
+    
+    # Timestamps
+    first_observed_at = Column(DateTime(timezone=True), nullable=False)
+    last_observed_at = Column(DateTime(timezone=True), nullable=False)
+    
+    # Relationships
+    inventory_item = relationship("InventoryItem")
+    supplier = relationship("Supplier")
+    
+    __table_args__ = (
+        UniqueConstraint("inventory_item_id", "supplier_id", name="uq_supplier_price_index_item_supplier"),
+    )
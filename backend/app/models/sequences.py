@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class DocumentSequence(Base):
+    __tablename__ = "document_sequences"
+    
+    # One counter per document prefix and day, e.g. "PO20240115"
+    name = Column(String(50), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
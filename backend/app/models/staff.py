@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Text, Boolean, JSON, ForeignKey, Date, Time
+from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Text, Boolean, JSON, ForeignKey, Date, Time, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -9,6 +9,7 @@ class Staff(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     employee_number = Column(String(20), unique=True, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=True)  # POS login, if any
     
     # Personal information
     first_name = Column(String(50), nullable=False)
@@ -94,6 +95,7 @@ class StaffPerformance(Base):
     orders_handled = Column(Integer, default=0)
     hours_worked = Column(DECIMAL(8, 2), default=0)
     tardiness_count = Column(Integer, default=0)
+    overtime_hours = Column(DECIMAL(8, 2), default=0)
     customer_ratings = Column(JSON, nullable=True)  # Array of rating objects
     
     # Quality metrics
@@ -118,4 +120,33 @@ class StaffPerformance(Base):
     
     # Relationships
     staff_member = relationship("Staff", backref="performance_reviews")
-    reviewer = relationship("User")
\ No newline at end of file
+    reviewer = relationship("User")
+    
+    __table_args__ = (
+        # One row per staff member and period, updated in place by the time clock
+        UniqueConstraint("staff_id", "period_start", "period_end", name="uq_staff_performance_period"),
+    )
+
+
+class TimePunch(Base):
+    __tablename__ = "time_punches"
+    
+    # Append-only clock-in/out log; actual times are derived onto WorkSchedule
+    id = Column(Integer, primary_key=True, index=True)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False)
+    work_schedule_id = Column(Integer, ForeignKey("work_schedules.id"), nullable=True)
+    punch_type = Column(String(10), nullable=False)  # in, out
+    punched_at = Column(DateTime(timezone=True), nullable=False)
+    idempotency_key = Column(String(100), unique=True, nullable=False)
+    source = Column(String(20), nullable=True)  # terminal, mobile, manual
+    
+    # Derived at write time
+    late_minutes = Column(Integer, nullable=True)  # Clock-in after scheduled start
+    overtime_minutes = Column(Integer, nullable=True)  # Clock-out after scheduled end
+    worked_minutes = Column(Integer, nullable=True)  # Clock-out minus actual start
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_time_punches_staff_punched", "staff_id", "punched_at"),
+    )
\ No newline at end of file
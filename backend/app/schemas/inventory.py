@@ -0,0 +1,83 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+
+
+class ConsumptionType(str, Enum):
+    USAGE = "usage"
+    WASTE = "waste"
+    ADJUSTMENT = "adjustment"
+
+
+class StockConsumptionCreate(BaseModel):
+    inventory_item_id: int = Field(..., gt=0)
+    movement_type: ConsumptionType = ConsumptionType.USAGE
+    quantity: Decimal = Field(..., gt=0)  # Amount taken out of stock
+    reference_type: Optional[str] = Field(None, max_length=20)
+    reference_id: Optional[int] = None
+    reason: Optional[str] = Field(None, max_length=50)  # Waste reason
+    notes: Optional[str] = None
+
+
+class StockMovement(BaseModel):
+    id: int
+    inventory_item_id: int
+    movement_type: str
+    quantity: Decimal
+    unit_cost: Optional[Decimal] = None
+    total_cost: Optional[Decimal] = None
+    batch_id: Optional[int] = None
+    batch_number: Optional[str] = None
+    expiry_date: Optional[datetime] = None
+    reason: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class InventoryBatchCreate(BaseModel):
+    inventory_item_id: int = Field(..., gt=0)
+    quantity: Decimal = Field(..., gt=0)
+    batch_number: Optional[str] = Field(None, max_length=50)
+    expiry_date: Optional[datetime] = None
+    unit_cost: Optional[Decimal] = Field(None, ge=0)
+    notes: Optional[str] = None
+
+
+class InventoryBatch(BaseModel):
+    id: int
+    inventory_item_id: int
+    batch_number: Optional[str] = None
+    expiry_date: Optional[datetime] = None
+    quantity_received: Decimal
+    quantity_remaining: Decimal
+    unit_cost: Optional[Decimal] = None
+    purchase_order_item_id: Optional[int] = None
+    received_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ExpiringBatch(BaseModel):
+    batch_id: int
+    inventory_item_id: int
+    item_name: str
+    unit: str
+    batch_number: Optional[str] = None
+    expiry_date: datetime
+    quantity_remaining: Decimal
+    value_at_risk: Decimal
+    hours_left: float
+
+
+class StockConsumptionResult(BaseModel):
+    inventory_item_id: int
+    quantity: Decimal
+    total_cost: Decimal
+    unbatched_quantity: Decimal
+    movements: List[StockMovement]
@@ -66,6 +66,7 @@ class OrderBase(BaseModel):
     platform_order_id: Optional[str] = None
     payment_method: PaymentMethod
     delivery_fee: Decimal = Field(default=Decimal('0'), ge=0)
+    assigned_staff_id: Optional[int] = Field(None, gt=0)
     
     @field_validator('customer_phone')
     @classmethod
@@ -89,6 +90,28 @@ class OrderCreate(OrderBase):
 class OrderUpdate(BaseModel):
     status: Optional[OrderStatus] = None
     delivered_at: Optional[datetime] = None
+    assigned_staff_id: Optional[int] = Field(None, gt=0)
+
+
+class OrderStatusUpdate(BaseModel):
+    status: OrderStatus
+    expected_status: Optional[OrderStatus] = None  # Status the device last saw
+
+
+class OrderStatusBatchItem(OrderStatusUpdate):
+    order_id: int = Field(..., gt=0)
+
+
+class OrderStatusBatch(BaseModel):
+    transitions: List[OrderStatusBatchItem] = Field(..., min_items=1, max_items=200)
+
+
+class OrderStatusChange(BaseModel):
+    id: int
+    status: OrderStatus
+    preparing_at: Optional[datetime] = None
+    ready_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
 
 
 class OrderInDB(OrderBase):
@@ -105,6 +128,9 @@ class OrderInDB(OrderBase):
     net_profit: Decimal
     status: OrderStatus
     created_at: datetime
+    preparing_at: Optional[datetime] = None
+    ready_at: Optional[datetime] = None
+    quoted_ready_at: Optional[datetime] = None
     delivered_at: Optional[datetime]
     created_by: int
     
@@ -113,7 +139,7 @@ class OrderInDB(OrderBase):
 
 
 class Order(OrderInDB):
-    items: List[OrderItem] = []
+    items: List[OrderItemCreate] = []  # As stored in the items JSON column
 
 
 class OrderSummary(BaseModel):
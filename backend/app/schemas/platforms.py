@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict
+
+from .orders import Platform
+
+
+class LoadSimulationRequest(BaseModel):
+    arrivals_per_hour: Dict[Platform, float] = Field(..., min_length=1)  # Average orders per hour by platform
+    minutes: int = Field(default=180, gt=0, le=720)
+    items_per_order: float = Field(default=2.0, gt=0)
+    prep_minutes: float = Field(default=12.0, gt=0)
+    seed: Optional[int] = None
@@ -6,6 +6,7 @@ from enum import Enum
 
 
 class PurchaseOrderStatus(str, Enum):
+    DRAFT = "draft"
     PENDING = "pending"
     ORDERED = "ordered"
     RECEIVED = "received"
@@ -115,6 +116,10 @@ class PurchaseOrderCreate(PurchaseOrderBase):
         return v
 
 
+class PurchaseOrderBulkCreate(BaseModel):
+    orders: List[PurchaseOrderCreate] = Field(..., min_items=1, max_items=100)
+
+
 class PurchaseOrderUpdate(BaseModel):
     status: Optional[PurchaseOrderStatus] = None
     expected_delivery_date: Optional[datetime] = None
@@ -123,6 +128,29 @@ class PurchaseOrderUpdate(BaseModel):
     received_by: Optional[int] = None
 
 
+class PurchaseOrderReceiveItem(BaseModel):
+    purchase_order_item_id: int = Field(..., gt=0)
+    quantity_received: Decimal = Field(..., ge=0)
+    quality_rating: Optional[int] = Field(None, ge=1, le=5)
+    batch_number: Optional[str] = Field(None, max_length=50)
+    expiry_date: Optional[datetime] = None
+    notes: Optional[str] = None
+
+
+class PurchaseOrderReceive(BaseModel):
+    items: List[PurchaseOrderReceiveItem] = Field(..., min_items=1, max_items=500)
+    actual_delivery_date: Optional[datetime] = None
+    notes: Optional[str] = None
+    
+    @field_validator('items')
+    @classmethod
+    def validate_unique_lines(cls, v):
+        line_ids = [item.purchase_order_item_id for item in v]
+        if len(line_ids) != len(set(line_ids)):
+            raise ValueError('Each purchase order line can only be received once per delivery')
+        return v
+
+
 class PurchaseOrderInDB(PurchaseOrderBase):
     id: int
     purchase_number: str
@@ -147,6 +175,13 @@ class PurchaseOrder(PurchaseOrderInDB):
     items: List[PurchaseOrderItem] = []
 
 
+class PurchaseOrderReceiveResult(BaseModel):
+    purchase_order: PurchaseOrder
+    lines_received: int
+    total_received_cost: Decimal
+    updated_menu_items: List[int]
+
+
 class PurchaseOrderSummary(BaseModel):
     id: int
     purchase_number: str
@@ -225,6 +260,23 @@ class PurchaseSchedule(PurchaseScheduleInDB):
     pass
 
 
+class SupplierBasketItem(BaseModel):
+    inventory_item_id: int = Field(..., gt=0)
+    quantity: Decimal = Field(..., gt=0)
+
+
+class PriceBasis(str, Enum):
+    LATEST = "latest"
+    AVERAGE = "average"
+
+
+class SupplierBasketRequest(BaseModel):
+    items: List[SupplierBasketItem] = Field(..., min_items=1, max_items=5000)
+    max_lead_time_days: Optional[float] = Field(None, gt=0)
+    lead_time_cost_per_day: Decimal = Field(default=Decimal('0'), ge=0)  # Cost of waiting, per supplier order
+    price_basis: PriceBasis = PriceBasis.LATEST
+
+
 class PurchaseAnalytics(BaseModel):
     total_orders: int
     total_spent: Decimal
@@ -0,0 +1,87 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List
+from datetime import datetime, date, time
+from enum import Enum
+
+
+class WorkScheduleStatus(str, Enum):
+    SCHEDULED = "scheduled"
+    CONFIRMED = "confirmed"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+class PunchType(str, Enum):
+    IN = "in"
+    OUT = "out"
+
+
+class WorkScheduleBase(BaseModel):
+    staff_id: int = Field(..., gt=0)
+    schedule_date: date
+    start_time: time
+    end_time: time
+    break_start: Optional[time] = None
+    break_end: Optional[time] = None
+    status: WorkScheduleStatus = WorkScheduleStatus.SCHEDULED
+    is_overtime: bool = False
+    notes: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_times(self):
+        if self.start_time == self.end_time:
+            raise ValueError('Shift start and end times must differ')
+        if (self.break_start is None) != (self.break_end is None):
+            raise ValueError('Break start and end must be given together')
+        return self
+
+
+class WorkScheduleCreate(WorkScheduleBase):
+    pass
+
+
+class WorkScheduleInDB(WorkScheduleBase):
+    id: int
+    actual_start_time: Optional[datetime] = None
+    actual_end_time: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WorkSchedule(WorkScheduleInDB):
+    pass
+
+
+class TimePunchCreate(BaseModel):
+    staff_id: int = Field(..., gt=0)
+    punched_at: Optional[datetime] = None  # Defaults to the time the server receives it
+    idempotency_key: Optional[str] = Field(None, min_length=1, max_length=100)
+    source: Optional[str] = Field(None, max_length=20)
+
+
+class TimePunchBatchItem(TimePunchCreate):
+    punch_type: PunchType
+    idempotency_key: str = Field(..., min_length=1, max_length=100)
+
+
+class TimePunchBatch(BaseModel):
+    punches: List[TimePunchBatchItem] = Field(..., min_items=1, max_items=500)
+
+
+class TimePunch(BaseModel):
+    id: int
+    staff_id: int
+    work_schedule_id: Optional[int] = None
+    punch_type: PunchType
+    punched_at: datetime
+    idempotency_key: str
+    source: Optional[str] = None
+    late_minutes: Optional[int] = None
+    overtime_minutes: Optional[int] = None
+    worked_minutes: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,532 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime, date, timedelta
+import numpy as np
+from sqlalchemy.orm import Session
+from decimal import Decimal
+from sqlalchemy import and_, func, select, update
+
+from ..models.inventory import InventoryItem, StockMovement, InventoryBatch
+from ..models.purchases import PurchaseOrder, PurchaseOrderItem
+from ..core.cache import VersionedCache
+from ..core.config import settings
+from ..utils.optimization import BusinessOptimizer
+from ..utils.predictions import DemandPredictor
+from ..utils.sql import days_between
+from .orders import OrderService
+from .recipes import RecipeService
+
+
+_optimization_cache = VersionedCache()
+
+
+class InventoryService:
+
+    @staticmethod
+    def adjust_stock(db: Session, item_id: int, delta: Decimal) -> None:
+        """Atomically add `delta` (negative to deplete) to an item's current stock"""
+        db.execute(
+            update(InventoryItem)
+            .where(InventoryItem.id == item_id)
+            .values(current_stock=InventoryItem.current_stock + delta)
+        )
+
+    @staticmethod
+    def receive_batch(
+        db: Session,
+        item_id: int,
+        quantity: Decimal,
+        user_id: int,
+        batch_number: Optional[str] = None,
+        expiry_date: Optional[datetime] = None,
+        unit_cost: Optional[Decimal] = None,
+        notes: Optional[str] = None
+    ) -> InventoryBatch:
+        """
+        Put a new batch into stock: batch row, purchase movement and stock
+        increment in the caller's transaction
+        """
+        batch = InventoryBatch(
+            inventory_item_id=item_id,
+            batch_number=batch_number,
+            expiry_date=expiry_date,
+            quantity_received=quantity,
+            quantity_remaining=quantity,
+            unit_cost=unit_cost
+        )
+        db.add(batch)
+        db.flush()
+
+        db.add(StockMovement(
+            inventory_item_id=item_id,
+            movement_type="purchase",
+            quantity=quantity,
+            unit_cost=unit_cost,
+            total_cost=(quantity * unit_cost).quantize(Decimal("0.01")) if unit_cost is not None else None,
+            reference_type="adjustment",
+            notes=notes,
+            batch_id=batch.id,
+            batch_number=batch_number,
+            expiry_date=expiry_date,
+            created_by=user_id
+        ))
+        InventoryService.adjust_stock(db, item_id, quantity)
+        return batch
+
+    @staticmethod
+    def consume_fefo(
+        db: Session,
+        item_id: int,
+        quantity: Decimal,
+        user_id: int,
+        movement_type: str = "usage",
+        reference_type: Optional[str] = None,
+        reference_id: Optional[int] = None,
+        notes: Optional[str] = None,
+        reason: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Deplete stock first-expired-first-out. Open batches are locked and
+        drained in expiry order (batches without expiry last); one negative
+        movement is written per batch touched, and any quantity beyond batch
+        stock (e.g. stock recorded before batch tracking) is booked unbatched.
+        Runs in the caller's transaction.
+        """
+        batches = db.query(InventoryBatch).filter(
+            and_(
+                InventoryBatch.inventory_item_id == item_id,
+                InventoryBatch.quantity_remaining > 0
+            )
+        ).order_by(
+            InventoryBatch.expiry_date.is_(None),
+            InventoryBatch.expiry_date,
+            InventoryBatch.received_at,
+            InventoryBatch.id
+        ).with_for_update().all()
+
+        remaining = Decimal(quantity)
+        movements = []
+        total_cost = Decimal("0")
+
+        for batch in batches:
+            if remaining <= 0:
+                break
+            taken = min(remaining, batch.quantity_remaining)
+            batch.quantity_remaining -= taken
+            remaining -= taken
+
+            cost = (taken * batch.unit_cost).quantize(Decimal("0.01")) if batch.unit_cost is not None else None
+            total_cost += cost or Decimal("0")
+            movements.append(StockMovement(
+                inventory_item_id=item_id,
+                movement_type=movement_type,
+                quantity=-taken,
+                unit_cost=batch.unit_cost,
+                total_cost=cost,
+                reference_type=reference_type,
+                reference_id=reference_id,
+                notes=notes,
+                reason=reason,
+                batch_id=batch.id,
+                batch_number=batch.batch_number,
+                expiry_date=batch.expiry_date,
+                created_by=user_id
+            ))
+
+        unbatched = remaining
+        if unbatched > 0:
+            unit_cost = db.query(InventoryItem.cost_per_unit).filter(InventoryItem.id == item_id).scalar()
+            cost = (unbatched * unit_cost).quantize(Decimal("0.01")) if unit_cost is not None else None
+            total_cost += cost or Decimal("0")
+            movements.append(StockMovement(
+                inventory_item_id=item_id,
+                movement_type=movement_type,
+                quantity=-unbatched,
+                unit_cost=unit_cost,
+                total_cost=cost,
+                reference_type=reference_type,
+                reference_id=reference_id,
+                notes=notes,
+                reason=reason,
+                created_by=user_id
+            ))
+
+        db.add_all(movements)
+        InventoryService.adjust_stock(db, item_id, -Decimal(quantity))
+
+        return {
+            "inventory_item_id": item_id,
+            "quantity": Decimal(quantity),
+            "total_cost": total_cost,
+            "unbatched_quantity": unbatched,
+            "movements": movements
+        }
+
+    @staticmethod
+    def get_expiring_batches(db: Session, hours: int, limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        Open batches expiring within `hours`, soonest first. Served by the
+        partial expiry index, so cost depends on the number of open batches in
+        the window rather than on the size of the movement ledger.
+        """
+        now = datetime.now()
+        horizon = now + timedelta(hours=hours)
+
+        rows = db.query(
+            InventoryBatch.id,
+            InventoryBatch.inventory_item_id,
+            InventoryBatch.batch_number,
+            InventoryBatch.expiry_date,
+            InventoryBatch.quantity_remaining,
+            InventoryBatch.unit_cost,
+            InventoryItem.name,
+            InventoryItem.unit,
+            InventoryItem.cost_per_unit
+        ).join(
+            InventoryItem, InventoryItem.id == InventoryBatch.inventory_item_id
+        ).filter(
+            and_(
+                InventoryBatch.quantity_remaining > 0,
+                InventoryBatch.expiry_date.isnot(None),
+                InventoryBatch.expiry_date <= horizon
+            )
+        ).order_by(InventoryBatch.expiry_date).limit(limit).all()
+
+        expiring = []
+        for row in rows:
+            reference_now = datetime.now(row.expiry_date.tzinfo) if row.expiry_date.tzinfo else now
+            unit_cost = row.unit_cost if row.unit_cost is not None else row.cost_per_unit
+            expiring.append({
+                "batch_id": row.id,
+                "inventory_item_id": row.inventory_item_id,
+                "item_name": row.name,
+                "unit": row.unit,
+                "batch_number": row.batch_number,
+                "expiry_date": row.expiry_date,
+                "quantity_remaining": row.quantity_remaining,
+                "value_at_risk": (row.quantity_remaining * (unit_cost or 0)).quantize(Decimal("0.01")),
+                "hours_left": round((row.expiry_date - reference_now).total_seconds() / 3600, 1)
+            })
+        return expiring
+
+    @staticmethod
+    def get_stock_version(db: Session) -> tuple:
+        """
+        Watermark that changes whenever a stock movement is recorded or an
+        inventory item is created/edited. Used to invalidate cached analytics.
+        """
+        return db.execute(
+            select(
+                select(func.max(StockMovement.id)).scalar_subquery(),
+                select(func.count(InventoryItem.id)).scalar_subquery(),
+                select(func.max(InventoryItem.updated_at)).scalar_subquery()
+            )
+        ).one()
+
+    @staticmethod
+    def get_usage_statistics(db: Session, window_days: int) -> Dict[int, Dict[str, float]]:
+        """
+        Per-item daily usage mean and variance over the window, computed in a
+        single grouped query (daily totals subquery rolled up per item).
+        Days without usage count as zero-usage days; items with shorter history
+        than the window are averaged over the days since their first usage.
+        """
+        today = datetime.now().date()
+        since = datetime.now() - timedelta(days=window_days)
+        usage_day = func.date(StockMovement.created_at)
+
+        daily_usage = db.query(
+            StockMovement.inventory_item_id.label("item_id"),
+            usage_day.label("day"),
+            func.sum(func.abs(StockMovement.quantity)).label("quantity")
+        ).filter(
+            and_(
+                StockMovement.movement_type == "usage",
+                StockMovement.created_at >= since
+            )
+        ).group_by(StockMovement.inventory_item_id, usage_day).subquery()
+
+        rows = db.query(
+            daily_usage.c.item_id,
+            func.sum(daily_usage.c.quantity),
+            func.sum(daily_usage.c.quantity * daily_usage.c.quantity),
+            func.min(daily_usage.c.day)
+        ).group_by(daily_usage.c.item_id).all()
+
+        statistics = {}
+        for item_id, total, total_squares, first_day in rows:
+            if isinstance(first_day, str):
+                first_day = date.fromisoformat(first_day)
+            days = min(window_days, (today - first_day).days + 1) if first_day else window_days
+            days = max(days, 1)
+            total = float(total or 0)
+            total_squares = float(total_squares or 0)
+            mean = total / days
+            variance = max(total_squares / days - mean * mean, 0.0)
+            if days > 1:
+                variance *= days / (days - 1)
+            statistics[item_id] = {"mean": mean, "variance": variance}
+
+        return statistics
+
+    @staticmethod
+    def get_lead_times(db: Session) -> Dict[str, Dict[int, float]]:
+        """
+        Average supplier lead time (days) from received purchase orders,
+        per inventory item and per supplier
+        """
+        lead_time = days_between(db, PurchaseOrder.order_date, PurchaseOrder.actual_delivery_date)
+        received = PurchaseOrder.actual_delivery_date.isnot(None)
+
+        by_item = db.query(
+            PurchaseOrderItem.inventory_item_id,
+            func.avg(lead_time)
+        ).join(
+            PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id
+        ).filter(received).group_by(PurchaseOrderItem.inventory_item_id).all()
+
+        by_supplier = db.query(
+            PurchaseOrder.supplier_id,
+            func.avg(lead_time)
+        ).filter(received).group_by(PurchaseOrder.supplier_id).all()
+
+        return {
+            "items": {item_id: max(float(days), 0.0) for item_id, days in by_item if days is not None},
+            "suppliers": {supplier_id: max(float(days), 0.0) for supplier_id, days in by_supplier if days is not None}
+        }
+
+    @staticmethod
+    def get_inventory_optimization(db: Session) -> Dict[str, Any]:
+        """
+        Reorder points, safety stock and EOQ for every inventory item.
+        Cached until the next stock movement (or inventory item change).
+        """
+        version = InventoryService.get_stock_version(db)
+        return _optimization_cache.get_or_compute(
+            "inventory_optimization",
+            version,
+            lambda: InventoryService._compute_inventory_optimization(db)
+        )
+
+    @staticmethod
+    def _compute_inventory_optimization(db: Session) -> Dict[str, Any]:
+        window_days = settings.INVENTORY_USAGE_WINDOW_DAYS
+        usage = InventoryService.get_usage_statistics(db, window_days)
+        lead_times = InventoryService.get_lead_times(db)
+
+        items = db.query(
+            InventoryItem.id,
+            InventoryItem.name,
+            InventoryItem.category,
+            InventoryItem.unit,
+            InventoryItem.current_stock,
+            InventoryItem.min_threshold,
+            InventoryItem.max_threshold,
+            InventoryItem.cost_per_unit,
+            InventoryItem.primary_supplier_id
+        ).order_by(InventoryItem.id).all()
+
+        inventory_data = []
+        for item in items:
+            stats = usage.get(item.id, {"mean": 0.0, "variance": 0.0})
+            lead_time = lead_times["items"].get(
+                item.id,
+                lead_times["suppliers"].get(item.primary_supplier_id, settings.DEFAULT_SUPPLIER_LEAD_TIME_DAYS)
+            )
+            inventory_data.append({
+                "id": item.id,
+                "name": item.name,
+                "current_stock": float(item.current_stock or 0),
+                "min_threshold": float(item.min_threshold or 0),
+                "daily_usage": stats["mean"],
+                "usage_variance": stats["variance"],
+                "supplier_lead_time": lead_time,
+                "order_cost": settings.INVENTORY_ORDER_COST,
+                "holding_cost": float(item.cost_per_unit or 0) * settings.INVENTORY_HOLDING_RATE
+            })
+
+        optimization = BusinessOptimizer.optimize_inventory_levels(
+            inventory_data,
+            {"service_level_z": settings.INVENTORY_SERVICE_LEVEL_Z}
+        )
+
+        item_details = {item.id: item for item in items}
+        recommended_stock_levels = []
+        reorder_points = []
+        cost_saving_opportunities = []
+
+        for policy in optimization["items"]:
+            item = item_details[policy["item_id"]]
+            recommended_max = policy["reorder_point"] + policy["economic_order_quantity"]
+
+            recommended_stock_levels.append({
+                "item_id": item.id,
+                "item_name": item.name,
+                "category": item.category,
+                "unit": item.unit,
+                "current_stock": policy["current_stock"],
+                "safety_stock": policy["safety_stock"],
+                "recommended_min": policy["reorder_point"],
+                "recommended_max": round(recommended_max, 3),
+                "current_min_threshold": float(item.min_threshold or 0),
+                "current_max_threshold": float(item.max_threshold) if item.max_threshold is not None else None
+            })
+
+            reorder_points.append({
+                "item_id": item.id,
+                "item_name": item.name,
+                "daily_usage": policy["daily_usage"],
+                "usage_std": policy["usage_std"],
+                "lead_time_days": policy["lead_time_days"],
+                "reorder_point": policy["reorder_point"],
+                "economic_order_quantity": policy["economic_order_quantity"],
+                "days_of_cover": policy["days_of_cover"],
+                "needs_reorder": policy["current_stock"] < policy["reorder_point"]
+            })
+
+            excess = policy["current_stock"] - recommended_max
+            if policy["daily_usage"] > 0 and excess > 0:
+                cost_saving_opportunities.append({
+                    "item_id": item.id,
+                    "item_name": item.name,
+                    "excess_stock": round(excess, 3),
+                    "tied_up_capital": round(excess * float(item.cost_per_unit or 0), 2),
+                    "suggestion": "Reduce order quantities until stock falls below the recommended maximum"
+                })
+
+        cost_saving_opportunities.sort(key=lambda x: x["tied_up_capital"], reverse=True)
+
+        return {
+            "generated_at": datetime.now(),
+            "usage_window_days": window_days,
+            "recommended_stock_levels": recommended_stock_levels,
+            "reorder_points": reorder_points,
+            "seasonal_adjustments": [],
+            "cost_saving_opportunities": cost_saving_opportunities,
+            "recommendations": optimization["recommendations"],
+            "total_items_to_reorder": optimization["total_items_to_reorder"],
+            "high_priority_items": optimization["high_priority_items"]
+        }
+
+    @staticmethod
+    def get_open_purchase_quantities(
+        db: Session,
+        ingredient_index: Dict[int, int],
+        start_date: date,
+        days: int
+    ) -> np.ndarray:
+        """
+        Outstanding purchase order quantities as a (days x ingredients) matrix
+        keyed by expected delivery day. Overdue deliveries land on day 0;
+        orders without an expected date assume the default lead time.
+        """
+        incoming = np.zeros((days, len(ingredient_index)))
+        if not ingredient_index or days <= 0:
+            return incoming
+
+        delivery_day = func.date(PurchaseOrder.expected_delivery_date)
+        rows = db.query(
+            PurchaseOrderItem.inventory_item_id,
+            delivery_day,
+            func.sum(PurchaseOrderItem.quantity_ordered - func.coalesce(PurchaseOrderItem.quantity_received, 0))
+        ).join(
+            PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id
+        ).filter(
+            PurchaseOrder.status.in_(["pending", "ordered"]),
+            PurchaseOrderItem.inventory_item_id.in_(list(ingredient_index.keys()))
+        ).group_by(PurchaseOrderItem.inventory_item_id, delivery_day).all()
+
+        default_day = int(np.ceil(settings.DEFAULT_SUPPLIER_LEAD_TIME_DAYS))
+        for item_id, expected_day, quantity in rows:
+            if expected_day is None:
+                day = default_day
+            else:
+                if isinstance(expected_day, str):
+                    expected_day = date.fromisoformat(expected_day)
+                day = (expected_day - start_date).days
+            if day < days and quantity:
+                incoming[max(day, 0), ingredient_index[item_id]] += float(quantity)
+
+        return incoming
+
+    @staticmethod
+    def get_ingredient_requirements(db: Session, days: int) -> Dict[str, Any]:
+        """
+        Project ingredient consumption for the next `days` days from the
+        item-level demand forecast and the recipe matrix, then compare it with
+        current stock plus open purchase orders to flag upcoming shortfalls.
+        All ingredients are projected together in one vectorized pass.
+        """
+        start_date = date.today()
+        history_start = start_date - timedelta(days=settings.DEMAND_HISTORY_DAYS)
+        recipe_matrix = RecipeService.get_recipe_matrix(db)
+
+        history = OrderService.get_item_demand_history(
+            db, history_start, start_date - timedelta(days=1), recipe_matrix.item_index
+        )
+        demand = DemandPredictor.predict_item_demand(history, history_start, start_date, days)
+        consumption = recipe_matrix.consumption(demand)  # days x ingredients
+
+        ingredient_ids = recipe_matrix.ingredient_ids
+        items = {
+            item.id: item
+            for item in db.query(
+                InventoryItem.id,
+                InventoryItem.name,
+                InventoryItem.unit,
+                InventoryItem.current_stock,
+                InventoryItem.min_threshold
+            ).filter(InventoryItem.id.in_(ingredient_ids)).all()
+        } if ingredient_ids else {}
+
+        # The cached matrix may still reference items deleted since it was built
+        present = np.array([i in items for i in ingredient_ids], dtype=bool)
+        current_stock = np.array([float(items[i].current_stock or 0) if i in items else 0.0 for i in ingredient_ids])
+        min_threshold = np.array([float(items[i].min_threshold or 0) if i in items else 0.0 for i in ingredient_ids])
+        incoming = InventoryService.get_open_purchase_quantities(
+            db, recipe_matrix.ingredient_index, start_date, days
+        )
+
+        projected_stock = current_stock + np.cumsum(incoming, axis=0) - np.cumsum(consumption, axis=0)
+        below_zero = projected_stock < 0
+        below_threshold = projected_stock < min_threshold
+        has_shortfall = below_zero.any(axis=0) & present
+        has_threshold_breach = below_threshold.any(axis=0) & present
+        first_shortfall = below_zero.argmax(axis=0)
+        first_threshold_breach = below_threshold.argmax(axis=0)
+        shortfall_quantity = np.maximum(-projected_stock.min(axis=0, initial=0), 0)
+
+        requirements = []
+        for j, item_id in enumerate(ingredient_ids):
+            item = items.get(item_id)
+            if item is None:
+                continue
+            requirements.append({
+                "item_id": item_id,
+                "item_name": item.name,
+                "unit": item.unit,
+                "current_stock": round(float(current_stock[j]), 3),
+                "open_purchase_quantity": round(float(incoming[:, j].sum()), 3),
+                "projected_consumption": round(float(consumption[:, j].sum()), 3),
+                "daily_consumption": [round(float(q), 3) for q in consumption[:, j]],
+                "projected_end_stock": round(float(projected_stock[-1, j]), 3) if days > 0 else round(float(current_stock[j]), 3),
+                "shortfall": bool(has_shortfall[j]),
+                "shortfall_date": start_date + timedelta(days=int(first_shortfall[j])) if has_shortfall[j] else None,
+                "days_until_shortfall": int(first_shortfall[j]) if has_shortfall[j] else None,
+                "shortfall_quantity": round(float(shortfall_quantity[j]), 3),
+                "below_threshold_date": start_date + timedelta(days=int(first_threshold_breach[j])) if has_threshold_breach[j] else None
+            })
+
+        requirements.sort(key=lambda r: (
+            r["days_until_shortfall"] if r["days_until_shortfall"] is not None else days + 1,
+            r["item_name"]
+        ))
+
+        return {
+            "forecast_start": start_date,
+            "forecast_days": days,
+            "history_days": settings.DEMAND_HISTORY_DAYS,
+            "menu_items": len(recipe_matrix.menu_item_ids),
+            "ingredients": requirements,
+            "shortfall_count": int(has_shortfall.sum()),
+            "threshold_breach_count": int(has_threshold_breach.sum())
+        }
@@ -0,0 +1,444 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+import math
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case
+
+from ..models.orders import Order, PlatformPause
+from ..models.menu import MenuItem
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.events import order_events
+from ..utils.kitchen import KitchenQueue
+from ..utils.load import LoadGovernor
+from ..utils.sql import seconds_between, dialect_insert
+
+
+logger = logging.getLogger(__name__)
+
+
+def _new_queue() -> KitchenQueue:
+    return KitchenQueue(settings.KITCHEN_OVEN_CAPACITY, settings.KITCHEN_ETA_CALIBRATION_ALPHA)
+
+
+def _new_governor() -> LoadGovernor:
+    return LoadGovernor(
+        window=settings.LOAD_WINDOW_MINUTES * 60,
+        busy_backlog_minutes=settings.LOAD_BUSY_BACKLOG_MINUTES,
+        overload_backlog_minutes=settings.LOAD_OVERLOAD_BACKLOG_MINUTES,
+        busy_arrivals=settings.LOAD_BUSY_ORDERS_PER_WINDOW,
+        overload_arrivals=settings.LOAD_OVERLOAD_ORDERS_PER_WINDOW,
+        quote_extra_minutes=settings.LOAD_QUOTE_EXTRA_MINUTES,
+        pausable=settings.LOAD_PAUSABLE_PLATFORMS,
+        resume_ratio=settings.LOAD_RESUME_RATIO,
+        min_pause=settings.LOAD_MIN_PAUSE_MINUTES * 60
+    )
+
+
+kitchen_queue = _new_queue()
+load_governor = _new_governor()
+
+
+def _seconds(value: datetime) -> float:
+    return value.timestamp()
+
+
+def _datetime(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds)
+
+
+class KitchenService:
+
+    @staticmethod
+    def order_load(items: List[Dict[str, Any]], prep_times: Dict[int, int]) -> Tuple[float, float]:
+        """
+        (work, duration) of an order in minutes: oven slot-minutes over all
+        units, and its longest item
+        """
+        default = settings.KITCHEN_DEFAULT_PREP_MINUTES
+        work, duration = 0.0, 0.0
+        for item in items:
+            minutes = prep_times.get(item.get("menu_item_id")) or default
+            work += minutes * item.get("quantity", 1)
+            duration = max(duration, minutes)
+        return work, duration
+
+    @staticmethod
+    def quote(items: List[Dict[str, Any]], prep_times: Dict[int, int], now: datetime) -> datetime:
+        """
+        Quoted ready time for a new order given the current kitchen load,
+        lengthened while the load governor reports the kitchen busy
+        """
+        work, duration = KitchenService.order_load(items, prep_times)
+        ready = kitchen_queue.quote(work, duration, _seconds(now))
+        return _datetime(ready) + timedelta(minutes=load_governor.quote_extension_minutes())
+
+    @staticmethod
+    def add_order(
+        order_id: int,
+        platform: str,
+        items: List[Dict[str, Any]],
+        prep_times: Dict[int, int],
+        created_at: datetime,
+        quoted_ready_at: datetime
+    ) -> None:
+        work, duration = KitchenService.order_load(items, prep_times)
+        kitchen_queue.add(order_id, work, duration, _seconds(created_at), _seconds(quoted_ready_at))
+        load_governor.record_order(platform, _seconds(created_at))
+        KitchenService.evaluate_load()
+
+    @staticmethod
+    def evaluate_load(now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Re-check the load governor; level and pause changes are broadcast as load.changed"""
+        now_seconds = _seconds(now or datetime.now())
+        before = dict(load_governor.paused)
+        changed = load_governor.evaluate(now_seconds, kitchen_queue.backlog_minutes(now_seconds))
+        if changed is not None:
+            KitchenService._save_automatic_pauses(before, changed["paused_platforms"])
+            order_events.publish("load.changed", KitchenService._load_payload(changed))
+        return changed
+
+    @staticmethod
+    def _save_automatic_pauses(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> None:
+        """Record automatic pauses and resumes in platform_pauses for the other workers"""
+        paused = [platform for platform, pause in after.items() if platform not in before and not pause["manual"]]
+        resumed = [platform for platform, pause in before.items() if platform not in after and not pause["manual"]]
+        if not paused and not resumed:
+            return
+        db = SessionLocal()
+        try:
+            for platform in paused:
+                db.execute(dialect_insert(db, PlatformPause).values(
+                    platform=platform, manual=False, paused_at=_datetime(after[platform]["since"])
+                ).on_conflict_do_nothing(index_elements=["platform"]))
+            if resumed:
+                db.query(PlatformPause).filter(
+                    PlatformPause.platform.in_(resumed),
+                    PlatformPause.manual == False
+                ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Could not save automatic platform pauses")
+        finally:
+            db.close()
+
+    @staticmethod
+    def sync_load(db: Session) -> Optional[Dict[str, Any]]:
+        """
+        Reload the arrival window and platform pauses from the database, so
+        every API worker throttles on the same numbers, and re-evaluate
+        """
+        window_start = datetime.now() - timedelta(minutes=settings.LOAD_WINDOW_MINUTES)
+        arrivals = db.query(Order.created_at, Order.platform).filter(
+            Order.created_at >= window_start
+        ).order_by(Order.created_at).all()
+        pauses = db.query(PlatformPause).all()
+
+        load_governor.reset_arrivals([(_seconds(created_at), platform) for created_at, platform in arrivals])
+        load_governor.set_paused({
+            pause.platform: {"since": _seconds(pause.paused_at), "manual": pause.manual}
+            for pause in pauses
+        })
+        return KitchenService.evaluate_load()
+
+    @staticmethod
+    def sync_load_now() -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            return KitchenService.sync_load(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    def apply_load_event(event: Dict[str, Any]) -> None:
+        """Take the pauses from a load.changed event (possibly raised by another worker)"""
+        load_governor.set_paused({
+            platform: {"since": _seconds(datetime.fromisoformat(pause["since"])), "manual": pause["manual"]}
+            for platform, pause in (event.get("paused_platforms") or {}).items()
+        })
+
+    @staticmethod
+    async def follow_shared_load() -> None:
+        """
+        Keep this worker's governor in step with the others until cancelled:
+        apply load.changed events as they arrive (from every worker with
+        EVENT_BROKER=redis) and resync from the database every
+        LOAD_SYNC_SECONDS
+        """
+        subscription = order_events.subscribe()
+        loop = asyncio.get_running_loop()
+        next_sync = loop.time() + settings.LOAD_SYNC_SECONDS
+        try:
+            while True:
+                event = await subscription.get(max(next_sync - loop.time(), 0))
+                if event and event.get("type") == "load.changed":
+                    try:
+                        KitchenService.apply_load_event(event)
+                    except (KeyError, TypeError, ValueError):
+                        logger.warning("Ignoring malformed load.changed event")
+                if loop.time() >= next_sync:
+                    try:
+                        await asyncio.to_thread(KitchenService.sync_load_now)
+                    except Exception:
+                        logger.exception("Could not sync the kitchen load from the database")
+                    next_sync = loop.time() + settings.LOAD_SYNC_SECONDS
+        finally:
+            order_events.unsubscribe(subscription)
+
+    @staticmethod
+    def is_paused(platform: str) -> bool:
+        return load_governor.is_paused(platform)
+
+    @staticmethod
+    def get_load(db: Session) -> Dict[str, Any]:
+        KitchenService.sync_load(db)
+        now = datetime.now()
+        return {
+            **KitchenService._load_payload(load_governor.state(_seconds(now))),
+            "kitchen": kitchen_queue.stats(_seconds(now))
+        }
+
+    @staticmethod
+    def set_platform_paused(db: Session, platform: str, paused: bool) -> Dict[str, Any]:
+        """
+        Pause or resume a platform by hand (manual pauses never lift
+        automatically). The pause is stored in platform_pauses and broadcast
+        so every worker applies it.
+        """
+        now = datetime.now()
+        if paused:
+            stmt = dialect_insert(db, PlatformPause).values(platform=platform, manual=True, paused_at=now)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["platform"],
+                set_={"manual": True, "paused_at": now}
+            ))
+        else:
+            db.query(PlatformPause).filter(PlatformPause.platform == platform).delete(synchronize_session=False)
+        db.commit()
+
+        state = load_governor.pause(platform, _seconds(now)) if paused else load_governor.resume(platform, _seconds(now))
+        payload = KitchenService._load_payload(state)
+        order_events.publish("load.changed", payload)
+        return payload
+
+    @staticmethod
+    def _load_payload(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **state,
+            "level_since": _datetime(state["level_since"]) if state["level_since"] else None,
+            "paused_platforms": {
+                platform: {"since": _datetime(pause["since"]), "manual": pause["manual"]}
+                for platform, pause in state["paused_platforms"].items()
+            }
+        }
+
+    @staticmethod
+    def apply_status_changes(changes: List[Dict[str, Any]]) -> None:
+        """Keep the queue in step with committed transitions (rows returned by them)"""
+        for change in changes:
+            order_id = change.get("id", change.get("order_id"))
+            if change["status"] == "preparing" and change.get("preparing_at"):
+                kitchen_queue.start(order_id, _seconds(change["preparing_at"]))
+            elif change["status"] == "ready" and change.get("ready_at"):
+                kitchen_queue.finish(order_id, _seconds(change["ready_at"]))
+            elif change["status"] in ("delivered", "cancelled"):
+                kitchen_queue.finish(order_id)
+        if changes:
+            KitchenService.evaluate_load()
+
+    @staticmethod
+    def rebuild(db: Session, calibrate: bool = False) -> Dict[str, Any]:
+        """
+        Reload pending and preparing orders into the queue (each API worker
+        keeps its own) and the shared arrivals and pauses into the load
+        governor. With `calibrate` the ETA factor is seeded from the recent
+        quoted vs actual ready times.
+        """
+        prep_times = dict(db.query(MenuItem.id, MenuItem.preparation_time).all())
+        rows = db.query(
+            Order.id, Order.items, Order.created_at, Order.preparing_at, Order.quoted_ready_at
+        ).filter(
+            Order.status.in_(["pending", "preparing"])
+        ).all()
+
+        orders = []
+        for row in rows:
+            work, duration = KitchenService.order_load(row.items or [], prep_times)
+            orders.append({
+                "order_id": row.id,
+                "work": work,
+                "duration": duration,
+                "created_at": _seconds(row.created_at),
+                "quoted_ready_at": _seconds(row.quoted_ready_at) if row.quoted_ready_at else None,
+                "started_at": _seconds(row.preparing_at) if row.preparing_at else None
+            })
+        orders.sort(key=lambda order: order["created_at"])
+
+        factor = KitchenService._recent_factor(db) if calibrate else None
+        kitchen_queue.reset(orders, factor)
+        KitchenService.sync_load(db)
+        return {"orders": len(orders), "calibration_factor": kitchen_queue.factor}
+
+    @staticmethod
+    def _recent_factor(db: Session) -> Optional[float]:
+        """Geometric mean of actual / quoted lead time over the latest ready orders"""
+        rows = db.query(Order.created_at, Order.quoted_ready_at, Order.ready_at).filter(
+            Order.quoted_ready_at.isnot(None),
+            Order.ready_at.isnot(None)
+        ).order_by(Order.ready_at.desc()).limit(settings.KITCHEN_ETA_CALIBRATION_SAMPLES).all()
+
+        logs = []
+        for created_at, quoted_ready_at, ready_at in rows:
+            quoted = (quoted_ready_at - created_at).total_seconds()
+            actual = (ready_at - created_at).total_seconds()
+            if quoted > 0 and actual > 0:
+                logs.append(math.log(actual / quoted))
+        return math.exp(sum(logs) / len(logs)) if logs else None
+
+    @staticmethod
+    def rebuild_job() -> Dict[str, Any]:
+        """Scheduled job: resync this worker's queue with orders changed by other workers"""
+        db = SessionLocal()
+        try:
+            return KitchenService.rebuild(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_queue(limit: int = 20) -> Dict[str, Any]:
+        now = datetime.now()
+        return {
+            **kitchen_queue.stats(_seconds(now)),
+            "next_up": [
+                {
+                    "order_id": order["order_id"],
+                    "work_minutes": order["work"],
+                    "created_at": _datetime(order["created_at"]),
+                    "quoted_ready_at": _datetime(order["quoted_ready_at"])
+                }
+                for order in kitchen_queue.next_up(limit)
+            ]
+        }
+
+    @staticmethod
+    def get_eta_accuracy(db: Session, start_date: date, end_date: date) -> Dict[str, Any]:
+        """Quoted vs actual ready times of orders created in a period, in one aggregate query"""
+        error = seconds_between(db, Order.quoted_ready_at, Order.ready_at)
+        tolerance = settings.KITCHEN_ETA_TOLERANCE_MINUTES * 60
+        row = db.query(
+            func.count(Order.id).label("orders"),
+            func.avg(error).label("mean_error"),
+            func.avg(func.abs(error)).label("mean_abs_error"),
+            func.sum(case((func.abs(error) <= tolerance, 1), else_=0)).label("within_tolerance"),
+            func.sum(case((error > tolerance, 1), else_=0)).label("late")
+        ).filter(
+            Order.created_at >= datetime.combine(start_date, datetime.min.time()),
+            Order.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
+            Order.quoted_ready_at.isnot(None),
+            Order.ready_at.isnot(None)
+        ).one()
+
+        orders = row.orders or 0
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "orders": orders,
+            "mean_error_minutes": round(float(row.mean_error) / 60, 2) if orders else None,
+            "mean_abs_error_minutes": round(float(row.mean_abs_error) / 60, 2) if orders else None,
+            "within_tolerance_rate": round((row.within_tolerance or 0) / orders, 3) if orders else None,
+            "late_rate": round((row.late or 0) / orders, 3) if orders else None,
+            "tolerance_minutes": settings.KITCHEN_ETA_TOLERANCE_MINUTES,
+            "calibration_factor": round(kitchen_queue.factor, 3)
+        }
+
+    @staticmethod
+    def simulate_load(
+        arrivals_per_hour: Dict[str, float],
+        minutes: int,
+        items_per_order: float,
+        prep_minutes: float,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Replay a Poisson arrival pattern minute by minute against a fresh
+        kitchen queue and load governor with the current settings. Ovens
+        take pending orders first-come first-served while they have free
+        slots; orders from paused platforms are counted as diverted.
+        """
+        rng = np.random.default_rng(seed)
+        queue, governor = _new_queue(), _new_governor()
+        capacity = queue.capacity
+        work, duration = items_per_order * prep_minutes, prep_minutes
+        rate = work / duration
+
+        start = 0.0
+        pending = deque()
+        in_oven: List[Tuple[float, int]] = []
+        next_id = 0
+        accepted = {platform: 0 for platform in arrivals_per_hour}
+        diverted = {platform: 0 for platform in arrivals_per_hour}
+        level_minutes: Dict[str, int] = {}
+        lead_times, timeline = [], []
+        max_backlog = 0.0
+
+        for minute in range(minutes):
+            now = start + minute * 60
+
+            # Finish orders whose oven time is over, then fill free slots
+            still = []
+            for finish_at, order_id in in_oven:
+                if finish_at <= now:
+                    queue.finish(order_id)
+                else:
+                    still.append((finish_at, order_id))
+            in_oven = still
+            while pending and ((len(in_oven) + 1) * rate <= capacity + 1e-9 or not in_oven):
+                order_id = pending.popleft()
+                queue.start(order_id, now)
+                in_oven.append((now + duration * 60, order_id))
+
+            for platform, hourly in arrivals_per_hour.items():
+                for _ in range(rng.poisson(hourly / 60)):
+                    if governor.is_paused(platform):
+                        diverted[platform] += 1
+                        continue
+                    quoted = queue.quote(work, duration, now) + governor.quote_extension_minutes() * 60
+                    queue.add(next_id, work, duration, now, quoted)
+                    governor.record_order(platform, now)
+                    pending.append(next_id)
+                    lead_times.append((quoted - now) / 60)
+                    accepted[platform] += 1
+                    next_id += 1
+
+            backlog = queue.backlog_minutes(now)
+            governor.evaluate(now, backlog)
+            state = governor.state(now)
+            level_minutes[state["level"]] = level_minutes.get(state["level"], 0) + 1
+            max_backlog = max(max_backlog, backlog)
+            timeline.append({
+                "minute": minute,
+                "level": state["level"],
+                "backlog_minutes": round(backlog, 1),
+                "pending": len(pending),
+                "in_oven": len(in_oven),
+                "arrivals_in_window": state["arrivals"],
+                "quote_minutes": round((queue.quote(work, duration, now) - now) / 60 + governor.quote_extension_minutes(), 1),
+                "paused_platforms": sorted(state["paused_platforms"])
+            })
+
+        return {
+            "minutes": minutes,
+            "capacity": capacity,
+            "accepted": accepted,
+            "diverted": diverted,
+            "minutes_by_level": level_minutes,
+            "max_backlog_minutes": round(max_backlog, 1),
+            "average_quote_minutes": round(float(np.mean(lead_times)), 1) if lead_times else None,
+            "max_quote_minutes": round(max(lead_times), 1) if lead_times else None,
+            "timeline": timeline
+        }
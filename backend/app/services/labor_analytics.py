@@ -0,0 +1,282 @@
+from typing import Dict, Any, Optional
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from ..models.orders import Order
+from ..models.staff import Staff, WorkSchedule
+from ..core.config import settings
+from ..utils.sql import hours_since
+
+
+# Shifts are spread over the hour grid in chunks to bound memory
+SHIFT_CHUNK = 512
+
+
+class LaborAnalyticsService:
+
+    @staticmethod
+    def get_labor_metrics(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        basis: str = "auto",
+        include_hourly: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Sales per labor hour (SPLH) and labor cost percentage by hour of day,
+        day and position. Orders are bucketed per hour in SQL; shift time is
+        spread over the same hourly buckets with numpy.
+
+        basis: "scheduled" (planned shift times), "worked" (clock times) or
+        "auto" (clock times where a shift has both, planned otherwise).
+        """
+        origin = datetime.combine(start_date, datetime.min.time())
+        horizon = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        n_hours = (end_date - start_date).days * 24 + 24
+
+        orders, revenue = LaborAnalyticsService._order_buckets(db, origin, horizon, n_hours)
+        positions, labor_hours, labor_cost = LaborAnalyticsService._labor_buckets(
+            db, start_date, end_date, origin, n_hours, basis
+        )
+        total_hours = labor_hours.sum(axis=0)
+        total_cost = labor_cost.sum(axis=0)
+
+        def metrics(order_count, sales, hours, cost) -> Dict[str, Any]:
+            sales, hours, cost = float(sales), float(hours), float(cost)
+            return {
+                "orders": int(order_count),
+                "revenue": round(sales, 2),
+                "labor_hours": round(hours, 2),
+                "labor_cost": round(cost, 2),
+                "splh": round(sales / hours, 2) if hours > 0 else None,
+                "orders_per_labor_hour": round(int(order_count) / hours, 2) if hours > 0 else None,
+                "labor_cost_percentage": round(cost / sales * 100, 2) if sales > 0 else None
+            }
+
+        # (days, 24) views of the hourly series
+        days = n_hours // 24
+        daily = [array.reshape(days, 24) for array in (orders, revenue, total_hours, total_cost)]
+
+        by_hour = [
+            {"hour": hour, **metrics(*(array[:, hour].sum() for array in daily))}
+            for hour in range(24)
+            if daily[0][:, hour].any() or daily[2][:, hour].any()
+        ]
+        by_day = [
+            {
+                "date": start_date + timedelta(days=d),
+                **metrics(*(array[d].sum() for array in daily))
+            }
+            for d in range(days)
+        ]
+        weekdays = np.array([(start_date + timedelta(days=d)).weekday() for d in range(days)])
+        by_weekday = [
+            {
+                "weekday": calendar_day,
+                **metrics(*(array[weekdays == index].sum() for array in daily))
+            }
+            for index, calendar_day in enumerate(
+                ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+            )
+            if (weekdays == index).any()
+        ]
+
+        total_revenue = revenue.sum()
+        by_position = []
+        for p, position in enumerate(positions):
+            position_hours = labor_hours[p].reshape(days, 24).sum(axis=0)
+            by_position.append({
+                "position": position,
+                **metrics(orders.sum(), total_revenue, labor_hours[p].sum(), labor_cost[p].sum()),
+                "labor_hours_by_hour": {hour: round(float(position_hours[hour]), 2) for hour in range(24) if position_hours[hour] > 0}
+            })
+
+        result = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "basis": basis,
+            "totals": metrics(orders.sum(), total_revenue, total_hours.sum(), total_cost.sum()),
+            "by_hour": by_hour,
+            "by_day": by_day,
+            "by_weekday": by_weekday,
+            "by_position": by_position
+        }
+        if include_hourly:
+            result["hourly"] = [
+                {"start": origin + timedelta(hours=h), **metrics(orders[h], revenue[h], total_hours[h], total_cost[h])}
+                for h in range(n_hours)
+                if orders[h] or total_hours[h]
+            ]
+        return result
+
+    @staticmethod
+    def _order_buckets(db: Session, origin: datetime, horizon: datetime, n_hours: int):
+        """Order counts and revenue per hour since `origin`, one grouped query"""
+        bucket = hours_since(db, origin, Order.created_at)
+        rows = db.query(
+            bucket,
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.total), 0)
+        ).filter(
+            Order.created_at >= origin,
+            Order.created_at < horizon,
+            Order.status != "cancelled"
+        ).group_by(bucket).all()
+
+        orders = np.zeros(n_hours)
+        revenue = np.zeros(n_hours)
+        for hour, count, total in rows:
+            if 0 <= hour < n_hours:
+                orders[hour] = count
+                revenue[hour] = float(total)
+        return orders, revenue
+
+    @staticmethod
+    def _labor_buckets(db: Session, start_date: date, end_date: date, origin: datetime, n_hours: int, basis: str):
+        """
+        Labor hours and cost per position and hour: each shift contributes the
+        overlap of its interval with every hourly bucket, times its rate
+        """
+        rows = db.query(
+            Staff.position,
+            Staff.hourly_rate,
+            WorkSchedule.schedule_date,
+            WorkSchedule.start_time,
+            WorkSchedule.end_time,
+            WorkSchedule.break_start,
+            WorkSchedule.break_end,
+            WorkSchedule.actual_start_time,
+            WorkSchedule.actual_end_time
+        ).join(
+            Staff, Staff.id == WorkSchedule.staff_id
+        ).filter(
+            WorkSchedule.schedule_date >= start_date - timedelta(days=1),
+            WorkSchedule.schedule_date <= end_date,
+            WorkSchedule.status != "cancelled"
+        ).all()
+
+        positions = sorted({row.position for row in rows})
+        position_index = {position: p for p, position in enumerate(positions)}
+        default_rate = settings.DEFAULT_STAFF_HOURLY_RATE
+
+        # Paid intervals in hours since origin (breaks split a shift in two)
+        starts, ends, rates, owners = [], [], [], []
+        for row in rows:
+            use_actual = (
+                basis == "worked" or basis == "auto"
+            ) and row.actual_start_time is not None and row.actual_end_time is not None
+            if basis == "worked" and not use_actual:
+                continue
+
+            start = datetime.combine(row.schedule_date, row.start_time)
+            end = datetime.combine(row.schedule_date, row.end_time)
+            if end <= start:
+                end += timedelta(days=1)
+            if use_actual:
+                # Clock times replace the planned span; the planned break is
+                # still unpaid wherever it falls inside the punched interval
+                start = LaborAnalyticsService._naive(row.actual_start_time)
+                end = LaborAnalyticsService._naive(row.actual_end_time)
+            pieces = [(start, end)]
+            if row.break_start and row.break_end:
+                break_start, break_end = LaborAnalyticsService._break_interval(row)
+                pieces = [(start, min(break_start, end)), (max(break_end, start), end)]
+
+            rate = float(row.hourly_rate) if row.hourly_rate else default_rate
+            for piece_start, piece_end in pieces:
+                if piece_end > piece_start:
+                    starts.append((piece_start - origin).total_seconds() / 3600)
+                    ends.append((piece_end - origin).total_seconds() / 3600)
+                    rates.append(rate)
+                    owners.append(position_index[row.position])
+
+        labor_hours = np.zeros((len(positions), n_hours))
+        labor_cost = np.zeros((len(positions), n_hours))
+        if not starts:
+            return positions, labor_hours, labor_cost
+
+        starts, ends, rates, owners = map(np.array, (starts, ends, rates, owners))
+        grid = np.arange(n_hours + 1, dtype=float)
+        for offset in range(0, len(starts), SHIFT_CHUNK):
+            chunk = slice(offset, offset + SHIFT_CHUNK)
+            overlap = np.clip(
+                np.minimum(ends[chunk, None], grid[None, 1:]) - np.maximum(starts[chunk, None], grid[None, :-1]),
+                0,
+                None
+            )
+            np.add.at(labor_hours, owners[chunk], overlap)
+            np.add.at(labor_cost, owners[chunk], overlap * rates[chunk, None])
+        return positions, labor_hours, labor_cost
+
+    @staticmethod
+    def _break_interval(row):
+        """Scheduled break as datetimes, on the day of the shift or after midnight"""
+        start = datetime.combine(row.schedule_date, row.start_time)
+        break_start = datetime.combine(row.schedule_date, row.break_start)
+        if break_start < start:
+            break_start += timedelta(days=1)
+        break_end = datetime.combine(row.schedule_date, row.break_end)
+        if break_end <= break_start:
+            break_end += timedelta(days=1)
+        return break_start, break_end
+
+    @staticmethod
+    def get_staff_cost_impact(db: Session, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Scheduled labor cost over a period against the cost of staffing each
+        hour exactly to its demand (orders per staff hour by role, minimum on
+        duty while open) in the roles active staff hold, at the average
+        hourly rate per role
+        """
+        metrics = LaborAnalyticsService.get_labor_metrics(db, start_date, end_date, basis="scheduled")
+        origin = datetime.combine(start_date, datetime.min.time())
+        n_hours = (end_date - start_date).days * 24 + 24
+        orders, _ = LaborAnalyticsService._order_buckets(
+            db, origin, origin + timedelta(hours=n_hours), n_hours
+        )
+
+        rates = dict(
+            db.query(Staff.position, func.avg(Staff.hourly_rate)).filter(
+                Staff.employment_status == "active"
+            ).group_by(Staff.position).all()
+        )
+        open_hours = np.zeros(24, dtype=bool)
+        open_hours[settings.KITCHEN_OPENING_HOUR:min(settings.KITCHEN_CLOSING_HOUR, 24)] = True
+        is_open = np.tile(open_hours, n_hours // 24)
+
+        optimized_cost = 0.0
+        optimized_hours = 0.0
+        for role, capacity in settings.STAFF_ORDERS_PER_HOUR.items():
+            if role not in rates:
+                continue  # No active staff in this role to schedule
+            needed = np.ceil(orders / capacity) if capacity > 0 else np.zeros(n_hours)
+            needed = np.where(is_open, np.maximum(needed, settings.STAFF_MIN_ON_DUTY.get(role, 0)), needed)
+            role_hours = float(needed.sum())
+            optimized_hours += role_hours
+            optimized_cost += role_hours * float(rates.get(role) or settings.DEFAULT_STAFF_HOURLY_RATE)
+
+        current_cost = metrics["totals"]["labor_cost"]
+        current_hours = metrics["totals"]["labor_hours"]
+        revenue = metrics["totals"]["revenue"]
+        optimized_splh = revenue / optimized_hours if optimized_hours else None
+        current_splh = metrics["totals"]["splh"]
+
+        return {
+            "current_labor_cost": round(current_cost, 2),
+            "optimized_labor_cost": round(optimized_cost, 2),
+            "potential_savings": round(current_cost - optimized_cost, 2),
+            "current_labor_hours": round(current_hours, 2),
+            "optimized_labor_hours": round(optimized_hours, 2),
+            "efficiency_gain": (
+                round((optimized_splh / current_splh - 1) * 100, 2)
+                if current_splh and optimized_splh else 0
+            )
+        }
+
+    @staticmethod
+    def _naive(value: Optional[datetime]) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone().replace(tzinfo=None)
+        return value
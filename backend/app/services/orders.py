@@ -1,34 +1,112 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, date, timedelta
 from decimal import Decimal
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, func, desc, update
 
 from ..models.orders import Order, OrderItem
 from ..models.menu import MenuItem
 from ..schemas.orders import OrderCreate, DailySalesReport, WeeklySalesReport, MonthlySalesReport
 from ..core.config import settings
+from ..core.events import order_events
+from .kitchen import KitchenService
+from .sequences import SequenceService
 from ..services.calculations import FinancialCalculator
+from ..utils.sql import weekday_of, dialect_insert
+
+
+# Allowed status changes; delivered and cancelled are final
+ORDER_TRANSITIONS = {
+    "pending": ("preparing", "cancelled"),
+    "preparing": ("ready", "cancelled"),
+    "ready": ("delivered", "cancelled"),
+    "delivered": (),
+    "cancelled": ()
+}
+
+# Timestamp column recorded when an order enters each status
+STAGE_TIMESTAMPS = {
+    "preparing": "preparing_at",
+    "ready": "ready_at",
+    "delivered": "delivered_at"
+}
+
+
+class OrderTransitionError(ValueError):
+    """An order is not in a status it can move to the requested one from"""
+
+    def __init__(self, order_id: int, current_status: str, new_status: str):
+        super().__init__(f"Order {order_id} cannot move from {current_status} to {new_status}")
+        self.order_id = order_id
+        self.current_status = current_status
+        self.new_status = new_status
+
+
+class PlatformPausedError(ValueError):
+    """A new order arrived from a platform that is paused"""
+
+    def __init__(self, platform: str):
+        super().__init__(f"{platform} is paused and not accepting orders")
+        self.platform = platform
 
 
 class OrderService:
     
     @staticmethod
-    def create_order(db: Session, order_data: OrderCreate, user_id: int) -> Order:
+    def create_order(db: Session, order_data: OrderCreate, user_id: int) -> Dict[str, Any]:
         """
-        Create a new order with financial calculations
+        Create a new order with financial calculations. An order already
+        ingested from the same platform order id is returned as it is; new
+        orders from a paused platform are refused.
+        """
+        if KitchenService.is_paused(order_data.platform.value) and not (
+            order_data.platform_order_id and db.query(Order.id).filter(
+                Order.platform == order_data.platform.value,
+                Order.platform_order_id == order_data.platform_order_id
+            ).first()
+        ):
+            raise PlatformPausedError(order_data.platform.value)
+        
+        menu_items = OrderService.load_menu_items(db, [order_data])
+        order, created = OrderService.upsert_order(db, order_data, user_id, menu_items)
+        db.commit()
+        if created:
+            OrderService.announce_created(order, menu_items)
+        return order
+    
+    @staticmethod
+    def load_menu_items(db: Session, orders: List[OrderCreate]) -> Dict[int, MenuItem]:
+        """Menu items referenced by some orders, in one query"""
+        ids = {item.menu_item_id for order in orders for item in order.items}
+        return {menu_item.id: menu_item for menu_item in db.query(MenuItem).filter(MenuItem.id.in_(ids)).all()}
+    
+    @staticmethod
+    def upsert_order(
+        db: Session,
+        order_data: OrderCreate,
+        user_id: int,
+        menu_items: Dict[int, MenuItem],
+        order_number: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Insert an order with INSERT ... ON CONFLICT (platform,
+        platform_order_id) DO UPDATE ... RETURNING, so a replayed platform
+        order comes back from the same statement instead of creating a
+        duplicate or needing a SELECT. Returns the order row and whether it
+        was created; the caller commits and then announces new orders.
+        Batch writers pass an `order_number` allocated beforehand so they do
+        not hold the day's counter row until their batch commits.
         """
-        # Generate order number
-        order_count = db.query(func.count(Order.id)).scalar()
-        order_number = f"ORD{datetime.now().strftime('%Y%m%d')}{order_count + 1:04d}"
-        
         # Calculate order totals
         subtotal = Decimal('0')
         total_ingredient_cost = Decimal('0')
+        prep_times = {}
         
         # Get menu items and calculate costs
         for item_data in order_data.items:
-            menu_item = db.query(MenuItem).filter(MenuItem.id == item_data.menu_item_id).first()
+            menu_item = menu_items.get(item_data.menu_item_id)
             if not menu_item:
                 raise ValueError(f"Menu item {item_data.menu_item_id} not found")
             
@@ -38,6 +116,7 @@ class OrderService:
             item_total = item_data.unit_price * item_data.quantity
             subtotal += item_total
             total_ingredient_cost += menu_item.cost * item_data.quantity
+            prep_times[menu_item.id] = menu_item.preparation_time
         
         # Calculate packaging cost (simplified calculation)
         packaging_cost = FinancialCalculator.calculate_packaging_cost(order_data.items)
@@ -56,16 +135,24 @@ class OrderService:
         net_revenue = total - commission_amount
         net_profit = net_revenue - total_ingredient_cost - packaging_cost
         
-        # Create order
-        db_order = Order(
+        # Quote a ready time from the current kitchen load
+        items = jsonable_encoder([item.dict() for item in order_data.items])  # Decimals are not JSON serializable
+        now = datetime.now()
+        quoted_ready_at = KitchenService.quote(items, prep_times, now)
+        
+        # Generate order number (row-locked counter, safe under concurrent creates)
+        if order_number is None:
+            order_number = SequenceService.next_numbers(db, "ORD", day=now.date())[0]
+        
+        stmt = dialect_insert(db, Order).values(
             order_number=order_number,
             customer_name=order_data.customer_name,
             customer_phone=order_data.customer_phone,
             customer_address=order_data.customer_address,
-            platform=order_data.platform,
+            platform=order_data.platform.value,
             platform_order_id=order_data.platform_order_id,
-            payment_method=order_data.payment_method,
-            items=[item.dict() for item in order_data.items],  # Store as JSON
+            payment_method=order_data.payment_method.value,
+            items=items,  # Store as JSON
             subtotal=subtotal,
             tax_amount=tax_amount,
             delivery_fee=order_data.delivery_fee,
@@ -76,14 +163,148 @@ class OrderService:
             commission_amount=commission_amount,
             net_revenue=net_revenue,
             net_profit=net_profit,
-            created_by=user_id
+            created_by=user_id,
+            assigned_staff_id=order_data.assigned_staff_id,
+            created_at=now,
+            quoted_ready_at=quoted_ready_at
+        )
+        # A no-op update (rather than DO NOTHING) makes RETURNING yield the existing row
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["platform", "platform_order_id"],
+            index_where=Order.platform_order_id.isnot(None),
+            set_={"platform_order_id": stmt.excluded.platform_order_id}
+        ).returning(*Order.__table__.c)
+        order = dict(db.execute(stmt).one()._mapping)
+        
+        # Our freshly allocated number only comes back if this insert won
+        return order, order["order_number"] == order_number
+    
+    @staticmethod
+    def announce_created(order: Dict[str, Any], menu_items: Dict[int, MenuItem]) -> None:
+        """Queue a committed new order in the kitchen and broadcast it"""
+        prep_times = {menu_item_id: menu_item.preparation_time for menu_item_id, menu_item in menu_items.items()}
+        KitchenService.add_order(
+            order["id"], order["platform"], order["items"], prep_times, order["created_at"], order["quoted_ready_at"]
         )
         
-        db.add(db_order)
-        db.commit()
-        db.refresh(db_order)
-        
-        return db_order
+        order_events.publish("order.created", {
+            "order_id": order["id"],
+            "order_number": order["order_number"],
+            "platform": order["platform"],
+            "status": order["status"],
+            "customer_name": order["customer_name"],
+            "items": order["items"],
+            "total": order["total"],
+            "created_at": order["created_at"],
+            "quoted_ready_at": order["quoted_ready_at"]
+        })
+    
+    @staticmethod
+    def publish_status_changes(changes: List[Dict[str, Any]]) -> None:
+        """
+        Apply committed status changes (rows returned by a transition) to the
+        kitchen queue and broadcast them
+        """
+        KitchenService.apply_status_changes(changes)
+        for change in changes:
+            order_events.publish("order.status_changed", {
+                "order_id": change.get("id", change.get("order_id")),
+                "order_number": change["order_number"],
+                "platform": change["platform"],
+                "status": change["status"],
+                "preparing_at": change["preparing_at"],
+                "ready_at": change["ready_at"],
+                "delivered_at": change["delivered_at"]
+            })
+    
+    @staticmethod
+    def _sources(new_status: str, expected_status: Optional[str]) -> List[str]:
+        """Statuses an order may be in for the change to apply"""
+        if new_status not in ORDER_TRANSITIONS:
+            raise ValueError(f"Unknown order status {new_status}")
+        sources = [status for status, targets in ORDER_TRANSITIONS.items() if new_status in targets]
+        if expected_status is not None:
+            sources = [status for status in sources if status == expected_status]
+        return sources
+    
+    @staticmethod
+    def _transition_statement(order_ids: List[int], new_status: str, sources: List[str]):
+        """
+        Conditional UPDATE: only rows still in one of `sources` change, so of
+        two devices racing on the same order exactly one wins
+        """
+        values = {"status": new_status}
+        if new_status in STAGE_TIMESTAMPS:
+            values[STAGE_TIMESTAMPS[new_status]] = datetime.now()  # Same clock as created_at and ETA quotes
+        return update(Order).where(
+            Order.id.in_(order_ids),
+            Order.status.in_(sources)
+        ).values(**values).returning(
+            Order.id, Order.order_number, Order.platform, Order.status,
+            Order.preparing_at, Order.ready_at, Order.delivered_at
+        ).execution_options(synchronize_session=False)
+    
+    @staticmethod
+    def transition_status(
+        db: Session,
+        order_id: int,
+        new_status: str,
+        expected_status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Move an order to `new_status` in one conditional UPDATE, stamping the
+        stage timestamp. With `expected_status` the change only applies if the
+        order is still in that status. Raises LookupError if the order does
+        not exist and OrderTransitionError if its status does not allow it.
+        The caller commits.
+        """
+        sources = OrderService._sources(new_status, expected_status)
+        row = db.execute(OrderService._transition_statement([order_id], new_status, sources)).first() if sources else None
+        if row is None:
+            current = db.query(Order.status).filter(Order.id == order_id).scalar()
+            if current is None:
+                raise LookupError(f"Order {order_id} not found")
+            raise OrderTransitionError(order_id, current, new_status)
+        return dict(row._mapping)
+    
+    @staticmethod
+    def transition_many(db: Session, transitions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Apply status changes to many orders with one conditional UPDATE per
+        (status, expected status) pair. Each result is "updated", "conflict"
+        (with the current status) or "not_found"; the caller commits.
+        """
+        order_ids = [transition["order_id"] for transition in transitions]
+        if len(set(order_ids)) != len(order_ids):
+            raise ValueError("Each order can appear only once per batch")
+        
+        groups: Dict[tuple, List[int]] = {}
+        for transition in transitions:
+            key = (transition["status"], transition.get("expected_status"))
+            groups.setdefault(key, []).append(transition["order_id"])
+        
+        updated: Dict[int, Dict[str, Any]] = {}
+        for (new_status, expected_status), ids in groups.items():
+            sources = OrderService._sources(new_status, expected_status)
+            if sources:
+                for row in db.execute(OrderService._transition_statement(ids, new_status, sources)):
+                    updated[row.id] = {key: value for key, value in row._mapping.items() if key != "id"}
+        
+        missed = [order_id for order_id in order_ids if order_id not in updated]
+        current = dict(
+            db.query(Order.id, Order.status).filter(Order.id.in_(missed)).all()
+        ) if missed else {}
+        
+        results = []
+        for transition in transitions:
+            order_id = transition["order_id"]
+            if order_id in updated:
+                results.append({"order_id": order_id, "result": "updated", **updated[order_id]})
+            elif order_id in current:
+                results.append({"order_id": order_id, "result": "conflict", "status": current[order_id]})
+            else:
+                results.append({"order_id": order_id, "result": "not_found"})
+        return results
     
     @staticmethod
     def get_daily_sales_report(db: Session, report_date: date) -> DailySalesReport:
@@ -314,6 +535,87 @@ class OrderService:
         # or have a separate order_items table
         return []
     
+    @staticmethod
+    def get_item_demand_history(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        item_index: Dict[int, int]
+    ) -> np.ndarray:
+        """
+        Quantities sold per day and menu item as a (days x items) matrix.
+        Columns follow `item_index` (menu_item_id -> column); only the
+        created_at and items columns of non-cancelled orders are loaded.
+        """
+        n_days = (end_date - start_date).days + 1
+        history = np.zeros((max(n_days, 0), len(item_index)))
+        if n_days <= 0 or not item_index:
+            return history
+        
+        rows = db.query(Order.created_at, Order.items).filter(
+            and_(
+                Order.created_at >= datetime.combine(start_date, datetime.min.time()),
+                Order.created_at <= datetime.combine(end_date, datetime.max.time()),
+                Order.status != "cancelled"
+            )
+        ).all()
+        
+        day_positions, item_positions, quantities = [], [], []
+        for created_at, items in rows:
+            day = (created_at.date() - start_date).days
+            for item in items or []:
+                column = item_index.get(item.get("menu_item_id"))
+                if column is not None:
+                    day_positions.append(day)
+                    item_positions.append(column)
+                    quantities.append(item.get("quantity", 0))
+        
+        if quantities:
+            np.add.at(history, (day_positions, item_positions), quantities)
+        return history
+    
+    @staticmethod
+    def get_item_hourly_demand(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        item_index: Dict[int, int],
+        weekday: int
+    ) -> np.ndarray:
+        """
+        Average quantity sold per hour of day and menu item (24 x items) over
+        the occurrences of `weekday` (0=Monday) between start_date and end_date
+        """
+        hourly = np.zeros((24, len(item_index)))
+        matching_days = sum(
+            1 for offset in range((end_date - start_date).days + 1)
+            if (start_date + timedelta(days=offset)).weekday() == weekday
+        )
+        if matching_days == 0 or not item_index:
+            return hourly
+        
+        rows = db.query(Order.created_at, Order.items).filter(
+            and_(
+                Order.created_at >= datetime.combine(start_date, datetime.min.time()),
+                Order.created_at <= datetime.combine(end_date, datetime.max.time()),
+                Order.status != "cancelled",
+                weekday_of(db, Order.created_at) == weekday
+            )
+        ).all()
+        
+        hour_positions, item_positions, quantities = [], [], []
+        for created_at, items in rows:
+            for item in items or []:
+                column = item_index.get(item.get("menu_item_id"))
+                if column is not None:
+                    hour_positions.append(created_at.hour)
+                    item_positions.append(column)
+                    quantities.append(item.get("quantity", 0))
+        
+        if quantities:
+            np.add.at(hourly, (hour_positions, item_positions), quantities)
+        return hourly / matching_days
+    
     @staticmethod
     def get_popular_items(db: Session, limit: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
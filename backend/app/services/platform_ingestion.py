@@ -0,0 +1,447 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import OperationalError, DisconnectionError
+
+from ..models.users import User
+from ..models.orders import PlatformWebhook
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..utils.platform_adapters import ADAPTERS
+from .orders import OrderService
+from .sequences import SequenceService
+
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 2)
+
+
+def _database_unavailable(error: Exception) -> bool:
+    """Connection and locking errors, as opposed to a problem with the data"""
+    return isinstance(error, (OperationalError, DisconnectionError)) or getattr(error, "connection_invalidated", False)
+
+
+class OrderIngestionQueue:
+    """
+    Webhook intake for platform orders. Each webhook is written to the
+    platform_webhooks inbox before it is acknowledged, so an accepted order
+    survives database hiccups, restarts and a full queue. A pool of asyncio
+    workers takes whatever has queued up (up to `max_batch`, waiting
+    `wait_ms` for a batch to fill) and adapts, validates and commits it in
+    one transaction on a worker thread, marking the inbox rows in the same
+    transaction. Orders are upserted on (platform, platform_order_id), so
+    platform retries and recovered rows are harmless.
+
+    Only orders that fail validation are rejected. A batch that fails on the
+    database is put back on the queue with exponential backoff; after
+    `max_attempts` it stays pending in the inbox, where a periodic sweep
+    (also run at startup) requeues pending rows older than
+    `recover_after` seconds.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_batch: int,
+        wait_ms: int,
+        max_queue: int,
+        retry_base_ms: int = 500,
+        max_attempts: int = 6,
+        recover_after: float = 120,
+        recover_interval: float = 60,
+        retention_days: int = 7
+    ):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.wait_seconds = wait_ms / 1000
+        self.max_queue = max_queue
+        self.retry_base = retry_base_ms / 1000
+        self.max_attempts = max_attempts
+        self.recover_after = recover_after
+        self.recover_interval = recover_interval
+        self.retention_days = retention_days
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: List[asyncio.TimerHandle] = []
+        self._waiting_retry = 0
+        self._in_flight: set = set()  # Inbox ids queued or waiting to be retried here
+        self._stores: List[Tuple[str, str, Dict[str, Any], asyncio.Future]] = []
+        self._stores_waiting: Optional[asyncio.Event] = None
+        self._user_id: Optional[int] = None
+
+        self.received = 0
+        self.created = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.retried = 0
+        self.deferred = 0
+        self.recovered = 0
+        self.batches = 0
+        self._ack_ms = deque(maxlen=5000)
+        self._lag_ms = deque(maxlen=5000)
+        self.recent_rejections = deque(maxlen=50)
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._stores_waiting = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._inbox_writer()))
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self, drain_seconds: float = 5.0) -> None:
+        """
+        Give queued orders a chance to be committed, then stop the workers.
+        Anything left stays pending in the inbox and is recovered later.
+        """
+        for handle in self._retries:
+            handle.cancel()
+        self._retries = []
+        self._waiting_retry = 0
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), drain_seconds)
+            except asyncio.TimeoutError:
+                logger.warning("Stopping with %d platform orders left in the inbox", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._stores_waiting = None
+        self._in_flight = set()
+
+    async def accept(self, platform: str, platform_order_id: str, payload: Dict[str, Any], received_at: float) -> int:
+        """
+        Store a webhook in the inbox and queue it; returns the inbox id.
+        Raises SQLAlchemyError if it could not be stored, in which case the
+        webhook must not be acknowledged. Webhooks arriving together are
+        stored in one transaction (group commit).
+        """
+        if self._stores_waiting is None:
+            inbox_id = (await asyncio.to_thread(self._store, [(platform, platform_order_id, payload)]))[0]
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._stores.append((platform, platform_order_id, payload, future))
+            self._stores_waiting.set()
+            inbox_id = await future
+        self.received += 1
+        self._offer((inbox_id, platform, payload, received_at, 0))
+        return inbox_id
+
+    def is_known(self, platform: str, platform_order_id: str) -> bool:
+        """Whether a platform order was already accepted (a retry, to be acknowledged even while paused)"""
+        db = SessionLocal()
+        try:
+            return db.query(PlatformWebhook.id).filter(
+                PlatformWebhook.platform == platform,
+                PlatformWebhook.platform_order_id == platform_order_id,
+                PlatformWebhook.status != "rejected"
+            ).first() is not None
+        finally:
+            db.close()
+
+    def record_ack(self, received_at: float) -> None:
+        self._ack_ms.append((time.perf_counter() - received_at) * 1000)
+
+    async def _inbox_writer(self) -> None:
+        while True:
+            await self._stores_waiting.wait()
+            self._stores_waiting.clear()
+            stores, self._stores = self._stores, []
+            if not stores:
+                continue
+            try:
+                ids = await asyncio.to_thread(self._store, [store[:3] for store in stores])
+            except Exception as e:
+                for store in stores:
+                    store[3].set_exception(e)
+            else:
+                for store, inbox_id in zip(stores, ids):
+                    store[3].set_result(inbox_id)
+
+    def _store(self, webhooks: List[Tuple[str, str, Dict[str, Any]]]) -> List[int]:
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            rows = [
+                PlatformWebhook(platform=platform, platform_order_id=platform_order_id, payload=payload, received_at=now)
+                for platform, platform_order_id, payload in webhooks
+            ]
+            db.add_all(rows)
+            db.flush()
+            ids = [row.id for row in rows]
+            db.commit()
+            return ids
+        finally:
+            db.close()
+
+    def _offer(self, item: Tuple[int, str, Dict[str, Any], Optional[float], int]) -> None:
+        """Queue an inbox row; if the queue is full it waits in the inbox for the sweep"""
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.deferred += 1
+            self._in_flight.discard(item[0])
+            return
+        self._in_flight.add(item[0])
+
+    def _retry_later(self, batch: List[Tuple[int, str, Dict[str, Any], Optional[float], int]]) -> None:
+        loop = asyncio.get_running_loop()
+        self._retries = [handle for handle in self._retries if handle.when() > loop.time()]
+        for inbox_id, platform, payload, received_at, attempts in batch:
+            attempts += 1
+            if attempts > self.max_attempts:
+                # Still pending in the inbox; the sweep will pick it up
+                self.deferred += 1
+                self._in_flight.discard(inbox_id)
+                continue
+            self.retried += 1
+            self._waiting_retry += 1
+            delay = self.retry_base * 2 ** (attempts - 1)
+            self._retries.append(loop.call_later(
+                delay, self._requeue, (inbox_id, platform, payload, received_at, attempts)
+            ))
+
+    def _requeue(self, item: Tuple[int, str, Dict[str, Any], Optional[float], int]) -> None:
+        self._waiting_retry -= 1
+        self._offer(item)
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.wait_seconds)  # Let the batch fill
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                retry = await asyncio.to_thread(self._commit_batch, batch)
+            except Exception:
+                logger.exception("Could not ingest a batch of %d platform orders; retrying", len(batch))
+                retry = batch
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            retried = {item[0] for item in retry}
+            self._in_flight.difference_update(item[0] for item in batch if item[0] not in retried)
+            if retry:
+                self._retry_later(retry)
+
+    async def _sweeper(self) -> None:
+        """Requeue stale pending inbox rows and prune old processed ones"""
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._stale_webhooks, set(self._in_flight))
+                for inbox_id, platform, payload in rows:
+                    self.recovered += 1
+                    self._offer((inbox_id, platform, payload, None, 0))
+                if rows:
+                    logger.info("Recovered %d pending platform webhooks", len(rows))
+            except Exception:
+                logger.exception("Could not recover pending platform webhooks")
+            await asyncio.sleep(self.recover_interval)
+
+    def _stale_webhooks(self, in_flight: set) -> List[Tuple[int, str, Dict[str, Any]]]:
+        db = SessionLocal()
+        try:
+            now = datetime.now()
+            db.query(PlatformWebhook).filter(
+                PlatformWebhook.status == "processed",
+                PlatformWebhook.processed_at < now - timedelta(days=self.retention_days)
+            ).delete(synchronize_session=False)
+            db.commit()
+
+            free = self.max_queue - (self._queue.qsize() if self._queue is not None else 0)
+            if free <= 0:
+                return []
+            rows = db.query(PlatformWebhook.id, PlatformWebhook.platform, PlatformWebhook.payload).filter(
+                PlatformWebhook.status == "pending",
+                PlatformWebhook.received_at < now - timedelta(seconds=self.recover_after)
+            ).order_by(PlatformWebhook.received_at).limit(free).all()
+            return [tuple(row) for row in rows if row.id not in in_flight]
+        finally:
+            db.close()
+
+    def _commit_batch(self, batch: List[Tuple[int, str, Dict[str, Any], Optional[float], int]]) -> List[Tuple]:
+        """Commit a batch; returns the items to retry after a database error"""
+        db = SessionLocal()
+        try:
+            user_id = self._ingestion_user(db)
+            adapted, invalid = [], []
+            for item in batch:
+                try:
+                    adapted.append((item, ADAPTERS[item[1]][1](item[2])))
+                except Exception as e:
+                    # Adapters only read the payload: any error means this order is malformed
+                    invalid.append((item, e))
+
+            try:
+                self._commit(db, adapted, invalid, user_id)
+                return []
+            except Exception as e:
+                db.rollback()
+                if _database_unavailable(e):
+                    # Trying the orders one by one would only fail again
+                    logger.warning("Batch of %d platform orders hit a database error, retrying: %s", len(batch), e)
+                    return batch
+                logger.exception("Batch of %d platform orders failed; retrying one by one", len(adapted))
+
+            retry = []
+            if invalid:
+                try:
+                    self._commit(db, [], invalid, user_id)
+                except Exception:
+                    db.rollback()
+                    retry.extend(item for item, _ in invalid)
+            for order in adapted:
+                try:
+                    self._commit(db, [order], [], user_id)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Platform order %s failed to commit; retrying", order[1].platform_order_id)
+                    retry.append(order[0])
+            return retry
+        finally:
+            db.close()
+
+    def _commit(self, db: Session, adapted: List[Tuple[Tuple, Any]], invalid: List[Tuple[Tuple, Exception]], user_id: int) -> None:
+        menu_items = OrderService.load_menu_items(db, [order_data for _, order_data in adapted])
+        numbers = self._order_numbers(len(adapted))
+        new_orders, duplicates, processed, rejected = [], 0, [], list(invalid)
+        for (item, order_data), order_number in zip(adapted, numbers):
+            try:
+                order, created = OrderService.upsert_order(db, order_data, user_id, menu_items, order_number)
+            except ValueError as e:
+                # Raised while validating, before anything was written
+                rejected.append((item, e))
+                continue
+            processed.append(item[0])
+            if created:
+                new_orders.append((order, item[3]))
+            else:
+                duplicates += 1
+
+        now = datetime.now()
+        if processed:
+            db.query(PlatformWebhook).filter(PlatformWebhook.id.in_(processed)).update(
+                {"status": "processed", "processed_at": now}, synchronize_session=False
+            )
+        for item, error in rejected:
+            db.query(PlatformWebhook).filter(PlatformWebhook.id == item[0]).update(
+                {"status": "rejected", "processed_at": now, "error": str(error)[:2000]}, synchronize_session=False
+            )
+        db.commit()
+
+        self.batches += 1
+        self.created += len(new_orders)
+        self.duplicates += duplicates
+        for item, error in rejected:
+            self._reject(item[1], ADAPTERS[item[1]][0](item[2]), error)
+        committed_at = time.perf_counter()
+        for order, received_at in new_orders:
+            if received_at is not None:
+                self._lag_ms.append((committed_at - received_at) * 1000)
+            OrderService.announce_created(order, menu_items)
+
+    @staticmethod
+    def _order_numbers(count: int) -> List[str]:
+        """
+        Order numbers for a batch, allocated in their own short transaction
+        so concurrent batches do not serialize on the day's counter row.
+        Numbers of duplicates and rejections are skipped.
+        """
+        if not count:
+            return []
+        db = SessionLocal()
+        try:
+            numbers = SequenceService.next_numbers(db, "ORD", count=count)
+            db.commit()
+            return numbers
+        finally:
+            db.close()
+
+    def _reject(self, platform: str, platform_order_id: Optional[str], error: Exception) -> None:
+        self.rejected += 1
+        self.recent_rejections.append({
+            "platform": platform,
+            "platform_order_id": platform_order_id,
+            "error": str(error)[:500]
+        })
+        logger.warning("Rejected %s order %s: %s", platform, platform_order_id, error)
+
+    def _ingestion_user(self, db: Session) -> int:
+        """User recorded as creator of platform orders (first active owner unless configured)"""
+        if self._user_id is None:
+            query = db.query(User.id).filter(User.is_active == True)
+            if settings.PLATFORM_INGESTION_USERNAME:
+                query = query.filter(User.username == settings.PLATFORM_INGESTION_USERNAME)
+            else:
+                query = query.filter(User.role == "owner").order_by(User.id)
+            user_id = query.limit(1).scalar()
+            if user_id is None:
+                raise LookupError("No user to record platform orders under")
+            self._user_id = user_id
+        return self._user_id
+
+    def stats(self) -> Dict[str, Any]:
+        ack = list(self._ack_ms)
+        lag = list(self._lag_ms)
+        return {
+            "running": bool(self._tasks),
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "waiting_retry": self._waiting_retry,
+            "received": self.received,
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "retried": self.retried,
+            "deferred": self.deferred,
+            "recovered": self.recovered,
+            "batches": self.batches,
+            "average_batch_size": round((self.created + self.duplicates + self.rejected) / self.batches, 1) if self.batches else None,
+            "ack_ms": {"p50": _percentile(ack, 0.5), "p99": _percentile(ack, 0.99)},
+            "commit_lag_ms": {"p50": _percentile(lag, 0.5), "p99": _percentile(lag, 0.99)},
+            "recent_rejections": list(self.recent_rejections)
+        }
+
+
+def verify_signature(platform: str, body: bytes, signature: Optional[str]) -> bool:
+    """
+    HMAC-SHA256 (hex) of the raw body with the platform's webhook secret.
+    Without a configured secret, webhooks are only accepted in development.
+    """
+    secret = settings.PLATFORM_WEBHOOK_SECRETS.get(platform)
+    if not secret:
+        return settings.ENVIRONMENT == "development"
+    if not signature:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.removeprefix("sha256="))
+
+
+order_ingestion = OrderIngestionQueue(
+    settings.INGESTION_WORKERS,
+    settings.INGESTION_BATCH_SIZE,
+    settings.INGESTION_BATCH_WAIT_MS,
+    settings.INGESTION_QUEUE_SIZE,
+    settings.INGESTION_RETRY_BASE_MS,
+    settings.INGESTION_MAX_ATTEMPTS,
+    settings.INGESTION_RECOVER_AFTER_SECONDS,
+    settings.INGESTION_RECOVER_INTERVAL_SECONDS,
+    settings.INGESTION_INBOX_RETENTION_DAYS
+)
@@ -0,0 +1,215 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime, date, timedelta
+import math
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models.inventory import InventoryItem
+from ..models.menu import MenuItem
+from ..core.cache import VersionedCache
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..utils.recipes import convert_quantity, sub_recipe_order
+from .orders import OrderService
+from .recipes import RecipeService
+
+
+# One entry per service date (next service, plus any dates looked up on demand)
+_prep_cache = VersionedCache(max_entries=8)
+
+COUNTABLE_UNITS = {"pieces", "piece", "units", "unit", "unidades", "pcs", "balls"}
+
+
+class PrepListService:
+
+    @staticmethod
+    def get_next_service_date(now: Optional[datetime] = None) -> date:
+        """Today until the kitchen closes, tomorrow afterwards"""
+        now = now or datetime.now()
+        if now.hour >= settings.KITCHEN_CLOSING_HOUR:
+            return now.date() + timedelta(days=1)
+        return now.date()
+
+    @staticmethod
+    def get_prep_list(db: Session, service_date: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Serve the precomputed prep list for the next service, computing it on
+        demand only if the scheduled job has not produced it yet
+        """
+        service_date = service_date or PrepListService.get_next_service_date()
+        return _prep_cache.get_or_compute(
+            ("prep_list", service_date),
+            None,
+            lambda: PrepListService.generate_prep_list(db, service_date)
+        )
+
+    @staticmethod
+    def refresh_job() -> None:
+        """Scheduled job: precompute the prep list for the next service"""
+        db = SessionLocal()
+        try:
+            service_date = PrepListService.get_next_service_date()
+            _prep_cache.set(("prep_list", service_date), None, PrepListService.generate_prep_list(db, service_date))
+        finally:
+            db.close()
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the cached prep lists (called after recipe edits in this process)"""
+        _prep_cache.invalidate()
+
+    @staticmethod
+    def generate_prep_list(db: Session, service_date: date) -> Dict[str, Any]:
+        """
+        Turn the hourly menu demand forecast for `service_date` into prep
+        quantities for prepared items (items with a sub-recipe), walking the
+        sub-recipe graph so nested preparations are included, with a par-level
+        safety margin over forecast usage
+        """
+        margin = settings.PREP_PAR_MARGIN
+        recipe_matrix = RecipeService.get_recipe_matrix(db)
+
+        history_start = service_date - timedelta(days=settings.DEMAND_HISTORY_DAYS)
+        hourly_demand = OrderService.get_item_hourly_demand(
+            db, history_start, service_date - timedelta(days=1),
+            recipe_matrix.item_index, service_date.weekday()
+        )
+        hourly_usage = recipe_matrix.consumption(hourly_demand)  # 24 x ingredients
+
+        inventory = {
+            item.id: item
+            for item in db.query(
+                InventoryItem.id,
+                InventoryItem.name,
+                InventoryItem.unit,
+                InventoryItem.current_stock,
+                InventoryItem.recipe
+            ).all()
+        }
+        prep_items = {item_id: item for item_id, item in inventory.items() if item.recipe}
+
+        # Hourly need per inventory item coming straight from menu recipes
+        need = {
+            item_id: hourly_usage[:, j].copy()
+            for item_id, j in recipe_matrix.ingredient_index.items()
+        }
+
+        order = PrepListService._topological_order(prep_items)
+        prep_rows = []
+        raw_materials: Dict[int, float] = {}
+
+        for item_id in order:
+            item = prep_items[item_id]
+            hourly_need = need.get(item_id, np.zeros(24))
+            forecast_usage = float(hourly_need.sum())
+            par_level = forecast_usage * (1 + margin)
+            on_hand = float(item.current_stock or 0)
+            prep_quantity = PrepListService._round_up(max(par_level - on_hand, 0.0), item.unit)
+
+            ready_by = None
+            shortfall_hours = np.nonzero(np.cumsum(hourly_need) > on_hand)[0]
+            if shortfall_hours.size:
+                ready_by = f"{int(shortfall_hours[0]):02d}:00"
+
+            ingredients = []
+            produced_share = prep_quantity / par_level if par_level > 0 else 0.0
+            for entry in item.recipe:
+                ingredient_id = entry.get("ingredient_id")
+                ingredient = inventory.get(ingredient_id)
+                if ingredient is None:
+                    continue
+                per_unit = convert_quantity(float(entry.get("quantity", 0)), entry.get("unit"), ingredient.unit)
+                quantity = per_unit * prep_quantity
+                ingredients.append({
+                    "item_id": ingredient_id,
+                    "item_name": ingredient.name,
+                    "quantity": round(quantity, 3),
+                    "unit": ingredient.unit
+                })
+
+                if ingredient_id in prep_items:
+                    # Nested preparation: its need follows this item's hourly profile
+                    inherited = hourly_need * (1 + margin) * produced_share * per_unit
+                    need[ingredient_id] = need.get(ingredient_id, np.zeros(24)) + inherited
+                else:
+                    raw_materials[ingredient_id] = raw_materials.get(ingredient_id, 0.0) + quantity
+
+            prep_rows.append({
+                "item_id": item_id,
+                "item_name": item.name,
+                "unit": item.unit,
+                "forecast_usage": round(forecast_usage, 3),
+                "par_level": round(par_level, 3),
+                "on_hand": round(on_hand, 3),
+                "prep_quantity": prep_quantity,
+                "ready_by": ready_by,
+                "hourly_usage": [round(float(q), 3) for q in hourly_need],
+                "ingredients": ingredients
+            })
+
+        menu_forecast = []
+        daily_demand = hourly_demand.sum(axis=0)
+        names = dict(db.query(MenuItem.id, MenuItem.name).all())
+        for menu_item_id, i in recipe_matrix.item_index.items():
+            if daily_demand[i] > 0:
+                menu_forecast.append({
+                    "menu_item_id": menu_item_id,
+                    "item_name": names.get(menu_item_id),
+                    "forecast_quantity": round(float(daily_demand[i]), 1)
+                })
+        menu_forecast.sort(key=lambda x: x["forecast_quantity"], reverse=True)
+
+        return {
+            "service_date": service_date,
+            "generated_at": datetime.now(),
+            "par_margin": margin,
+            "menu_forecast": menu_forecast,
+            "prep_items": [row for row in prep_rows if row["prep_quantity"] > 0 or row["forecast_usage"] > 0],
+            "raw_materials": [
+                {
+                    "item_id": item_id,
+                    "item_name": inventory[item_id].name,
+                    "quantity": round(quantity, 3),
+                    "unit": inventory[item_id].unit,
+                    "on_hand": round(float(inventory[item_id].current_stock or 0), 3)
+                }
+                for item_id, quantity in sorted(raw_materials.items(), key=lambda x: inventory[x[0]].name)
+                if quantity > 0
+            ]
+        }
+
+    @staticmethod
+    def render_text(prep_list: Dict[str, Any]) -> str:
+        """Plain-text rendering for kitchen printers and displays"""
+        lines = [
+            f"PREP LIST - {prep_list['service_date']}",
+            f"Generated {prep_list['generated_at'].strftime('%H:%M')} | par margin {prep_list['par_margin'] * 100:.0f}%",
+            ""
+        ]
+        for row in prep_list["prep_items"]:
+            if row["prep_quantity"] <= 0:
+                continue
+            ready = f" (ready by {row['ready_by']})" if row["ready_by"] else ""
+            lines.append(f"[ ] {row['item_name']}: {row['prep_quantity']:g} {row['unit']}{ready}")
+            for ingredient in row["ingredients"]:
+                lines.append(f"      - {ingredient['item_name']}: {ingredient['quantity']:g} {ingredient['unit']}")
+        if len(lines) == 3:
+            lines.append("Nothing to prep - stock covers forecast demand")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _topological_order(prep_items: Dict[int, Any]) -> List[int]:
+        """
+        Order prepared items so every item comes before the sub-preparations it
+        uses. Cycles in the sub-recipe graph are broken at the repeated edge.
+        """
+        order = sub_recipe_order({item_id: item.recipe for item_id, item in prep_items.items()})
+        # Children come first; parents must be processed first
+        order.reverse()
+        return order
+
+    @staticmethod
+    def _round_up(quantity: float, unit: Optional[str]) -> float:
+        if (unit or "").strip().lower() in COUNTABLE_UNITS:
+            return float(math.ceil(quantity - 1e-9))
+        return math.ceil(quantity * 100 - 1e-9) / 100
@@ -0,0 +1,207 @@
+from typing import Dict, Any, Optional
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, desc, case
+
+from ..models.purchases import PurchaseOrder, PurchaseOrderItem
+from ..models.inventory import Supplier, InventoryItem
+from ..utils.sql import days_between, month_of
+
+
+LEAD_TIME_BUCKETS = [(1, "0-1 days"), (2, "1-2 days"), (3, "2-3 days"), (5, "3-5 days"), (7, "5-7 days")]
+DELAY_BUCKETS = [(0, "on_time"), (1, "late_up_to_1_day"), (3, "late_1_3_days")]
+
+
+class PurchaseAnalyticsService:
+
+    @staticmethod
+    def get_purchase_analytics(
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        top_suppliers: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Spend, top suppliers, unit cost trends per inventory item and delivery
+        performance, each computed with a grouped query in the database
+        """
+        conditions = [PurchaseOrder.status != "cancelled"]
+        if start_date:
+            conditions.append(PurchaseOrder.order_date >= start_date)
+        if end_date:
+            conditions.append(PurchaseOrder.order_date <= end_date)
+        period = and_(*conditions)
+
+        total_orders, total_spent = db.query(
+            func.count(PurchaseOrder.id),
+            func.coalesce(func.sum(PurchaseOrder.total_cost), 0)
+        ).filter(period).one()
+
+        suppliers = db.query(
+            Supplier.id,
+            Supplier.name,
+            func.count(PurchaseOrder.id).label("orders"),
+            func.sum(PurchaseOrder.total_cost).label("total_spent")
+        ).join(
+            PurchaseOrder, PurchaseOrder.supplier_id == Supplier.id
+        ).filter(period).group_by(
+            Supplier.id, Supplier.name
+        ).order_by(desc("total_spent")).limit(top_suppliers).all()
+
+        return {
+            "total_orders": total_orders,
+            "total_spent": total_spent,
+            "average_order_value": (
+                (Decimal(str(total_spent)) / total_orders).quantize(Decimal("0.01")) if total_orders > 0 else 0
+            ),
+            "top_suppliers": [
+                {
+                    "supplier_id": row.id,
+                    "name": row.name,
+                    "orders": row.orders,
+                    "total_spent": float(row.total_spent or 0),
+                    "share": round(float(row.total_spent or 0) / float(total_spent) * 100, 2) if total_spent else 0
+                }
+                for row in suppliers
+            ],
+            "cost_trends": PurchaseAnalyticsService._get_cost_trends(db, period),
+            "delivery_performance": PurchaseAnalyticsService._get_delivery_performance(db, period)
+        }
+
+    @staticmethod
+    def _get_cost_trends(db: Session, period) -> Dict[str, Any]:
+        """Monthly quantity-weighted unit cost per inventory item"""
+        month = month_of(db, PurchaseOrder.order_date)
+        rows = db.query(
+            PurchaseOrderItem.inventory_item_id,
+            InventoryItem.name,
+            InventoryItem.unit,
+            month.label("month"),
+            func.sum(PurchaseOrderItem.quantity_ordered).label("quantity"),
+            func.sum(PurchaseOrderItem.total_cost).label("spent"),
+            func.min(PurchaseOrderItem.unit_cost).label("min_unit_cost"),
+            func.max(PurchaseOrderItem.unit_cost).label("max_unit_cost")
+        ).join(
+            PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id
+        ).join(
+            InventoryItem, InventoryItem.id == PurchaseOrderItem.inventory_item_id
+        ).filter(period).group_by(
+            PurchaseOrderItem.inventory_item_id, InventoryItem.name, InventoryItem.unit, month
+        ).order_by(PurchaseOrderItem.inventory_item_id, month).all()
+
+        items: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            quantity = float(row.quantity or 0)
+            item = items.setdefault(row.inventory_item_id, {
+                "item_id": row.inventory_item_id,
+                "item_name": row.name,
+                "unit": row.unit,
+                "months": []
+            })
+            item["months"].append({
+                "month": row.month,
+                "quantity": round(quantity, 3),
+                "average_unit_cost": round(float(row.spent or 0) / quantity, 4) if quantity > 0 else None,
+                "min_unit_cost": float(row.min_unit_cost),
+                "max_unit_cost": float(row.max_unit_cost)
+            })
+
+        trends = []
+        for item in items.values():
+            costs = [month["average_unit_cost"] for month in item["months"] if month["average_unit_cost"]]
+            item["change_percentage"] = (
+                round((costs[-1] - costs[0]) / costs[0] * 100, 2) if len(costs) > 1 else 0
+            )
+            trends.append(item)
+        trends.sort(key=lambda x: abs(x["change_percentage"]), reverse=True)
+
+        return {
+            "granularity": "monthly",
+            "items": trends,
+            "rising_costs": [item["item_name"] for item in trends if item["change_percentage"] > 5]
+        }
+
+    @staticmethod
+    def _get_delivery_performance(db: Session, period) -> Dict[str, Any]:
+        """
+        On-time rate and lead-time / delay distributions from expected vs actual
+        delivery dates. An order is on time if delivered no later than its
+        expected delivery date.
+        """
+        delivered = and_(period, PurchaseOrder.actual_delivery_date.isnot(None))
+        lead_days = days_between(db, PurchaseOrder.order_date, PurchaseOrder.actual_delivery_date)
+        delay_days = days_between(db, PurchaseOrder.expected_delivery_date, PurchaseOrder.actual_delivery_date)
+        has_expected = PurchaseOrder.expected_delivery_date.isnot(None)
+        on_time = case((and_(has_expected, delay_days <= 0), 1), else_=0)
+        with_expected = case((has_expected, 1), else_=0)
+
+        by_supplier = db.query(
+            Supplier.id,
+            Supplier.name,
+            func.count(PurchaseOrder.id).label("deliveries"),
+            func.sum(with_expected).label("with_expected"),
+            func.sum(on_time).label("on_time"),
+            func.avg(lead_days).label("average_lead_time"),
+            func.min(lead_days).label("min_lead_time"),
+            func.max(lead_days).label("max_lead_time"),
+            func.avg(case((has_expected, delay_days), else_=None)).label("average_delay")
+        ).join(
+            PurchaseOrder, PurchaseOrder.supplier_id == Supplier.id
+        ).filter(delivered).group_by(Supplier.id, Supplier.name).all()
+
+        lead_bucket = case(
+            *[(lead_days < limit, label) for limit, label in LEAD_TIME_BUCKETS],
+            else_=f"{LEAD_TIME_BUCKETS[-1][0]}+ days"
+        )
+        lead_distribution = dict(
+            db.query(lead_bucket, func.count(PurchaseOrder.id)).filter(delivered).group_by(lead_bucket).all()
+        )
+
+        delay_bucket = case(
+            *[(delay_days <= limit, label) for limit, label in DELAY_BUCKETS],
+            else_="late_over_3_days"
+        )
+        delay_distribution = dict(
+            db.query(delay_bucket, func.count(PurchaseOrder.id)).filter(
+                and_(delivered, has_expected)
+            ).group_by(delay_bucket).all()
+        )
+
+        deliveries = sum(row.deliveries for row in by_supplier)
+        measured = sum(int(row.with_expected or 0) for row in by_supplier)
+        on_time_total = sum(int(row.on_time or 0) for row in by_supplier)
+
+        def rounded(value) -> Optional[float]:
+            return round(float(value), 2) if value is not None else None
+
+        return {
+            "deliveries": deliveries,
+            "deliveries_with_expected_date": measured,
+            "on_time_rate": round(on_time_total / measured * 100, 2) if measured else None,
+            "lead_time_distribution": {
+                label: lead_distribution.get(label, 0)
+                for label in [label for _, label in LEAD_TIME_BUCKETS] + [f"{LEAD_TIME_BUCKETS[-1][0]}+ days"]
+            },
+            "delay_distribution": {
+                label: delay_distribution.get(label, 0)
+                for label in [label for _, label in DELAY_BUCKETS] + ["late_over_3_days"]
+            },
+            "suppliers": sorted(
+                [
+                    {
+                        "supplier_id": row.id,
+                        "name": row.name,
+                        "deliveries": row.deliveries,
+                        "on_time_rate": round(int(row.on_time or 0) / int(row.with_expected) * 100, 2) if row.with_expected else None,
+                        "average_lead_time_days": rounded(row.average_lead_time),
+                        "min_lead_time_days": rounded(row.min_lead_time),
+                        "max_lead_time_days": rounded(row.max_lead_time),
+                        "average_delay_days": rounded(row.average_delay)
+                    }
+                    for row in by_supplier
+                ],
+                key=lambda x: x["deliveries"],
+                reverse=True
+            )
+        }
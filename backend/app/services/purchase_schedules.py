@@ -0,0 +1,218 @@
+from typing import List, Dict, Any, Optional, Set
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+import logging
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from ..models.purchases import PurchaseSchedule
+from ..models.inventory import InventoryItem
+from ..models.users import User
+from ..schemas.purchases import PurchaseOrderCreate, PurchaseOrderItemCreate
+from ..core.cache import VersionedCache
+from ..core.database import SessionLocal
+from ..utils.schedules import ScheduleRecurrence
+from .purchases import PurchaseService
+
+
+logger = logging.getLogger(__name__)
+
+_occurrence_cache = VersionedCache(max_entries=64)
+
+MAX_CATCH_UP_DAYS = 7  # Older missed occurrences are not ordered retroactively
+
+
+class PurchaseScheduleService:
+
+    @staticmethod
+    def get_schedules_version(db: Session) -> tuple:
+        """Watermark that changes whenever a schedule is created or edited"""
+        return db.query(
+            func.count(PurchaseSchedule.id),
+            func.max(PurchaseSchedule.created_at),
+            func.max(PurchaseSchedule.updated_at)
+        ).one()
+
+    @staticmethod
+    def get_occurrences(db: Session, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """
+        All occurrences of active schedules in [start_date, end_date], sorted
+        by date. Cached per range until a schedule changes.
+        """
+        return _occurrence_cache.get_or_compute(
+            (start_date, end_date),
+            PurchaseScheduleService.get_schedules_version(db),
+            lambda: PurchaseScheduleService._expand(db, start_date, end_date)
+        )
+
+    @staticmethod
+    def _expand(db: Session, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        schedules = db.query(PurchaseSchedule).filter(PurchaseSchedule.is_active == True).all()
+        occurrences = []
+        for schedule in schedules:
+            dates = ScheduleRecurrence.occurrences(
+                schedule.frequency,
+                start_date,
+                end_date,
+                day_of_week=schedule.day_of_week,
+                day_of_month=schedule.day_of_month,
+                anchor=schedule.created_at.date() if schedule.created_at else None
+            )
+            for occurrence in dates:
+                occurrences.append({
+                    "schedule_id": schedule.id,
+                    "name": schedule.name,
+                    "frequency": schedule.frequency,
+                    "date": occurrence,
+                    "items": schedule.scheduled_items,
+                    "auto_create": schedule.auto_create
+                })
+        occurrences.sort(key=lambda x: (x["date"], x["name"]))
+        return occurrences
+
+    @staticmethod
+    def get_due_schedule_ids(db: Session, schedules: List[PurchaseSchedule], today: date) -> Set[int]:
+        """
+        Schedules with an occurrence after their last run and up to `today`,
+        so a run missed while the service was down is caught up once
+        """
+        windows = {
+            schedule.id: (
+                max(schedule.last_run.date() + timedelta(days=1), today - timedelta(days=MAX_CATCH_UP_DAYS))
+                if schedule.last_run else today
+            )
+            for schedule in schedules
+        }
+        if not windows:
+            return set()
+
+        occurrences = PurchaseScheduleService.get_occurrences(db, min(windows.values()), today)
+        return {
+            occurrence["schedule_id"]
+            for occurrence in occurrences
+            if occurrence["schedule_id"] in windows and occurrence["date"] >= windows[occurrence["schedule_id"]]
+        }
+
+    @staticmethod
+    def build_orders(db: Session, schedules: List[PurchaseSchedule]) -> List[PurchaseOrderCreate]:
+        """
+        Size each scheduled item up to its max_quantity from current stock
+        (ordering at least min_quantity, never more than max_quantity) and
+        group the lines into one order per primary supplier
+        """
+        item_ids = {
+            entry["item_id"]
+            for schedule in schedules
+            for entry in schedule.scheduled_items or []
+        }
+        items = {
+            item.id: item
+            for item in db.query(
+                InventoryItem.id,
+                InventoryItem.name,
+                InventoryItem.unit,
+                InventoryItem.current_stock,
+                InventoryItem.cost_per_unit,
+                InventoryItem.last_purchase_cost,
+                InventoryItem.primary_supplier_id
+            ).filter(InventoryItem.id.in_(item_ids)).all()
+        } if item_ids else {}
+
+        lines_by_supplier: Dict[int, Dict[int, Decimal]] = {}
+        sources: Dict[int, List[str]] = {}
+        for schedule in schedules:
+            for entry in schedule.scheduled_items or []:
+                item = items.get(entry["item_id"])
+                if item is None or item.primary_supplier_id is None:
+                    logger.warning("Schedule %s: item %s has no primary supplier", schedule.name, entry["item_id"])
+                    continue
+
+                min_quantity = Decimal(str(entry["min_quantity"]))
+                max_quantity = Decimal(str(entry["max_quantity"]))
+                needed = max_quantity - Decimal(str(item.current_stock or 0))
+                if needed <= 0:
+                    continue
+                quantity = min(max(needed, min_quantity), max_quantity)
+
+                lines = lines_by_supplier.setdefault(item.primary_supplier_id, {})
+                # The same item in two due schedules is ordered once, at the larger size
+                lines[item.id] = max(lines.get(item.id, Decimal("0")), quantity)
+                sources.setdefault(item.primary_supplier_id, [])
+                if schedule.name not in sources[item.primary_supplier_id]:
+                    sources[item.primary_supplier_id].append(schedule.name)
+
+        orders = []
+        for supplier_id, lines in sorted(lines_by_supplier.items()):
+            order_items = []
+            for item_id, quantity in lines.items():
+                item = items[item_id]
+                unit_cost = item.last_purchase_cost or item.cost_per_unit
+                if not unit_cost or unit_cost <= 0:
+                    logger.warning("Item %s has no cost, skipped from automatic order", item.name)
+                    continue
+                order_items.append(PurchaseOrderItemCreate(
+                    inventory_item_id=item_id,
+                    quantity_ordered=quantity.quantize(Decimal("0.001")),
+                    unit=item.unit,
+                    unit_cost=unit_cost
+                ))
+            if order_items:
+                orders.append(PurchaseOrderCreate(
+                    supplier_id=supplier_id,
+                    items=order_items,
+                    notes=f"Auto-created from schedule: {', '.join(sources[supplier_id])}"
+                ))
+        return orders
+
+    @staticmethod
+    def run_due_schedules(db: Session, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Create draft purchase orders for every auto-create schedule that is
+        due and mark those schedules as run, all in one transaction
+        """
+        today = today or date.today()
+        schedules = db.query(PurchaseSchedule).filter(
+            PurchaseSchedule.is_active == True,
+            PurchaseSchedule.auto_create == True
+        ).with_for_update(skip_locked=True).all()
+
+        due_ids = PurchaseScheduleService.get_due_schedule_ids(db, schedules, today)
+        due = [schedule for schedule in schedules if schedule.id in due_ids]
+        if not due:
+            return {"due_schedules": 0, "purchase_orders": []}
+
+        owner_id = db.query(User.id).filter(
+            User.role == "owner",
+            User.is_active == True
+        ).order_by(User.id).limit(1).scalar()
+        if owner_id is None:
+            logger.warning("No active owner to attribute automatic purchase orders to")
+            return {"due_schedules": len(due), "purchase_orders": []}
+
+        try:
+            orders = PurchaseScheduleService.build_orders(db, due)
+            db_orders = PurchaseService.insert_purchase_orders(db, orders, owner_id, status="draft") if orders else []
+            purchase_numbers = [order.purchase_number for order in db_orders]
+
+            now = datetime.now()
+            for schedule in due:
+                schedule.last_run = now
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return {
+            "due_schedules": len(due),
+            "purchase_orders": purchase_numbers
+        }
+
+    @staticmethod
+    def auto_create_job() -> Dict[str, Any]:
+        """Scheduled job: turn due purchase schedules into draft orders"""
+        db = SessionLocal()
+        try:
+            return PurchaseScheduleService.run_due_schedules(db)
+        finally:
+            db.close()
@@ -0,0 +1,306 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy import insert, update, bindparam, case, func
+
+from ..models.purchases import PurchaseOrder, PurchaseOrderItem
+from ..models.inventory import Supplier, InventoryItem, StockMovement, InventoryBatch
+from ..schemas.purchases import PurchaseOrderCreate, PurchaseOrderReceive
+from .recipes import RecipeService
+from .sequences import SequenceService
+from .supplier_prices import SupplierPriceService
+
+
+IVA_RATE = Decimal("0.12")  # 12% IVA in Ecuador
+
+
+class PurchaseService:
+
+    @staticmethod
+    def get_purchase_order(db: Session, order_id: int) -> Optional[PurchaseOrder]:
+        """Purchase order with supplier and items loaded up front (no lazy loads)"""
+        orders = PurchaseService.get_purchase_orders(db, [order_id])
+        return orders[0] if orders else None
+
+    @staticmethod
+    def get_purchase_orders(db: Session, order_ids: List[int]) -> List[PurchaseOrder]:
+        """
+        Purchase orders in id order with the supplier joined and items loaded
+        by one extra SELECT ... IN query, whatever the number of orders
+        """
+        if not order_ids:
+            return []
+        return db.query(PurchaseOrder).options(
+            joinedload(PurchaseOrder.supplier),
+            selectinload(PurchaseOrder.items)
+        ).filter(PurchaseOrder.id.in_(order_ids)).order_by(PurchaseOrder.id).all()
+
+    @staticmethod
+    def create_purchase_order(db: Session, order_data: PurchaseOrderCreate, user_id: int) -> PurchaseOrder:
+        """
+        Create a purchase order and its items in a single transaction
+        """
+        return PurchaseService.create_purchase_orders(db, [order_data], user_id)[0]
+
+    @staticmethod
+    def create_purchase_orders(db: Session, orders_data: List[PurchaseOrderCreate], user_id: int) -> List[PurchaseOrder]:
+        """
+        Create several purchase orders in one transaction. Nothing is written
+        if any supplier or inventory item does not exist.
+        """
+        try:
+            db_orders = PurchaseService.insert_purchase_orders(db, orders_data, user_id)
+            order_ids = [db_order.id for db_order in db_orders]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return PurchaseService.get_purchase_orders(db, order_ids)
+
+    @staticmethod
+    def insert_purchase_orders(
+        db: Session,
+        orders_data: List[PurchaseOrderCreate],
+        user_id: int,
+        status: str = "pending"
+    ) -> List[PurchaseOrder]:
+        """
+        Insert purchase orders in the caller's transaction: purchase numbers
+        are reserved with one atomic sequence update, headers are flushed
+        together and all items go in with a single bulk INSERT
+        """
+        supplier_ids = {order_data.supplier_id for order_data in orders_data}
+        found_suppliers = {
+            row.id for row in db.query(Supplier.id).filter(Supplier.id.in_(supplier_ids)).all()
+        }
+        missing = supplier_ids - found_suppliers
+        if missing:
+            raise ValueError(f"Supplier {min(missing)} not found")
+
+        item_ids = {item.inventory_item_id for order_data in orders_data for item in order_data.items}
+        found_items = {
+            row.id for row in db.query(InventoryItem.id).filter(InventoryItem.id.in_(item_ids)).all()
+        }
+        missing = item_ids - found_items
+        if missing:
+            raise ValueError(f"Inventory item {min(missing)} not found")
+
+        purchase_numbers = SequenceService.next_numbers(db, "PO", len(orders_data))
+
+        db_orders = []
+        for order_data, purchase_number in zip(orders_data, purchase_numbers):
+            subtotal = sum(
+                (item.quantity_ordered * item.unit_cost for item in order_data.items),
+                Decimal("0")
+            )
+            tax_amount = (subtotal * IVA_RATE).quantize(Decimal("0.01"))
+            total_cost = subtotal + tax_amount + order_data.shipping_cost
+
+            db_orders.append(PurchaseOrder(
+                purchase_number=purchase_number,
+                supplier_id=order_data.supplier_id,
+                status=status,
+                priority=order_data.priority,
+                subtotal=subtotal,
+                tax_amount=tax_amount,
+                shipping_cost=order_data.shipping_cost,
+                total_cost=total_cost,
+                expected_delivery_date=order_data.expected_delivery_date,
+                notes=order_data.notes,
+                payment_terms=order_data.payment_terms,
+                created_by=user_id
+            ))
+
+        db.add_all(db_orders)
+        db.flush()  # Assign header ids without committing
+
+        item_rows: List[Dict[str, Any]] = [
+            {
+                "purchase_order_id": db_order.id,
+                "inventory_item_id": item_data.inventory_item_id,
+                "quantity_ordered": item_data.quantity_ordered,
+                "quantity_received": Decimal("0"),
+                "unit": item_data.unit,
+                "unit_cost": item_data.unit_cost,
+                "total_cost": item_data.quantity_ordered * item_data.unit_cost,
+                "batch_number": item_data.batch_number,
+                "expiry_date": item_data.expiry_date,
+                "notes": item_data.notes
+            }
+            for db_order, order_data in zip(db_orders, orders_data)
+            for item_data in order_data.items
+        ]
+        db.execute(insert(PurchaseOrderItem), item_rows)
+        return db_orders
+
+    @staticmethod
+    def receive_purchase_order(
+        db: Session,
+        order: PurchaseOrder,
+        receive_data: PurchaseOrderReceive,
+        user_id: int
+    ) -> Dict[str, Any]:
+        """
+        Receive a delivery against a purchase order in one transaction.
+
+        The number of statements does not depend on the number of lines: line
+        updates, batches, purchase movements and stock/cost updates are each a
+        single bulk statement. Stock is incremented in SQL and cost_per_unit
+        becomes the weighted average of stock on hand and the delivery. The
+        supplier price index is updated and only menu items using a received
+        ingredient are re-costed.
+        """
+        lines = {
+            row.id: row
+            for row in db.query(
+                PurchaseOrderItem.id,
+                PurchaseOrderItem.inventory_item_id,
+                PurchaseOrderItem.quantity_ordered,
+                PurchaseOrderItem.quantity_received,
+                PurchaseOrderItem.unit_cost,
+                PurchaseOrderItem.batch_number,
+                PurchaseOrderItem.expiry_date
+            ).filter(PurchaseOrderItem.purchase_order_id == order.id).all()
+        }
+        unknown = [
+            item.purchase_order_item_id for item in receive_data.items
+            if item.purchase_order_item_id not in lines
+        ]
+        if unknown:
+            raise ValueError(f"Line {unknown[0]} does not belong to purchase order {order.purchase_number}")
+
+        received_at = receive_data.actual_delivery_date or datetime.now()
+        line_updates = []
+        batch_rows = []
+        per_item: Dict[int, Dict[str, Decimal]] = {}
+
+        for item in receive_data.items:
+            line = lines[item.purchase_order_item_id]
+            batch_number = item.batch_number or line.batch_number
+            expiry_date = item.expiry_date or line.expiry_date
+
+            line_updates.append({
+                "line_id": line.id,
+                "quantity_received": (line.quantity_received or Decimal("0")) + item.quantity_received,
+                "quality_rating": item.quality_rating,
+                "batch_number": batch_number,
+                "expiry_date": expiry_date,
+                "notes": item.notes
+            })
+
+            if item.quantity_received <= 0:
+                continue
+
+            batch_rows.append({
+                "inventory_item_id": line.inventory_item_id,
+                "batch_number": batch_number,
+                "expiry_date": expiry_date,
+                "quantity_received": item.quantity_received,
+                "quantity_remaining": item.quantity_received,
+                "unit_cost": line.unit_cost,
+                "purchase_order_item_id": line.id,
+                "received_at": received_at
+            })
+
+            totals = per_item.setdefault(
+                line.inventory_item_id,
+                {"quantity": Decimal("0"), "cost": Decimal("0"), "last_cost": line.unit_cost}
+            )
+            totals["quantity"] += item.quantity_received
+            totals["cost"] += item.quantity_received * line.unit_cost
+            totals["last_cost"] = line.unit_cost
+
+        try:
+            lines_table = PurchaseOrderItem.__table__
+            db.execute(
+                update(lines_table).where(lines_table.c.id == bindparam("line_id")).values(
+                    quantity_received=bindparam("quantity_received"),
+                    quality_rating=func.coalesce(bindparam("quality_rating"), lines_table.c.quality_rating),
+                    batch_number=bindparam("batch_number"),
+                    expiry_date=bindparam("expiry_date"),
+                    notes=func.coalesce(bindparam("notes"), lines_table.c.notes)
+                ),
+                line_updates
+            )
+
+            movement_rows = []
+            if batch_rows:
+                batch_ids = db.scalars(
+                    insert(InventoryBatch).returning(InventoryBatch.id, sort_by_parameter_order=True),
+                    batch_rows
+                ).all()
+                movement_rows = [
+                    {
+                        "inventory_item_id": batch["inventory_item_id"],
+                        "movement_type": "purchase",
+                        "quantity": batch["quantity_received"],
+                        "unit_cost": batch["unit_cost"],
+                        "total_cost": (batch["quantity_received"] * batch["unit_cost"]).quantize(Decimal("0.01")),
+                        "reference_type": "purchase_order",
+                        "reference_id": order.id,
+                        "batch_id": batch_id,
+                        "batch_number": batch["batch_number"],
+                        "expiry_date": batch["expiry_date"],
+                        "notes": f"Received on {order.purchase_number}",
+                        "created_by": user_id,
+                        "created_at": received_at
+                    }
+                    for batch, batch_id in zip(batch_rows, batch_ids)
+                ]
+                db.execute(insert(StockMovement), movement_rows)
+
+            if per_item:
+                items_table = InventoryItem.__table__
+                quantity = bindparam("received_quantity")
+                stock = items_table.c.current_stock
+                db.execute(
+                    update(items_table).where(items_table.c.id == bindparam("item_id")).values(
+                        current_stock=stock + quantity,
+                        cost_per_unit=case(
+                            (stock > 0, (stock * items_table.c.cost_per_unit + bindparam("received_cost")) / (stock + quantity)),
+                            else_=bindparam("received_cost") / quantity
+                        ),
+                        last_purchase_cost=bindparam("last_cost")
+                    ),
+                    [
+                        {
+                            "item_id": item_id,
+                            "received_quantity": totals["quantity"],
+                            "received_cost": totals["cost"],
+                            "last_cost": totals["last_cost"]
+                        }
+                        for item_id, totals in per_item.items()
+                    ]
+                )
+
+            SupplierPriceService.record_prices(
+                db,
+                order.supplier_id,
+                {item_id: totals["cost"] / totals["quantity"] for item_id, totals in per_item.items()},
+                received_at
+            )
+
+            received = {line_id: line.quantity_received or Decimal("0") for line_id, line in lines.items()}
+            received.update({row["line_id"]: row["quantity_received"] for row in line_updates})
+            fully_received = all(received[line_id] >= line.quantity_ordered for line_id, line in lines.items())
+            order.status = "received" if fully_received else "ordered"
+            order.actual_delivery_date = received_at
+            order.received_by = user_id
+            if receive_data.notes:
+                order.notes = f"{order.notes}\n{receive_data.notes}" if order.notes else receive_data.notes
+
+            updated_menu_items = RecipeService.recalculate_menu_costs(db, per_item.keys())
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return {
+            "purchase_order": PurchaseService.get_purchase_order(db, order.id),
+            "lines_received": len(movement_rows),
+            "total_received_cost": sum((row["total_cost"] for row in movement_rows), Decimal("0")),
+            "updated_menu_items": updated_menu_items
+        }
@@ -0,0 +1,134 @@
+from typing import List, Iterable, Dict, Any, Set
+from decimal import Decimal
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update, bindparam
+
+from ..models.menu import MenuItem
+from ..models.inventory import InventoryItem
+from ..core.cache import VersionedCache
+from ..utils.recipes import RecipeMatrix, convert_quantity, sub_recipe_order
+
+
+_recipe_cache = VersionedCache()
+
+
+class RecipeService:
+
+    @staticmethod
+    def get_menu_version(db: Session) -> tuple:
+        """
+        Watermark over menu items and inventory units; changes when a menu item
+        or inventory item is created or edited
+        """
+        return db.execute(
+            select(
+                select(func.count(MenuItem.id)).scalar_subquery(),
+                select(func.max(MenuItem.updated_at)).scalar_subquery(),
+                select(func.count(InventoryItem.id)).scalar_subquery(),
+                select(func.max(InventoryItem.updated_at)).scalar_subquery()
+            )
+        ).one()
+
+    @staticmethod
+    def get_recipe_matrix(db: Session) -> RecipeMatrix:
+        """
+        Sparse menu-item x ingredient matrix, rebuilt only when the menu changes
+        """
+        version = RecipeService.get_menu_version(db)
+        return _recipe_cache.get_or_compute(
+            "recipe_matrix",
+            version,
+            lambda: RecipeService._build_recipe_matrix(db)
+        )
+
+    @staticmethod
+    def invalidate() -> None:
+        """Drop the cached matrix (called after menu edits in this process)"""
+        _recipe_cache.invalidate()
+
+    @staticmethod
+    def recalculate_menu_costs(db: Session, ingredient_ids: Iterable[int]) -> List[int]:
+        """
+        Re-cost only the menu items whose recipe uses one of `ingredient_ids`,
+        directly or through prepared items (sauces, dough), from current
+        ingredient costs. Prepared items are re-costed first, in dependency
+        order; menu items are then updated in one bulk UPDATE. Items using an
+        ingredient without a cost keep their current cost. Returns the ids of
+        the menu items that were updated.
+        """
+        inventory = {
+            item.id: item
+            for item in db.query(
+                InventoryItem.id, InventoryItem.unit, InventoryItem.cost_per_unit, InventoryItem.recipe
+            ).all()
+        }
+        costs = {item_id: item.cost_per_unit for item_id, item in inventory.items()}
+        changed = set(ingredient_ids)
+        prepared_costs = RecipeService._recost_prepared_items(inventory, costs, changed)
+        if prepared_costs:
+            inventory_items = InventoryItem.__table__
+            db.execute(
+                update(inventory_items).where(inventory_items.c.id == bindparam("item_id")).values(cost_per_unit=bindparam("unit_cost")),
+                [{"item_id": item_id, "unit_cost": cost} for item_id, cost in prepared_costs.items()]
+            )
+
+        recipe_matrix = RecipeService.get_recipe_matrix(db)
+        menu_item_ids = recipe_matrix.menu_items_using(changed)
+        if not menu_item_ids:
+            return []
+
+        known = np.array([bool(costs.get(ingredient_id)) for ingredient_id in recipe_matrix.ingredient_ids])
+        cost_vector = np.array(
+            [float(costs.get(ingredient_id) or 0) for ingredient_id in recipe_matrix.ingredient_ids]
+        )
+        rows = [recipe_matrix.item_index[menu_item_id] for menu_item_id in menu_item_ids]
+        recipes = recipe_matrix.matrix[rows]
+        recipe_costs = recipes @ cost_vector
+        uncosted = np.asarray(recipes[:, ~known].getnnz(axis=1)).ravel() > 0
+
+        updates = [
+            {"menu_item_id": menu_item_id, "recipe_cost": Decimal(str(round(float(cost), 2)))}
+            for menu_item_id, cost, skip in zip(menu_item_ids, recipe_costs, uncosted)
+            if not skip  # An ingredient without a cost would under-cost it
+        ]
+        if not updates:
+            return []
+        menu_items = MenuItem.__table__
+        db.execute(
+            update(menu_items).where(menu_items.c.id == bindparam("menu_item_id")).values(cost=bindparam("recipe_cost")),
+            updates
+        )
+        return [row["menu_item_id"] for row in updates]
+
+    @staticmethod
+    def _recost_prepared_items(inventory: Dict[int, Any], costs: Dict[int, Decimal], changed: Set[int]) -> Dict[int, Decimal]:
+        """
+        Unit cost of every prepared item whose recipe uses a changed
+        ingredient, sub-preparations first. Updates `costs` and `changed` in
+        place and returns the new costs.
+        """
+        recipes = {item_id: item.recipe for item_id, item in inventory.items() if item.recipe}
+        updated = {}
+        for item_id in sub_recipe_order(recipes):
+            entries = [entry for entry in recipes[item_id] if entry.get("ingredient_id") is not None]
+            if not any(entry["ingredient_id"] in changed for entry in entries):
+                continue
+            if not all(costs.get(entry["ingredient_id"]) for entry in entries):
+                continue  # An ingredient without a cost would under-cost it
+            cost = sum(
+                Decimal(str(convert_quantity(
+                    float(entry.get("quantity", 0)), entry.get("unit"), inventory[entry["ingredient_id"]].unit
+                ))) * costs[entry["ingredient_id"]]
+                for entry in entries
+            )
+            updated[item_id] = cost.quantize(Decimal("0.0001"))
+            costs[item_id] = updated[item_id]
+            changed.add(item_id)
+        return updated
+
+    @staticmethod
+    def _build_recipe_matrix(db: Session) -> RecipeMatrix:
+        ingredient_units = dict(db.query(InventoryItem.id, InventoryItem.unit).all())
+        recipes = db.query(MenuItem.id, MenuItem.recipe).order_by(MenuItem.id).all()
+        return RecipeMatrix.from_recipes(recipes, ingredient_units)
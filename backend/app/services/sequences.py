@@ -0,0 +1,38 @@
+from typing import List, Optional
+from datetime import datetime, date
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from ..models.sequences import DocumentSequence
+from ..utils.sql import dialect_insert
+
+
+class SequenceService:
+
+    @staticmethod
+    def allocate(db: Session, name: str, count: int = 1) -> int:
+        """
+        Atomically reserve `count` consecutive values of the `name` counter
+        and return the last one. A single INSERT ... ON CONFLICT DO UPDATE
+        ... RETURNING takes the row lock, so concurrent transactions can never
+        receive the same value.
+        """
+        stmt = dialect_insert(db, DocumentSequence).values(name=name, last_value=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={
+                "last_value": DocumentSequence.__table__.c.last_value + count,
+                "updated_at": func.now()
+            }
+        ).returning(DocumentSequence.__table__.c.last_value)
+        return db.execute(stmt).scalar_one()
+
+    @staticmethod
+    def next_numbers(db: Session, prefix: str, count: int = 1, day: Optional[date] = None) -> List[str]:
+        """
+        Allocate `count` document numbers of the form PREFIXYYYYMMDD0001,
+        numbered per day
+        """
+        day_key = f"{prefix}{(day or datetime.now().date()).strftime('%Y%m%d')}"
+        last_value = SequenceService.allocate(db, day_key, count)
+        return [f"{day_key}{value:04d}" for value in range(last_value - count + 1, last_value + 1)]
@@ -0,0 +1,359 @@
+from typing import Dict, Any, Iterator, List, Optional
+from datetime import date, datetime, time, timedelta
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, select, insert
+
+from ..models.staff import Staff, WorkSchedule
+from ..models.orders import Order
+from ..core.cache import VersionedCache
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..utils.schedule_conflicts import ScheduleConflictChecker
+from ..utils.scheduling import ShiftScheduler
+from ..utils.sql import seconds_between, hour_of, weekday_of
+
+
+_checker_cache = VersionedCache(max_entries=16)
+
+
+class ScheduleConflictError(ValueError):
+    """A shift overlaps existing shifts of the same staff member"""
+
+    def __init__(self, conflicts: List[Dict[str, Any]]):
+        super().__init__("Shift overlaps existing shifts of this staff member")
+        self.conflicts = conflicts
+
+
+class StaffService:
+
+    @staticmethod
+    def get_schedule(db: Session, start_date: date, end_date: date) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Active staff schedules between two dates (inclusive), keyed by
+        'YYYY-MM-DD' with every day present. Staff names come from the same
+        query and rows are bucketed in a single pass.
+        """
+        rows = db.query(
+            WorkSchedule.staff_id,
+            WorkSchedule.schedule_date,
+            WorkSchedule.start_time,
+            WorkSchedule.end_time,
+            WorkSchedule.status,
+            Staff.first_name,
+            Staff.last_name,
+            Staff.position
+        ).join(
+            Staff, Staff.id == WorkSchedule.staff_id
+        ).filter(
+            WorkSchedule.schedule_date >= start_date,
+            WorkSchedule.schedule_date <= end_date,
+            Staff.employment_status == "active"
+        ).order_by(WorkSchedule.schedule_date, WorkSchedule.start_time).all()
+
+        schedule: Dict[str, List[Dict[str, Any]]] = {
+            (start_date + timedelta(days=i)).strftime('%Y-%m-%d'): []
+            for i in range((end_date - start_date).days + 1)
+        }
+        for row in rows:
+            schedule[row.schedule_date.strftime('%Y-%m-%d')].append({
+                "staff_id": row.staff_id,
+                "staff_name": f"{row.first_name} {row.last_name}",
+                "position": row.position,
+                "start_time": row.start_time.strftime('%H:%M'),
+                "end_time": row.end_time.strftime('%H:%M'),
+                "status": row.status
+            })
+        return schedule
+
+    @staticmethod
+    def iter_utilization(start_date: date, end_date: date, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Scheduled vs worked hours per active staff member from one grouped
+        query, streamed in batches. Opens its own session because it is
+        consumed while the response is being sent.
+        """
+        db = SessionLocal()
+        try:
+            scheduled = seconds_between(db, WorkSchedule.start_time, WorkSchedule.end_time)
+            # Shifts crossing midnight end "before" they start
+            scheduled = case((scheduled < 0, scheduled + 86400), else_=scheduled)
+            worked = case(
+                (
+                    and_(WorkSchedule.actual_start_time.isnot(None), WorkSchedule.actual_end_time.isnot(None)),
+                    seconds_between(db, WorkSchedule.actual_start_time, WorkSchedule.actual_end_time)
+                ),
+                else_=0
+            )
+
+            stmt = select(
+                Staff.id,
+                Staff.first_name,
+                Staff.last_name,
+                Staff.position,
+                func.count(WorkSchedule.id).label("shifts"),
+                func.coalesce(func.sum(scheduled), 0).label("scheduled_seconds"),
+                func.coalesce(func.sum(worked), 0).label("worked_seconds")
+            ).select_from(Staff).outerjoin(
+                WorkSchedule,
+                and_(
+                    WorkSchedule.staff_id == Staff.id,
+                    WorkSchedule.schedule_date >= start_date,
+                    WorkSchedule.schedule_date <= end_date
+                )
+            ).where(
+                Staff.employment_status == "active"
+            ).group_by(
+                Staff.id, Staff.first_name, Staff.last_name, Staff.position
+            ).order_by(Staff.id).execution_options(yield_per=batch_size)
+
+            for row in db.execute(stmt):
+                scheduled_hours = float(row.scheduled_seconds) / 3600
+                worked_hours = float(row.worked_seconds) / 3600
+                yield {
+                    "staff_id": row.id,
+                    "staff_name": f"{row.first_name} {row.last_name}",
+                    "position": row.position,
+                    "shifts": row.shifts,
+                    "scheduled_hours": round(scheduled_hours, 2),
+                    "worked_hours": round(worked_hours, 2),
+                    "utilization_rate": round(worked_hours / scheduled_hours * 100, 2) if scheduled_hours > 0 else 0
+                }
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_demand_curve(db: Session, history_days: int) -> np.ndarray:
+        """Average orders per weekday (0=Monday) and hour over the last `history_days`"""
+        since = datetime.now() - timedelta(days=history_days)
+        weekday = weekday_of(db, Order.created_at)
+        hour = hour_of(db, Order.created_at)
+        rows = db.query(weekday, hour, func.count(Order.id)).filter(
+            Order.created_at >= since,
+            Order.status != "cancelled"
+        ).group_by(weekday, hour).all()
+
+        demand = np.zeros((7, 24))
+        for day, hour_value, count in rows:
+            demand[int(day), int(hour_value)] = count
+        occurrences = np.array([
+            sum(1 for d in range(history_days) if (since.date() + timedelta(days=d + 1)).weekday() == weekday_index)
+            for weekday_index in range(7)
+        ])
+        return demand / np.maximum(occurrences, 1)[:, None]
+
+    @staticmethod
+    def propose_schedule(
+        db: Session,
+        start_date: date,
+        weeks: int = 1,
+        apply: bool = False,
+        time_budget: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Shift proposal for active staff covering the historical weekday x hour
+        demand curve at minimum labor cost. Existing (non-cancelled) schedules
+        in the period are kept and counted. With `apply`, the proposed shifts
+        are inserted as WorkSchedule rows.
+        """
+        days = weeks * 7
+        end_date = start_date + timedelta(days=days - 1)
+        demand = StaffService.get_demand_curve(db, settings.DEMAND_HISTORY_DAYS)
+        requirements = ShiftScheduler.requirements_from_demand(
+            demand,
+            start_date,
+            days,
+            settings.STAFF_ORDERS_PER_HOUR,
+            settings.STAFF_MIN_ON_DUTY,
+            settings.KITCHEN_OPENING_HOUR,
+            settings.KITCHEN_CLOSING_HOUR
+        )
+
+        members = db.query(Staff).filter(Staff.employment_status == "active").order_by(Staff.id).all()
+        staff = [
+            {
+                "id": member.id,
+                "name": f"{member.first_name} {member.last_name}",
+                "position": member.position,
+                "skills": member.skills or [],
+                "hourly_rate": float(member.hourly_rate) if member.hourly_rate else None,
+                "max_hours_per_week": member.max_hours_per_week,
+                "preferred_days": member.preferred_days or []
+            }
+            for member in members
+        ]
+
+        existing = []
+        for row in db.query(
+            WorkSchedule.staff_id, WorkSchedule.schedule_date, WorkSchedule.start_time, WorkSchedule.end_time
+        ).filter(
+            WorkSchedule.schedule_date >= start_date,
+            WorkSchedule.schedule_date <= end_date,
+            WorkSchedule.status != "cancelled"
+        ).all():
+            end_hour = row.end_time.hour + (1 if row.end_time.minute or row.end_time.second else 0)
+            if end_hour <= row.start_time.hour:
+                end_hour = 24
+            existing.append((row.staff_id, (row.schedule_date - start_date).days, row.start_time.hour, end_hour))
+
+        scheduler = ShiftScheduler(
+            requirements,
+            staff,
+            start_date,
+            shift_lengths=tuple(settings.SHIFT_LENGTHS_HOURS),
+            opening_hour=settings.KITCHEN_OPENING_HOUR,
+            closing_hour=settings.KITCHEN_CLOSING_HOUR,
+            non_preferred_penalty=settings.SHIFT_NON_PREFERRED_DAY_PENALTY,
+            default_hourly_rate=settings.DEFAULT_STAFF_HOURLY_RATE,
+            existing=existing
+        )
+        result = scheduler.solve(
+            time_budget=time_budget if time_budget is not None else settings.SHIFT_SCHEDULER_TIME_BUDGET_SECONDS
+        )
+
+        names = {member["id"]: member["name"] for member in staff}
+        for shift in result["shifts"]:
+            shift["staff_name"] = names[shift["staff_id"]]
+            shift["start_time"] = time(shift.pop("start_hour"))
+            shift["end_time"] = time(shift.pop("end_hour") % 24)
+
+        if apply and result["shifts"]:
+            db.execute(insert(WorkSchedule), [
+                {
+                    "staff_id": shift["staff_id"],
+                    "schedule_date": shift["date"],
+                    "start_time": shift["start_time"],
+                    "end_time": shift["end_time"],
+                    "status": "scheduled",
+                    "notes": f"Auto-scheduled ({shift['role']})"
+                }
+                for shift in result["shifts"]
+            ])
+            db.commit()
+
+        result.update({
+            "start_date": start_date,
+            "end_date": end_date,
+            "applied": apply,
+            "existing_shifts": len(existing)
+        })
+        return result
+
+    @staticmethod
+    def _checker_range(week_start: date):
+        """Schedules of a week padded by a day on each side (shifts crossing midnight)"""
+        return and_(
+            WorkSchedule.schedule_date >= week_start - timedelta(days=1),
+            WorkSchedule.schedule_date <= week_start + timedelta(days=7)
+        )
+
+    @staticmethod
+    def _get_checker_version(db: Session, week_start: date) -> tuple:
+        return tuple(db.query(
+            func.count(WorkSchedule.id),
+            func.max(WorkSchedule.id),
+            func.max(WorkSchedule.updated_at),
+            func.sum(case((WorkSchedule.status == "cancelled", 1), else_=0))
+        ).filter(StaffService._checker_range(week_start)).one())
+
+    @staticmethod
+    def get_conflict_checker(db: Session, week_start: date, version: Optional[tuple] = None) -> ScheduleConflictChecker:
+        """
+        Interval index of the non-cancelled shifts around a week (Monday-based),
+        kept in memory until the week's schedules change
+        """
+        def build() -> ScheduleConflictChecker:
+            rows = db.query(
+                WorkSchedule.id,
+                WorkSchedule.staff_id,
+                Staff.position,
+                WorkSchedule.schedule_date,
+                WorkSchedule.start_time,
+                WorkSchedule.end_time,
+                WorkSchedule.break_start,
+                WorkSchedule.break_end
+            ).join(
+                Staff, Staff.id == WorkSchedule.staff_id
+            ).filter(
+                StaffService._checker_range(week_start),
+                WorkSchedule.status != "cancelled"
+            ).all()
+            return ScheduleConflictChecker(dict(row._mapping) for row in rows)
+
+        if version is None:
+            version = StaffService._get_checker_version(db, week_start)
+        return _checker_cache.get_or_compute(week_start, version, build)
+
+    @staticmethod
+    def create_schedule(db: Session, schedule_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add a shift after checking it against the staff member's other shifts
+        (raises ScheduleConflictError). Returns the new schedule and the
+        coverage gaps left that day for the staff member's position.
+        """
+        staff = db.query(Staff).filter(Staff.id == schedule_data["staff_id"]).with_for_update().first()
+        if not staff:
+            raise LookupError("Staff member not found")
+        if staff.employment_status != "active":
+            raise ValueError("Staff member is not active")
+
+        schedule_date = schedule_data["schedule_date"]
+        week_start = schedule_date - timedelta(days=schedule_date.weekday())
+        version = StaffService._get_checker_version(db, week_start)
+        checker = StaffService.get_conflict_checker(db, week_start, version)
+        shift = {**schedule_data, "position": staff.position}
+        if schedule_data.get("status") != "cancelled":
+            conflicts = checker.conflicts(shift)
+            if conflicts:
+                raise ScheduleConflictError(conflicts)
+
+        schedule = WorkSchedule(**schedule_data)
+        db.add(schedule)
+        db.commit()
+        db.refresh(schedule)
+
+        # Keep the cached index in step instead of rebuilding it, unless other
+        # shifts were written to the week in the meantime
+        if schedule.status != "cancelled":
+            checker.add({**shift, "id": schedule.id})
+        new_version = StaffService._get_checker_version(db, week_start)
+        if new_version[0] == version[0] + 1 and new_version[1] == schedule.id:
+            _checker_cache.set(week_start, new_version, checker)
+        else:
+            _checker_cache.invalidate(week_start)
+
+        return {
+            "schedule": schedule,
+            "coverage_gaps": checker.coverage_gaps(
+                staff.position,
+                schedule_date,
+                schedule_date,
+                settings.KITCHEN_OPENING_HOUR,
+                settings.KITCHEN_CLOSING_HOUR
+            )
+        }
+
+    @staticmethod
+    def get_coverage_report(db: Session, week_start: date, positions: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Double-bookings and per-position coverage gaps across a week"""
+        checker = StaffService.get_conflict_checker(db, week_start)
+        week_end = week_start + timedelta(days=6)
+        positions = positions or list(settings.STAFF_MIN_ON_DUTY)
+        gaps = {
+            position: checker.coverage_gaps(
+                position,
+                week_start,
+                week_end,
+                settings.KITCHEN_OPENING_HOUR,
+                settings.KITCHEN_CLOSING_HOUR
+            )
+            for position in positions
+        }
+        return {
+            "week_start": week_start,
+            "week_end": week_end,
+            "shifts": len(checker),
+            "double_bookings": checker.double_bookings(),
+            "coverage_gaps": gaps,
+            "uncovered_minutes": {position: sum(gap["minutes"] for gap in gaps[position]) for position in positions}
+        }
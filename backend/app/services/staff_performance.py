@@ -0,0 +1,194 @@
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import math
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, case, update, bindparam, and_
+
+from ..models.orders import Order
+from ..models.staff import Staff, WorkSchedule, StaffPerformance, TimePunch
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..utils.sql import seconds_between, upsert
+from .time_clock import TimeClockService
+
+
+DERIVED_COLUMNS = ["orders_handled", "hours_worked", "tardiness_count", "overtime_hours", "speed_score"]
+
+
+class StaffPerformanceService:
+
+    @staticmethod
+    def _handler():
+        """
+        Staff member credited with an order: the assigned staff member, or
+        else the staff member linked to the user who entered it
+        """
+        creator = aliased(Staff)
+        return creator, func.coalesce(Order.assigned_staff_id, creator.id)
+
+    @staticmethod
+    def compute_period(db: Session, period_start: date, period_end: date) -> List[Dict[str, Any]]:
+        """
+        Derived performance metrics of every staff member with activity (or
+        active) in a period, from one grouped query over orders and one over
+        punches. Punches count towards the period of the shift they matched,
+        as the time clock does when it increments these rows.
+        """
+        since = datetime.combine(period_start, datetime.min.time())
+        until = datetime.combine(period_end + timedelta(days=1), datetime.min.time())
+        grace = settings.TIME_CLOCK_GRACE_MINUTES
+
+        creator, handler = StaffPerformanceService._handler()
+        # Kitchen time (preparing -> ready) where the stages were recorded,
+        # else order-to-delivery time; each relative to its own target
+        prepared = and_(Order.preparing_at.isnot(None), Order.ready_at.isnot(None))
+        delivered = Order.delivered_at.isnot(None)
+        relative_time = case(
+            (prepared, seconds_between(db, Order.preparing_at, Order.ready_at) / (settings.PREP_TARGET_MINUTES * 60)),
+            (delivered, seconds_between(db, Order.created_at, Order.delivered_at) / (settings.ORDER_TARGET_MINUTES * 60)),
+            else_=None
+        )
+        orders = {
+            row.staff_id: row
+            for row in db.query(
+                handler.label("staff_id"),
+                func.count(Order.id).label("orders"),
+                func.avg(relative_time).label("relative_time")
+            ).outerjoin(
+                creator, creator.user_id == Order.created_by
+            ).filter(
+                Order.created_at >= since,
+                Order.created_at < until,
+                Order.status != "cancelled",
+                handler.isnot(None)
+            ).group_by(handler).all()
+        }
+
+        punches = {
+            row.staff_id: row
+            for row in db.query(
+                TimePunch.staff_id,
+                func.coalesce(func.sum(TimePunch.worked_minutes), 0).label("worked_minutes"),
+                func.sum(case((TimePunch.late_minutes > grace, 1), else_=0)).label("late"),
+                func.coalesce(func.sum(case((TimePunch.overtime_minutes > grace, TimePunch.overtime_minutes), else_=0)), 0).label("overtime_minutes")
+            ).join(
+                WorkSchedule, WorkSchedule.id == TimePunch.work_schedule_id
+            ).filter(
+                WorkSchedule.schedule_date >= period_start,
+                WorkSchedule.schedule_date <= period_end
+            ).group_by(TimePunch.staff_id).all()
+        }
+
+        active = {staff_id for (staff_id,) in db.query(Staff.id).filter(Staff.employment_status == "active").all()}
+        rows = []
+        for staff_id in sorted(active | set(orders) | set(punches)):
+            order_row = orders.get(staff_id)
+            punch_row = punches.get(staff_id)
+            rows.append({
+                "staff_id": staff_id,
+                "period_start": period_start,
+                "period_end": period_end,
+                "orders_handled": order_row.orders if order_row else 0,
+                "hours_worked": (Decimal(int(punch_row.worked_minutes)) / 60).quantize(Decimal("0.01")) if punch_row else Decimal("0"),
+                "tardiness_count": int(punch_row.late or 0) if punch_row else 0,
+                "overtime_hours": (Decimal(int(punch_row.overtime_minutes)) / 60).quantize(Decimal("0.01")) if punch_row else Decimal("0"),
+                "speed_score": StaffPerformanceService.speed_score(
+                    float(order_row.relative_time) if order_row and order_row.relative_time is not None else None
+                )
+            })
+        return rows
+
+    @staticmethod
+    def speed_score(relative_time: Optional[float]) -> Optional[Decimal]:
+        """
+        1-5 score of average time taken over target time: 5 at half the
+        target or faster, 3 on target, 1 at twice the target or slower (log
+        scale)
+        """
+        if relative_time is None:
+            return None
+        ratio = min(max(relative_time, 0.5), 2.0)
+        # log2(ratio) runs from -1 (fast) to 1 (slow)
+        score = 3 - 2 * math.log2(ratio)
+        return Decimal(str(round(score, 2)))
+
+    @staticmethod
+    def recompute(db: Session, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Upsert the derived columns of the monthly performance rows covering
+        [start_date, end_date] in bulk, then refresh the lifetime totals on
+        Staff. Reviewer fields (scores, notes) are left untouched.
+        """
+        periods: List[Tuple[date, date]] = []
+        period = TimeClockService.period_of(start_date)
+        while period[0] <= end_date:
+            periods.append(period)
+            period = TimeClockService.period_of(period[1] + timedelta(days=1))
+
+        rows = []
+        for period_start, period_end in periods:
+            rows.extend(StaffPerformanceService.compute_period(db, period_start, period_end))
+        upsert(db, StaffPerformance, rows, ["staff_id", "period_start", "period_end"], DERIVED_COLUMNS)
+
+        updated_staff = StaffPerformanceService.refresh_totals(db)
+        return {
+            "periods": [{"period_start": start.isoformat(), "period_end": end.isoformat()} for start, end in periods],
+            "rows": len(rows),
+            "staff_totals_updated": updated_staff
+        }
+
+    @staticmethod
+    def refresh_totals(db: Session) -> int:
+        """Lifetime orders handled and hours worked per staff member, in one executemany"""
+        creator, handler = StaffPerformanceService._handler()
+        orders = dict(
+            db.query(handler, func.count(Order.id)).outerjoin(
+                creator, creator.user_id == Order.created_by
+            ).filter(
+                Order.status != "cancelled",
+                handler.isnot(None)
+            ).group_by(handler).all()
+        )
+        minutes = dict(
+            db.query(TimePunch.staff_id, func.sum(TimePunch.worked_minutes)).filter(
+                TimePunch.worked_minutes.isnot(None)
+            ).group_by(TimePunch.staff_id).all()
+        )
+
+        staff_ids = [staff_id for (staff_id,) in db.query(Staff.id).all()]
+        if not staff_ids:
+            return 0
+
+        table = Staff.__table__
+        db.execute(
+            update(table).where(table.c.id == bindparam("staff_id")).values(
+                total_orders_handled=bindparam("orders"),
+                total_hours_worked=bindparam("hours")
+            ),
+            [
+                {
+                    "staff_id": staff_id,
+                    "orders": orders.get(staff_id, 0),
+                    "hours": (Decimal(int(minutes.get(staff_id) or 0)) / 60).quantize(Decimal("0.01"))
+                }
+                for staff_id in staff_ids
+            ]
+        )
+        return len(staff_ids)
+
+    @staticmethod
+    def refresh_job() -> Dict[str, Any]:
+        """
+        Scheduled job: recompute the current and previous month, so late
+        punches and deliveries are picked up
+        """
+        db = SessionLocal()
+        try:
+            today = date.today()
+            previous_start, _ = TimeClockService.period_of(today.replace(day=1) - timedelta(days=1))
+            result = StaffPerformanceService.recompute(db, previous_start, today)
+            db.commit()
+            return result
+        finally:
+            db.close()
@@ -0,0 +1,284 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+from decimal import Decimal
+import math
+import time
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, insert
+
+from ..models.purchases import PurchaseOrder, PurchaseOrderItem, SupplierPriceIndex
+from ..models.inventory import Supplier, InventoryItem
+from ..core.config import settings
+from ..utils.optimization import BusinessOptimizer
+from ..utils.sql import dialect_insert
+from .inventory import InventoryService
+
+
+class SupplierPriceService:
+
+    @staticmethod
+    def record_prices(db: Session, supplier_id: int, prices: Dict[int, Decimal], observed_at: datetime) -> None:
+        """
+        Fold new unit prices (inventory_item_id -> price) from one supplier into
+        the price index with a single upsert. The moving average and variance
+        are exponentially weighted and updated in SQL.
+        """
+        if not prices:
+            return
+
+        alpha = Decimal(str(settings.PRICE_INDEX_EWMA_ALPHA))
+        index = SupplierPriceIndex.__table__
+        stmt = dialect_insert(db, SupplierPriceIndex)
+        new_price = stmt.excluded.latest_price
+        deviation = new_price - index.c.average_price
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["inventory_item_id", "supplier_id"],
+            set_={
+                "latest_price": new_price,
+                "average_price": index.c.average_price + alpha * deviation,
+                "price_variance": (1 - alpha) * (index.c.price_variance + alpha * deviation * deviation),
+                "min_price": case((new_price < index.c.min_price, new_price), else_=index.c.min_price),
+                "max_price": case((new_price > index.c.max_price, new_price), else_=index.c.max_price),
+                "observations": index.c.observations + 1,
+                "last_observed_at": stmt.excluded.last_observed_at
+            }
+        )
+        db.execute(stmt, [
+            {
+                "inventory_item_id": item_id,
+                "supplier_id": supplier_id,
+                "latest_price": price,
+                "average_price": price,
+                "price_variance": Decimal("0"),
+                "min_price": price,
+                "max_price": price,
+                "observations": 1,
+                "first_observed_at": observed_at,
+                "last_observed_at": observed_at
+            }
+            for item_id, price in prices.items()
+        ])
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Recompute the whole index from received purchase order lines, oldest
+        first. Returns the number of (item, supplier) pairs.
+        """
+        alpha = settings.PRICE_INDEX_EWMA_ALPHA
+        lines = db.query(
+            PurchaseOrderItem.inventory_item_id,
+            PurchaseOrder.supplier_id,
+            PurchaseOrderItem.unit_cost,
+            PurchaseOrder.actual_delivery_date
+        ).join(
+            PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id
+        ).filter(
+            PurchaseOrder.actual_delivery_date.isnot(None),
+            PurchaseOrderItem.quantity_received > 0
+        ).order_by(PurchaseOrder.actual_delivery_date, PurchaseOrderItem.id).all()
+
+        index: Dict[tuple, Dict[str, Any]] = {}
+        for line in lines:
+            price = float(line.unit_cost)
+            entry = index.get((line.inventory_item_id, line.supplier_id))
+            if entry is None:
+                index[(line.inventory_item_id, line.supplier_id)] = {
+                    "inventory_item_id": line.inventory_item_id,
+                    "supplier_id": line.supplier_id,
+                    "latest_price": price,
+                    "average_price": price,
+                    "price_variance": 0.0,
+                    "min_price": price,
+                    "max_price": price,
+                    "observations": 1,
+                    "first_observed_at": line.actual_delivery_date,
+                    "last_observed_at": line.actual_delivery_date
+                }
+                continue
+            deviation = price - entry["average_price"]
+            entry["average_price"] += alpha * deviation
+            entry["price_variance"] = (1 - alpha) * (entry["price_variance"] + alpha * deviation * deviation)
+            entry["latest_price"] = price
+            entry["min_price"] = min(entry["min_price"], price)
+            entry["max_price"] = max(entry["max_price"], price)
+            entry["observations"] += 1
+            entry["last_observed_at"] = line.actual_delivery_date
+
+        db.query(SupplierPriceIndex).delete(synchronize_session=False)
+        if index:
+            db.execute(insert(SupplierPriceIndex), [
+                {
+                    **entry,
+                    **{
+                        key: Decimal(str(round(entry[key], 6)))
+                        for key in ("latest_price", "average_price", "price_variance", "min_price", "max_price")
+                    }
+                }
+                for entry in index.values()
+            ])
+        return len(index)
+
+    @staticmethod
+    def get_price_index(
+        db: Session,
+        item_id: Optional[int] = None,
+        supplier_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Price index rows with volatility (coefficient of variation, %)"""
+        query = db.query(
+            SupplierPriceIndex,
+            InventoryItem.name.label("item_name"),
+            InventoryItem.unit,
+            Supplier.name.label("supplier_name")
+        ).join(
+            InventoryItem, InventoryItem.id == SupplierPriceIndex.inventory_item_id
+        ).join(
+            Supplier, Supplier.id == SupplierPriceIndex.supplier_id
+        )
+
+        if item_id:
+            query = query.filter(SupplierPriceIndex.inventory_item_id == item_id)
+
+        if supplier_id:
+            query = query.filter(SupplierPriceIndex.supplier_id == supplier_id)
+
+        rows = query.order_by(InventoryItem.name, SupplierPriceIndex.latest_price).all()
+        return [
+            {
+                "item_id": row.SupplierPriceIndex.inventory_item_id,
+                "item_name": row.item_name,
+                "unit": row.unit,
+                "supplier_id": row.SupplierPriceIndex.supplier_id,
+                "supplier_name": row.supplier_name,
+                "latest_price": float(row.SupplierPriceIndex.latest_price),
+                "average_price": round(float(row.SupplierPriceIndex.average_price), 4),
+                "min_price": float(row.SupplierPriceIndex.min_price),
+                "max_price": float(row.SupplierPriceIndex.max_price),
+                "volatility": SupplierPriceService._volatility(row.SupplierPriceIndex),
+                "observations": row.SupplierPriceIndex.observations,
+                "last_observed_at": row.SupplierPriceIndex.last_observed_at
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def recommend_basket(
+        db: Session,
+        basket: List[Dict[str, Any]],
+        max_lead_time_days: Optional[float] = None,
+        lead_time_cost_per_day: float = 0.0,
+        price_basis: str = "latest"
+    ) -> Dict[str, Any]:
+        """
+        Cheapest way to buy a basket (inventory_item_id, quantity) across
+        suppliers, counting each supplier's typical shipping cost and an
+        optional cost per day of lead time once per supplier used
+        """
+        started = time.perf_counter()
+        quantities: Dict[int, float] = {}
+        for entry in basket:
+            quantities[entry["inventory_item_id"]] = quantities.get(entry["inventory_item_id"], 0.0) + float(entry["quantity"])
+        item_ids = list(quantities)
+
+        price_column = SupplierPriceIndex.average_price if price_basis == "average" else SupplierPriceIndex.latest_price
+        prices = db.query(
+            SupplierPriceIndex.inventory_item_id,
+            SupplierPriceIndex.supplier_id,
+            price_column
+        ).join(
+            Supplier, Supplier.id == SupplierPriceIndex.supplier_id
+        ).filter(
+            SupplierPriceIndex.inventory_item_id.in_(item_ids),
+            Supplier.is_active == True
+        ).all()
+
+        lead_times = InventoryService.get_lead_times(db)["suppliers"]
+        supplier_ids = sorted({row[1] for row in prices})
+        if max_lead_time_days is not None:
+            supplier_ids = [
+                supplier_id for supplier_id in supplier_ids
+                if lead_times.get(supplier_id, settings.DEFAULT_SUPPLIER_LEAD_TIME_DAYS) <= max_lead_time_days
+            ]
+        supplier_index = {supplier_id: j for j, supplier_id in enumerate(supplier_ids)}
+        item_index = {item_id: i for i, item_id in enumerate(item_ids)}
+
+        unit_prices = np.full((len(item_ids), len(supplier_ids)), np.inf)
+        for item_id, supplier_id, price in prices:
+            if supplier_id in supplier_index:
+                unit_prices[item_index[item_id], supplier_index[supplier_id]] = float(price)
+        quantity_vector = np.array([quantities[item_id] for item_id in item_ids])
+        line_costs = unit_prices * quantity_vector[:, None]
+
+        shipping = dict(
+            db.query(PurchaseOrder.supplier_id, func.avg(PurchaseOrder.shipping_cost)).filter(
+                PurchaseOrder.supplier_id.in_(supplier_ids),
+                PurchaseOrder.status != "cancelled"
+            ).group_by(PurchaseOrder.supplier_id).all()
+        ) if supplier_ids else {}
+        supplier_lead_times = np.array([
+            lead_times.get(supplier_id, settings.DEFAULT_SUPPLIER_LEAD_TIME_DAYS) for supplier_id in supplier_ids
+        ])
+        shipping_costs = np.array([float(shipping.get(supplier_id) or 0) for supplier_id in supplier_ids])
+        fixed_costs = shipping_costs + lead_time_cost_per_day * supplier_lead_times
+
+        assignment, total_cost, method = BusinessOptimizer.optimize_supplier_basket(
+            line_costs,
+            fixed_costs,
+            exhaustive_limit=settings.SUPPLIER_BASKET_EXHAUSTIVE_LIMIT
+        )
+
+        names = dict(db.query(InventoryItem.id, InventoryItem.name).filter(InventoryItem.id.in_(item_ids)).all())
+        supplier_names = dict(
+            db.query(Supplier.id, Supplier.name).filter(Supplier.id.in_(supplier_ids)).all()
+        ) if supplier_ids else {}
+
+        orders: Dict[int, Dict[str, Any]] = {}
+        unavailable = []
+        for i, item_id in enumerate(item_ids):
+            j = int(assignment[i])
+            if j < 0:
+                unavailable.append({"item_id": item_id, "item_name": names.get(item_id), "quantity": quantities[item_id]})
+                continue
+            supplier_id = supplier_ids[j]
+            order = orders.setdefault(supplier_id, {
+                "supplier_id": supplier_id,
+                "supplier_name": supplier_names.get(supplier_id),
+                "lead_time_days": round(float(supplier_lead_times[j]), 2),
+                "shipping_cost": round(float(shipping_costs[j]), 2),
+                "items": [],
+                "subtotal": 0.0
+            })
+            available = np.isfinite(unit_prices[i])
+            order["items"].append({
+                "item_id": item_id,
+                "item_name": names.get(item_id),
+                "quantity": quantities[item_id],
+                "unit_price": round(float(unit_prices[i, j]), 4),
+                "line_cost": round(float(line_costs[i, j]), 2),
+                "cheapest_unit_price": round(float(unit_prices[i, available].min()), 4),
+                "suppliers_quoting": int(available.sum())
+            })
+            order["subtotal"] = round(order["subtotal"] + float(line_costs[i, j]), 2)
+
+        supplier_orders = sorted(orders.values(), key=lambda x: x["subtotal"], reverse=True)
+        return {
+            "method": method,
+            "price_basis": price_basis,
+            "total_cost": round(float(sum(o["subtotal"] + o["shipping_cost"] for o in supplier_orders)), 2),
+            "objective": round(total_cost, 2),
+            "supplier_orders": supplier_orders,
+            "delivery_lead_time_days": max(
+                (order["lead_time_days"] for order in supplier_orders), default=None
+            ),
+            "unavailable_items": unavailable,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    @staticmethod
+    def _volatility(entry: SupplierPriceIndex) -> float:
+        average = float(entry.average_price or 0)
+        if average <= 0:
+            return 0.0
+        return round(math.sqrt(max(float(entry.price_variance or 0), 0.0)) / average * 100, 2)
@@ -0,0 +1,420 @@
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import calendar
+import threading
+import time
+from sqlalchemy.orm import Session
+from sqlalchemy import update, bindparam, func
+
+from ..models.staff import Staff, WorkSchedule, StaffPerformance, TimePunch
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..utils.sql import dialect_insert
+
+
+# Clock-ins further than this from a shift's scheduled start are not matched to it
+MATCH_WINDOW = timedelta(hours=12)
+
+
+class _Slot:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class PunchBatcher:
+    """
+    Group commit for punches. Callers arriving together are collected for up
+    to `wait_ms` (or until `max_batch` are pending) and written by the first
+    of them in a single transaction; the others block until their batch is
+    flushed and get their own result back.
+    """
+
+    def __init__(self, flush: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]], max_batch: int, wait_ms: int):
+        self.flush = flush
+        self.max_batch = max_batch
+        self.wait_seconds = wait_ms / 1000
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[Dict[str, Any], _Slot]] = []
+        self._leading = False
+        self.batches = 0
+        self.punches = 0
+
+    def submit(self, punches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        slots = [_Slot() for _ in punches]
+        with self._cond:
+            self._pending.extend(zip(punches, slots))
+            lead = not self._leading
+            if lead:
+                self._leading = True
+            else:
+                self._cond.notify_all()
+
+        if lead:
+            self._lead()
+
+        for slot in slots:
+            slot.event.wait()
+            if slot.error is not None:
+                raise slot.error
+        return [slot.result for slot in slots]
+
+    def _lead(self) -> None:
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            with self._cond:
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                self._pending = self._pending[self.max_batch:]
+
+            try:
+                results = self.flush([punch for punch, _ in batch])
+                for (_, slot), result in zip(batch, results):
+                    slot.result = result
+            except Exception as e:
+                for _, slot in batch:
+                    slot.error = e
+            finally:
+                self.batches += 1
+                self.punches += len(batch)
+                for _, slot in batch:
+                    slot.event.set()
+
+            with self._cond:
+                # Punches that arrived during the flush go out right away
+                if not self._pending:
+                    self._leading = False
+                    return
+            deadline = time.monotonic()
+
+
+class TimeClockService:
+
+    @staticmethod
+    def submit_punches(punches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Record punches through the shared batcher (see record_punches)"""
+        return _batcher.submit(punches)
+
+    @staticmethod
+    def _write_batch(punches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            results = TimeClockService.record_punches(db, punches)
+            db.commit()
+            return results
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def record_punches(db: Session, punches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Append punches (staff_id, punch_type in/out, punched_at,
+        idempotency_key, source) to the punch log and derive their effects:
+        clock-ins set WorkSchedule.actual_start_time and lateness, clock-outs
+        set actual_end_time, worked time and overtime, and the staff member's
+        current StaffPerformance period is incremented in the same
+        transaction. A key already recorded returns the stored punch with
+        status "duplicate". Does not commit.
+        """
+        grace = settings.TIME_CLOCK_GRACE_MINUTES
+        keys = list(dict.fromkeys(punch["idempotency_key"] for punch in punches))
+        stored = {
+            punch.idempotency_key: punch
+            for punch in db.query(TimePunch).filter(TimePunch.idempotency_key.in_(keys)).all()
+        }
+
+        fresh: Dict[str, Dict[str, Any]] = {}
+        for punch in punches:
+            if punch["idempotency_key"] not in stored and punch["idempotency_key"] not in fresh:
+                fresh[punch["idempotency_key"]] = dict(punch)
+        new_punches = sorted(fresh.values(), key=lambda p: p["punched_at"])
+
+        staff_ids = {punch["staff_id"] for punch in new_punches}
+        active = {
+            staff_id for (staff_id,) in db.query(Staff.id).filter(
+                Staff.id.in_(staff_ids),
+                Staff.employment_status == "active"
+            ).all()
+        } if staff_ids else set()
+
+        schedules: Dict[int, List[Dict[str, Any]]] = {}
+        if active:
+            first_day = min(p["punched_at"] for p in new_punches).date() - timedelta(days=1)
+            last_day = max(p["punched_at"] for p in new_punches).date() + timedelta(days=1)
+            for row in db.query(
+                WorkSchedule.id,
+                WorkSchedule.staff_id,
+                WorkSchedule.schedule_date,
+                WorkSchedule.start_time,
+                WorkSchedule.end_time,
+                WorkSchedule.break_start,
+                WorkSchedule.break_end,
+                WorkSchedule.actual_start_time,
+                WorkSchedule.actual_end_time
+            ).filter(
+                WorkSchedule.staff_id.in_(active),
+                WorkSchedule.schedule_date >= first_day,
+                WorkSchedule.schedule_date <= last_day,
+                WorkSchedule.status != "cancelled"
+            ).all():
+                start = datetime.combine(row.schedule_date, row.start_time)
+                end = datetime.combine(row.schedule_date, row.end_time)
+                if end <= start:
+                    end += timedelta(days=1)
+                break_start = break_end = None
+                if row.break_start and row.break_end:
+                    break_start = datetime.combine(row.schedule_date, row.break_start)
+                    if break_start < start:
+                        break_start += timedelta(days=1)
+                    break_end = datetime.combine(row.schedule_date, row.break_end)
+                    if break_end <= break_start:
+                        break_end += timedelta(days=1)
+                schedules.setdefault(row.staff_id, []).append({
+                    "id": row.id,
+                    "schedule_date": row.schedule_date,
+                    "start": start,
+                    "end": end,
+                    "break_start": break_start,
+                    "break_end": break_end,
+                    "actual_start_time": TimeClockService._naive(row.actual_start_time),
+                    "actual_end_time": TimeClockService._naive(row.actual_end_time)
+                })
+
+        rows = []
+        for punch in new_punches:
+            if punch["staff_id"] not in active:
+                punch["rejected"] = "Staff member not found or not active"
+                continue
+
+            punched_at = punch["punched_at"]
+            schedule = None
+            candidates = schedules.get(punch["staff_id"], [])
+            if punch["punch_type"] == "in":
+                open_shifts = [
+                    s for s in candidates
+                    if s["actual_start_time"] is None and abs(punched_at - s["start"]) <= MATCH_WINDOW
+                ]
+                if open_shifts:
+                    schedule = min(open_shifts, key=lambda s: abs(punched_at - s["start"]))
+                    schedule["actual_start_time"] = punched_at
+                    punch["late_minutes"] = max(int((punched_at - schedule["start"]).total_seconds() // 60), 0)
+            else:
+                started = [
+                    s for s in candidates
+                    if s["actual_start_time"] is not None and s["actual_end_time"] is None
+                    and s["actual_start_time"] <= punched_at
+                ]
+                if started:
+                    schedule = max(started, key=lambda s: s["actual_start_time"])
+                    schedule["actual_end_time"] = punched_at
+                    worked = punched_at - schedule["actual_start_time"]
+                    if schedule["break_start"] is not None:
+                        # The scheduled break is unpaid wherever it falls inside the worked span
+                        worked -= max(
+                            min(schedule["break_end"], punched_at) - max(schedule["break_start"], schedule["actual_start_time"]),
+                            timedelta(0)
+                        )
+                    punch["worked_minutes"] = int(worked.total_seconds() // 60)
+                    punch["overtime_minutes"] = max(int((punched_at - schedule["end"]).total_seconds() // 60), 0)
+
+            punch["work_schedule_id"] = schedule["id"] if schedule else None
+            punch["schedule_date"] = schedule["schedule_date"] if schedule else None
+            rows.append({
+                "staff_id": punch["staff_id"],
+                "work_schedule_id": punch["work_schedule_id"],
+                "punch_type": punch["punch_type"],
+                "punched_at": punched_at,
+                "idempotency_key": punch["idempotency_key"],
+                "source": punch.get("source"),
+                "late_minutes": punch.get("late_minutes"),
+                "overtime_minutes": punch.get("overtime_minutes"),
+                "worked_minutes": punch.get("worked_minutes")
+            })
+
+        inserted: Dict[str, int] = {}
+        if rows:
+            stmt = dialect_insert(db, TimePunch).on_conflict_do_nothing(
+                index_elements=["idempotency_key"]
+            ).returning(TimePunch.id, TimePunch.idempotency_key)
+            # Rows skipped by the conflict clause return nothing; the key maps
+            # returned ids back to punches regardless of order
+            inserted = {row.idempotency_key: row.id for row in db.execute(stmt, rows)}
+
+        applied = [punch for punch in new_punches if punch["idempotency_key"] in inserted]
+        TimeClockService._apply_to_schedules(db, applied)
+        TimeClockService._apply_to_performance(db, applied, grace)
+
+        # Keys written concurrently by another worker since the first lookup
+        missing = [key for key in keys if key not in stored and key not in inserted and "rejected" not in fresh[key]]
+        if missing:
+            stored.update({
+                punch.idempotency_key: punch
+                for punch in db.query(TimePunch).filter(TimePunch.idempotency_key.in_(missing)).all()
+            })
+
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        for key in keys:
+            if key in inserted:
+                recorded = fresh[key]
+                outcomes[key] = {
+                    "status": "recorded",
+                    "punch_id": inserted[key],
+                    "idempotency_key": key,
+                    "staff_id": recorded["staff_id"],
+                    "punch_type": recorded["punch_type"],
+                    "punched_at": recorded["punched_at"],
+                    "work_schedule_id": recorded["work_schedule_id"],
+                    "late_minutes": recorded.get("late_minutes"),
+                    "overtime_minutes": recorded.get("overtime_minutes"),
+                    "worked_minutes": recorded.get("worked_minutes")
+                }
+            elif key in stored:
+                existing = stored[key]
+                outcomes[key] = {
+                    "status": "duplicate",
+                    "punch_id": existing.id,
+                    "idempotency_key": key,
+                    "staff_id": existing.staff_id,
+                    "punch_type": existing.punch_type,
+                    "punched_at": existing.punched_at,
+                    "work_schedule_id": existing.work_schedule_id,
+                    "late_minutes": existing.late_minutes,
+                    "overtime_minutes": existing.overtime_minutes,
+                    "worked_minutes": existing.worked_minutes
+                }
+            else:
+                outcomes[key] = {
+                    "status": "rejected",
+                    "idempotency_key": key,
+                    "staff_id": fresh[key]["staff_id"],
+                    "punch_type": fresh[key]["punch_type"],
+                    "detail": fresh[key]["rejected"]
+                }
+
+        # A key repeated within the batch is a duplicate of its first occurrence
+        results = []
+        seen = set()
+        for punch in punches:
+            outcome = outcomes[punch["idempotency_key"]]
+            if punch["idempotency_key"] in seen and outcome["status"] == "recorded":
+                outcome = {**outcome, "status": "duplicate"}
+            seen.add(punch["idempotency_key"])
+            results.append(outcome)
+        return results
+
+    @staticmethod
+    def _apply_to_schedules(db: Session, punches: List[Dict[str, Any]]) -> None:
+        """Copy matched punch times onto their shifts (first clock-in, last clock-out)"""
+        starts = [
+            {"schedule_id": p["work_schedule_id"], "punched_at": p["punched_at"]}
+            for p in punches if p["punch_type"] == "in" and p["work_schedule_id"]
+        ]
+        ends = [
+            {"schedule_id": p["work_schedule_id"], "punched_at": p["punched_at"]}
+            for p in punches if p["punch_type"] == "out" and p["work_schedule_id"]
+        ]
+        table = WorkSchedule.__table__
+        if starts:
+            db.execute(
+                update(table).where(table.c.id == bindparam("schedule_id")).values(
+                    actual_start_time=func.coalesce(table.c.actual_start_time, bindparam("punched_at")),
+                    status="confirmed"
+                ),
+                starts
+            )
+        if ends:
+            db.execute(
+                update(table).where(table.c.id == bindparam("schedule_id")).values(
+                    actual_end_time=bindparam("punched_at"),
+                    status="completed"
+                ),
+                ends
+            )
+
+    @staticmethod
+    def _apply_to_performance(db: Session, punches: List[Dict[str, Any]], grace: int) -> None:
+        """
+        Add tardiness, worked hours and overtime of matched punches to the
+        monthly StaffPerformance rows with one upsert
+        """
+        increments: Dict[Tuple[int, date, date], Dict[str, Any]] = {}
+        for punch in punches:
+            if not punch["work_schedule_id"]:
+                continue
+            period_start, period_end = TimeClockService.period_of(punch["schedule_date"])
+            entry = increments.setdefault((punch["staff_id"], period_start, period_end), {
+                "staff_id": punch["staff_id"],
+                "period_start": period_start,
+                "period_end": period_end,
+                "tardiness_count": 0,
+                "hours_worked": Decimal("0"),
+                "overtime_hours": Decimal("0"),
+                "orders_handled": 0
+            })
+            if (punch.get("late_minutes") or 0) > grace:
+                entry["tardiness_count"] += 1
+            if punch.get("worked_minutes"):
+                entry["hours_worked"] += (Decimal(punch["worked_minutes"]) / 60).quantize(Decimal("0.01"))
+            if (punch.get("overtime_minutes") or 0) > grace:
+                entry["overtime_hours"] += (Decimal(punch["overtime_minutes"]) / 60).quantize(Decimal("0.01"))
+
+        if not increments:
+            return
+
+        performance = StaffPerformance.__table__
+        stmt = dialect_insert(db, StaffPerformance)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["staff_id", "period_start", "period_end"],
+            set_={
+                "tardiness_count": func.coalesce(performance.c.tardiness_count, 0) + stmt.excluded.tardiness_count,
+                "hours_worked": func.coalesce(performance.c.hours_worked, 0) + stmt.excluded.hours_worked,
+                "overtime_hours": func.coalesce(performance.c.overtime_hours, 0) + stmt.excluded.overtime_hours
+            }
+        )
+        db.execute(stmt, list(increments.values()))
+
+    @staticmethod
+    def period_of(day: date) -> Tuple[date, date]:
+        """Performance period (calendar month) containing `day`"""
+        return day.replace(day=1), day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+    @staticmethod
+    def _naive(value: Optional[datetime]) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone().replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def get_punches(
+        db: Session,
+        staff_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = 500
+    ) -> List[TimePunch]:
+        query = db.query(TimePunch)
+        if staff_id:
+            query = query.filter(TimePunch.staff_id == staff_id)
+        if start_date:
+            query = query.filter(TimePunch.punched_at >= datetime.combine(start_date, datetime.min.time()))
+        if end_date:
+            query = query.filter(TimePunch.punched_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+        return query.order_by(TimePunch.punched_at.desc()).limit(limit).all()
+
+
+_batcher = PunchBatcher(
+    TimeClockService._write_batch,
+    max_batch=settings.TIME_CLOCK_BATCH_SIZE,
+    wait_ms=settings.TIME_CLOCK_BATCH_WAIT_MS
+)
@@ -0,0 +1,193 @@
+from typing import Dict, Any
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+import calendar
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, desc
+
+from ..models.inventory import InventoryItem, StockMovement, WasteDailySummary
+from ..core.database import SessionLocal
+from ..utils.sql import upsert, weekday_of
+
+
+class WasteAnalyticsService:
+
+    @staticmethod
+    def rollup(db: Session, start_date: date, end_date: date) -> int:
+        """
+        Aggregate waste movements of [start_date, end_date] into
+        waste_daily_summary (one row per day, item and reason). Re-running a
+        day overwrites its rows, so the rollup is idempotent.
+        """
+        movement_day = func.date(StockMovement.created_at)
+        reason = func.coalesce(StockMovement.reason, "unspecified")
+        cost = func.coalesce(
+            StockMovement.total_cost,
+            func.abs(StockMovement.quantity) * InventoryItem.cost_per_unit
+        )
+
+        rows = db.query(
+            movement_day.label("summary_date"),
+            StockMovement.inventory_item_id,
+            InventoryItem.category,
+            reason.label("reason"),
+            func.sum(func.abs(StockMovement.quantity)).label("quantity"),
+            func.sum(cost).label("total_cost"),
+            func.count(StockMovement.id).label("movement_count")
+        ).join(
+            InventoryItem, InventoryItem.id == StockMovement.inventory_item_id
+        ).filter(
+            and_(
+                StockMovement.movement_type == "waste",
+                StockMovement.created_at >= datetime.combine(start_date, datetime.min.time()),
+                StockMovement.created_at <= datetime.combine(end_date, datetime.max.time())
+            )
+        ).group_by(
+            movement_day, StockMovement.inventory_item_id, InventoryItem.category, reason
+        ).all()
+
+        summary_rows = [
+            {
+                "summary_date": date.fromisoformat(row.summary_date) if isinstance(row.summary_date, str) else row.summary_date,
+                "inventory_item_id": row.inventory_item_id,
+                "category": row.category,
+                "reason": row.reason,
+                "quantity": row.quantity or Decimal("0"),
+                "total_cost": Decimal(str(row.total_cost or 0)).quantize(Decimal("0.01")),
+                "movement_count": row.movement_count,
+                "updated_at": datetime.now()
+            }
+            for row in rows
+        ]
+
+        upsert(
+            db,
+            WasteDailySummary,
+            summary_rows,
+            index_elements=["summary_date", "inventory_item_id", "reason"],
+            update_columns=["category", "quantity", "total_cost", "movement_count", "updated_at"]
+        )
+        return len(summary_rows)
+
+    @staticmethod
+    def rollup_job() -> Dict[str, Any]:
+        """
+        Scheduled job: roll up from the last summarized day (re-done in case it
+        was partial) through today. On an empty table the full history is
+        compacted once.
+        """
+        db = SessionLocal()
+        try:
+            last_day = db.query(func.max(WasteDailySummary.summary_date)).scalar()
+            if last_day is None:
+                first_movement = db.query(func.min(StockMovement.created_at)).filter(
+                    StockMovement.movement_type == "waste"
+                ).scalar()
+                if first_movement is None:
+                    return {"rows": 0}
+                start_date = first_movement.date()
+            else:
+                start_date = last_day - timedelta(days=1)
+
+            rows = WasteAnalyticsService.rollup(db, start_date, date.today())
+            db.commit()
+            return {"start_date": start_date.isoformat(), "rows": rows}
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_waste_analytics(db: Session, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Waste by item, category, reason and weekday with cost impact, read only
+        from the daily summary table
+        """
+        period = and_(
+            WasteDailySummary.summary_date >= start_date,
+            WasteDailySummary.summary_date <= end_date
+        )
+        quantity = func.sum(WasteDailySummary.quantity)
+        total_cost = func.sum(WasteDailySummary.total_cost)
+        events = func.sum(WasteDailySummary.movement_count)
+
+        totals = db.query(total_cost, events).filter(period).one()
+        total_waste_cost = float(totals[0] or 0)
+        total_events = int(totals[1] or 0)
+
+        def share(cost) -> float:
+            return round(float(cost or 0) / total_waste_cost * 100, 2) if total_waste_cost > 0 else 0
+
+        by_item = db.query(
+            WasteDailySummary.inventory_item_id,
+            InventoryItem.name,
+            InventoryItem.unit,
+            WasteDailySummary.category,
+            quantity,
+            total_cost,
+            events
+        ).join(
+            InventoryItem, InventoryItem.id == WasteDailySummary.inventory_item_id
+        ).filter(period).group_by(
+            WasteDailySummary.inventory_item_id, InventoryItem.name, InventoryItem.unit, WasteDailySummary.category
+        ).order_by(desc(total_cost)).all()
+
+        by_category = db.query(
+            WasteDailySummary.category, total_cost, events
+        ).filter(period).group_by(WasteDailySummary.category).order_by(desc(total_cost)).all()
+
+        by_reason = db.query(
+            WasteDailySummary.reason, total_cost, events
+        ).filter(period).group_by(WasteDailySummary.reason).order_by(desc(total_cost)).all()
+
+        weekday = weekday_of(db, WasteDailySummary.summary_date)
+        by_weekday = dict(
+            (row[0], row)
+            for row in db.query(weekday, total_cost, events).filter(period).group_by(weekday).all()
+        )
+
+        daily = db.query(
+            WasteDailySummary.summary_date, total_cost
+        ).filter(period).group_by(WasteDailySummary.summary_date).order_by(WasteDailySummary.summary_date).all()
+
+        days = (end_date - start_date).days + 1
+
+        return {
+            "period_start": start_date,
+            "period_end": end_date,
+            "total_waste_cost": round(total_waste_cost, 2),
+            "waste_events": total_events,
+            "average_daily_cost": round(total_waste_cost / days, 2) if days > 0 else 0,
+            "projected_monthly_cost": round(total_waste_cost / days * 30, 2) if days > 0 else 0,
+            "by_item": [
+                {
+                    "item_id": row[0],
+                    "item_name": row[1],
+                    "unit": row[2],
+                    "category": row[3],
+                    "quantity": float(row[4] or 0),
+                    "cost": round(float(row[5] or 0), 2),
+                    "events": int(row[6] or 0),
+                    "cost_share": share(row[5])
+                }
+                for row in by_item
+            ],
+            "by_category": [
+                {"category": row[0], "cost": round(float(row[1] or 0), 2), "events": int(row[2] or 0), "cost_share": share(row[1])}
+                for row in by_category
+            ],
+            "by_reason": [
+                {"reason": row[0], "cost": round(float(row[1] or 0), 2), "events": int(row[2] or 0), "cost_share": share(row[1])}
+                for row in by_reason
+            ],
+            "by_weekday": [
+                {
+                    "weekday": calendar.day_name[day],
+                    "cost": round(float(by_weekday[day][1] or 0), 2) if day in by_weekday else 0,
+                    "events": int(by_weekday[day][2] or 0) if day in by_weekday else 0
+                }
+                for day in range(7)
+            ],
+            "daily_cost": {
+                (row[0] if isinstance(row[0], str) else row[0].isoformat()): round(float(row[1] or 0), 2)
+                for row in daily
+            }
+        }
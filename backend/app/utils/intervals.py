@@ -0,0 +1,158 @@
+from typing import Any, Iterator, List, Optional, Tuple
+import random
+
+
+class _Node:
+    __slots__ = ("start", "end", "key", "data", "priority", "max_end", "left", "right")
+
+    def __init__(self, start: int, end: int, key: Any, data: Any):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.data = data
+        self.priority = random.random()
+        self.max_end = end
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+    def update(self) -> None:
+        self.max_end = max(
+            self.end,
+            self.left.max_end if self.left else self.end,
+            self.right.max_end if self.right else self.end
+        )
+
+
+class IntervalTree:
+    """
+    Half-open integer intervals [start, end) in a treap ordered by (start, key)
+    and augmented with the maximum end of each subtree. Insert and remove are
+    O(log n) expected; overlap queries are O(log n + k) for k matches.
+    """
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, start: int, end: int, key: Any, data: Any = None) -> None:
+        """
+        Add an interval; `key` (comparable, unique per start) identifies it
+        for removal and breaks ties between equal starts
+        """
+        self._root = self._insert(self._root, _Node(start, end, key, data))
+        self._size += 1
+
+    def remove(self, start: int, key: Any) -> bool:
+        """Remove the interval starting at `start` with `key`; False if absent"""
+        self._root, removed = self._remove(self._root, start, key)
+        if removed:
+            self._size -= 1
+        return removed
+
+    def overlapping(self, start: int, end: int) -> List[Tuple[int, int, Any, Any]]:
+        """Intervals intersecting [start, end), ordered by start"""
+        result: List[Tuple[int, int, Any, Any]] = []
+        self._collect(self._root, start, end, result)
+        return result
+
+    def gaps(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Sub-ranges of [start, end) not covered by any interval"""
+        gaps = []
+        cursor = start
+        for interval_start, interval_end, _, _ in self.overlapping(start, end):
+            if interval_start > cursor:
+                gaps.append((cursor, interval_start))
+            cursor = max(cursor, interval_end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def __iter__(self) -> Iterator[Tuple[int, int, Any, Any]]:
+        stack, node = [], self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.start, node.end, node.key, node.data
+            node = node.right
+
+    @staticmethod
+    def _order(node: _Node) -> Tuple[int, Any]:
+        return node.start, node.key
+
+    @classmethod
+    def _insert(cls, root: Optional[_Node], node: _Node) -> _Node:
+        if root is None:
+            return node
+        if cls._order(node) < cls._order(root):
+            root.left = cls._insert(root.left, node)
+            if root.left.priority > root.priority:
+                root = cls._rotate_right(root)
+        else:
+            root.right = cls._insert(root.right, node)
+            if root.right.priority > root.priority:
+                root = cls._rotate_left(root)
+        root.update()
+        return root
+
+    @classmethod
+    def _remove(cls, root: Optional[_Node], start: int, key: Any) -> Tuple[Optional[_Node], bool]:
+        if root is None:
+            return None, False
+        target = (start, key)
+        if root.start == start and root.key == key:
+            return cls._merge(root.left, root.right), True
+        if target < cls._order(root):
+            root.left, removed = cls._remove(root.left, start, key)
+        else:
+            root.right, removed = cls._remove(root.right, start, key)
+        root.update()
+        return root, removed
+
+    @classmethod
+    def _merge(cls, left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = cls._merge(left.right, right)
+            left.update()
+            return left
+        right.left = cls._merge(left, right.left)
+        right.update()
+        return right
+
+    @classmethod
+    def _collect(cls, node: Optional[_Node], start: int, end: int, result: list) -> None:
+        if node is None or node.max_end <= start:
+            return
+        cls._collect(node.left, start, end, result)
+        if node.start < end and node.end > start:
+            result.append((node.start, node.end, node.key, node.data))
+        if node.start < end:
+            cls._collect(node.right, start, end, result)
+
+    @staticmethod
+    def _rotate_right(node: _Node) -> _Node:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.update()
+        pivot.update()
+        return pivot
+
+    @staticmethod
+    def _rotate_left(node: _Node) -> _Node:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.update()
+        pivot.update()
+        return pivot
@@ -0,0 +1,225 @@
+from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import threading
+
+
+class KitchenQueue:
+    """
+    Active kitchen orders with running totals for O(1)-ish ready-time quotes.
+
+    Each order carries `work` (oven slot-minutes: prep time x quantity summed
+    over its items) and `duration` (its longest item, the minimum time it can
+    take with free ovens). With `capacity` parallel oven slots, an order
+    placed now is quoted
+
+        ready = now + (queued work + remaining work in the oven) / capacity
+                    + max(duration, work / capacity)
+
+    scaled by a calibration factor learned from actual vs quoted times.
+
+    Pending orders sit in a heap keyed by quoted ready time (the kitchen's
+    next-up order is its top); orders in preparation sit in a heap keyed by
+    expected finish, so work already done can be dropped as time passes.
+    Both use lazy deletion: insert, start, finish and quote are O(log n)
+    amortized. Times are POSIX seconds.
+    """
+
+    def __init__(self, capacity: int, calibration_alpha: float = 0.1, max_factor: float = 3.0):
+        self.capacity = max(capacity, 1)
+        self.calibration_alpha = calibration_alpha
+        self.max_factor = max_factor
+        self.factor = 1.0
+
+        self._orders: Dict[int, Dict[str, Any]] = {}
+        self._pending: List[Tuple[float, int]] = []  # (quoted ready, order id)
+        self._preparing: List[Tuple[float, int]] = []  # (expected finish, order id)
+        self._pending_work = 0.0
+        # Remaining oven work of orders in preparation is sum(rate * (finish - now))
+        # over those not finished yet, kept as two sums
+        self._preparing_rate = 0.0
+        self._preparing_rate_finish = 0.0
+
+        self.samples = 0
+        self._abs_error_sum = 0.0
+        self._error_sum = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._orders
+
+    def quote(self, work: float, duration: float, now: float) -> float:
+        """Quoted ready time (seconds) for a new order, without queueing it"""
+        with self._lock:
+            return now + self._estimate_seconds(work, duration, now)
+
+    def add(
+        self,
+        order_id: int,
+        work: float,
+        duration: float,
+        created_at: float,
+        quoted_ready_at: Optional[float] = None,
+        now: Optional[float] = None
+    ) -> float:
+        """Queue a pending order; returns its quoted ready time"""
+        with self._lock:
+            if order_id in self._orders:
+                return self._orders[order_id]["quoted_ready_at"]
+            if quoted_ready_at is None:
+                quoted_ready_at = created_at + self._estimate_seconds(work, duration, now if now is not None else created_at)
+            self._orders[order_id] = {
+                "order_id": order_id,
+                "work": work,
+                "duration": duration,
+                "created_at": created_at,
+                "quoted_ready_at": quoted_ready_at,
+                "started_at": None,
+                "finish_at": None
+            }
+            self._pending_work += work
+            heapq.heappush(self._pending, (quoted_ready_at, order_id))
+            return quoted_ready_at
+
+    def start(self, order_id: int, started_at: float) -> bool:
+        """Move an order into the oven; False if it is not queued as pending"""
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None or order["started_at"] is not None:
+                return False
+            self._pending_work -= order["work"]
+            self._begin(order, started_at)
+            self._compact()
+            return True
+
+    def finish(self, order_id: int, finished_at: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Remove an order (ready or cancelled). With `finished_at` (ready) the
+        actual vs quoted lead time calibrates later quotes; returns the
+        sample, if any
+        """
+        with self._lock:
+            order = self._orders.pop(order_id, None)
+            if order is None:
+                return None
+            if order["started_at"] is None:
+                self._pending_work -= order["work"]
+            else:
+                self._end(order)
+            self._compact()
+            if finished_at is None:
+                return None
+            return self._calibrate(order, finished_at)
+
+    def next_up(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Pending orders by quoted ready time"""
+        with self._lock:
+            live = [entry for entry in self._pending if self._is_pending(entry[1])]
+            return [dict(self._orders[order_id]) for _, order_id in heapq.nsmallest(limit, live)]
+
+    def backlog_minutes(self, now: float) -> float:
+        """Minutes of work ahead of a new order with every slot busy"""
+        with self._lock:
+            self._expire(now)
+            return self._backlog(now) / 60 / self.capacity
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(now)
+            preparing = sum(1 for order in self._orders.values() if order["started_at"] is not None)
+            backlog = self._backlog(now)
+            return {
+                "capacity": self.capacity,
+                "pending": len(self._orders) - preparing,
+                "preparing": preparing,
+                "backlog_minutes": round(backlog / 60 / self.capacity, 1),
+                "calibration_factor": round(self.factor, 3),
+                "samples": self.samples,
+                "mean_abs_error_minutes": round(self._abs_error_sum / self.samples / 60, 2) if self.samples else None,
+                "mean_error_minutes": round(self._error_sum / self.samples / 60, 2) if self.samples else None
+            }
+
+    def reset(self, orders: List[Dict[str, Any]], factor: Optional[float] = None) -> None:
+        """
+        Replace the active orders (e.g. rebuilt from the database); the
+        calibration is kept unless a starting `factor` is given
+        """
+        with self._lock:
+            self._orders = {}
+            self._pending, self._preparing = [], []
+            self._pending_work = self._preparing_rate = self._preparing_rate_finish = 0.0
+            if factor is not None:
+                self.factor = min(max(factor, 1 / self.max_factor), self.max_factor)
+        for order in orders:
+            self.add(order["order_id"], order["work"], order["duration"], order["created_at"], order.get("quoted_ready_at"))
+            if order.get("started_at") is not None:
+                self.start(order["order_id"], order["started_at"])
+
+    def _estimate_seconds(self, work: float, duration: float, now: float) -> float:
+        self._expire(now)
+        wait = self._backlog(now) / self.capacity
+        # A large order cannot finish faster than its own work spread over every slot
+        own = max(duration, work / self.capacity) * 60
+        return (wait + own) * self.factor
+
+    def _backlog(self, now: float) -> float:
+        """Oven slot-seconds of work ahead of a new order"""
+        in_oven = max(self._preparing_rate_finish - now * self._preparing_rate, 0.0)
+        return self._pending_work * 60 + in_oven
+
+    def _begin(self, order: Dict[str, Any], started_at: float) -> None:
+        rate = order["work"] / order["duration"] if order["duration"] > 0 else 0.0
+        order["started_at"] = started_at
+        order["finish_at"] = started_at + order["duration"] * 60
+        order["rate"] = rate
+        order["counted"] = True
+        self._preparing_rate += rate
+        self._preparing_rate_finish += rate * order["finish_at"]
+        heapq.heappush(self._preparing, (order["finish_at"], order["order_id"]))
+
+    def _end(self, order: Dict[str, Any]) -> None:
+        if order.get("counted"):
+            self._preparing_rate -= order["rate"]
+            self._preparing_rate_finish -= order["rate"] * order["finish_at"]
+            order["counted"] = False
+
+    def _expire(self, now: float) -> None:
+        """Stop counting oven work of orders past their expected finish"""
+        while self._preparing and self._preparing[0][0] <= now:
+            _, order_id = heapq.heappop(self._preparing)
+            order = self._orders.get(order_id)
+            if order is not None:
+                self._end(order)
+
+    def _is_pending(self, order_id: int) -> bool:
+        order = self._orders.get(order_id)
+        return order is not None and order["started_at"] is None
+
+    def _compact(self) -> None:
+        """Drop stale heap entries once they outnumber live ones"""
+        if len(self._pending) > 2 * len(self._orders) + 16:
+            self._pending = [entry for entry in self._pending if self._is_pending(entry[1])]
+            heapq.heapify(self._pending)
+        if len(self._preparing) > 2 * len(self._orders) + 16:
+            self._preparing = [
+                entry for entry in self._preparing
+                if entry[1] in self._orders and self._orders[entry[1]].get("counted")
+            ]
+            heapq.heapify(self._preparing)
+
+    def _calibrate(self, order: Dict[str, Any], finished_at: float) -> Optional[Dict[str, Any]]:
+        quoted = order["quoted_ready_at"] - order["created_at"]
+        actual = finished_at - order["created_at"]
+        if quoted <= 0 or actual <= 0:
+            return None
+        ratio = actual / quoted
+        self.factor = min(
+            max(self.factor * (1 + self.calibration_alpha * (ratio - 1)), 1 / self.max_factor),
+            self.max_factor
+        )
+        self.samples += 1
+        self._abs_error_sum += abs(actual - quoted)
+        self._error_sum += actual - quoted
+        return {"order_id": order["order_id"], "quoted_seconds": quoted, "actual_seconds": actual, "ratio": ratio}
@@ -0,0 +1,184 @@
+from typing import Any, Dict, Iterable, List, Optional
+from collections import deque
+import threading
+
+
+LEVELS = ["normal", "busy", "overloaded"]
+
+
+class SlidingWindowCounter:
+    """
+    Events per key over the last `window` seconds. Adding and counting are
+    O(1) amortized: expired events are evicted from the front of a deque.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._events = deque()
+        self._counts: Dict[Any, int] = {}
+
+    def add(self, at: float, key: Any = None) -> None:
+        self._events.append((at, key))
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def count(self, now: float, key: Any = None) -> int:
+        """Events of `key` in the window (all keys if None)"""
+        self._evict(now)
+        if key is None:
+            return len(self._events)
+        return self._counts.get(key, 0)
+
+    def counts(self, now: float) -> Dict[Any, int]:
+        self._evict(now)
+        return {key: count for key, count in self._counts.items() if count}
+
+    def clear(self) -> None:
+        self._events.clear()
+        self._counts = {}
+
+    def _evict(self, now: float) -> None:
+        horizon = now - self.window
+        while self._events and self._events[0][0] <= horizon:
+            _, key = self._events.popleft()
+            self._counts[key] -= 1
+
+
+class LoadGovernor:
+    """
+    Intake throttling from kitchen backlog and order arrivals.
+
+    The level rises to "busy" or "overloaded" as soon as either signal
+    crosses its threshold, and only falls back once both are below
+    `resume_ratio` of the threshold (hysteresis, so it does not flap).
+    Busy extends ready-time quotes; overloaded extends them further and
+    pauses the pausable platforms, which resume automatically once the
+    kitchen is no longer overloaded and `min_pause` seconds have passed.
+    Platforms paused by hand stay paused until resumed by hand.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        busy_backlog_minutes: float,
+        overload_backlog_minutes: float,
+        busy_arrivals: int,
+        overload_arrivals: int,
+        quote_extra_minutes: float,
+        pausable: Iterable[str],
+        resume_ratio: float = 0.7,
+        min_pause: float = 600
+    ):
+        self.arrivals = SlidingWindowCounter(window)
+        self.backlog_thresholds = [busy_backlog_minutes, overload_backlog_minutes]
+        self.arrival_thresholds = [busy_arrivals, overload_arrivals]
+        self.quote_extra_minutes = quote_extra_minutes
+        self.pausable = list(pausable)
+        self.resume_ratio = resume_ratio
+        self.min_pause = min_pause
+
+        self.level = 0
+        self.level_since: Optional[float] = None
+        self.backlog_minutes = 0.0
+        # platform -> {"since": seconds, "manual": bool}
+        self.paused: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record_order(self, platform: str, at: float) -> None:
+        with self._lock:
+            self.arrivals.add(at, platform)
+
+    def quote_extension_minutes(self) -> float:
+        """Minutes added to ready-time quotes at the current level"""
+        return self.quote_extra_minutes * self.level
+
+    def evaluate(self, now: float, backlog_minutes: float) -> Optional[Dict[str, Any]]:
+        """
+        Update the level and automatic pauses; returns the new state if
+        anything changed, None otherwise
+        """
+        with self._lock:
+            self.backlog_minutes = backlog_minutes
+            arrivals = self.arrivals.count(now)
+            level = self._target_level(backlog_minutes, arrivals)
+
+            changed = level != self.level
+            if changed:
+                self.level = level
+                self.level_since = now
+
+            if self.level == len(LEVELS) - 1:
+                for platform in self.pausable:
+                    if platform not in self.paused:
+                        self.paused[platform] = {"since": now, "manual": False}
+                        changed = True
+            else:
+                for platform, pause in list(self.paused.items()):
+                    if not pause["manual"] and now - pause["since"] >= self.min_pause:
+                        del self.paused[platform]
+                        changed = True
+
+            return self._state(now) if changed else None
+
+    def pause(self, platform: str, now: float) -> Dict[str, Any]:
+        with self._lock:
+            self.paused[platform] = {"since": now, "manual": True}
+            return self._state(now)
+
+    def resume(self, platform: str, now: float) -> Dict[str, Any]:
+        with self._lock:
+            self.paused.pop(platform, None)
+            return self._state(now)
+
+    def set_paused(self, paused: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the pauses with {platform: {"since", "manual"}} from shared state"""
+        with self._lock:
+            self.paused = {platform: dict(pause) for platform, pause in paused.items()}
+
+    def is_paused(self, platform: str) -> bool:
+        return platform in self.paused
+
+    def state(self, now: float) -> Dict[str, Any]:
+        with self._lock:
+            return self._state(now)
+
+    def reset_arrivals(self, arrivals: List[Any]) -> None:
+        """Replace the arrival window with (seconds, platform) pairs, oldest first"""
+        with self._lock:
+            self.arrivals.clear()
+            for at, platform in arrivals:
+                self.arrivals.add(at, platform)
+
+    def _target_level(self, backlog_minutes: float, arrivals: int) -> int:
+        raised = 0
+        for level in range(1, len(LEVELS)):
+            if backlog_minutes >= self.backlog_thresholds[level - 1] or arrivals >= self.arrival_thresholds[level - 1]:
+                raised = level
+        if raised >= self.level:
+            return raised
+
+        # Step down only below the resume fraction of the current level's thresholds
+        level = self.level
+        while level > raised and (
+            backlog_minutes < self.backlog_thresholds[level - 1] * self.resume_ratio
+            and arrivals < self.arrival_thresholds[level - 1] * self.resume_ratio
+        ):
+            level -= 1
+        return level
+
+    def _state(self, now: float) -> Dict[str, Any]:
+        window = self.arrivals.window
+        arrivals = self.arrivals.count(now)
+        return {
+            "level": LEVELS[self.level],
+            "level_since": self.level_since,
+            "backlog_minutes": round(self.backlog_minutes, 1),
+            "arrivals": arrivals,
+            "arrivals_per_hour": round(arrivals * 3600 / window, 1),
+            "arrivals_by_platform": self.arrivals.counts(now),
+            "window_minutes": round(window / 60, 1),
+            "quote_extension_minutes": self.quote_extension_minutes(),
+            "paused_platforms": {
+                platform: {"since": pause["since"], "manual": pause["manual"]}
+                for platform, pause in self.paused.items()
+            }
+        }
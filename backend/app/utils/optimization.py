@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Tuple
 from decimal import Decimal
 from datetime import datetime, timedelta
+import numpy as np
 
 
 class BusinessOptimizer:
@@ -233,39 +234,84 @@ class BusinessOptimizer:
         demand_forecast: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
-        Optimize inventory levels based on demand patterns and costs
+        Optimize inventory levels based on demand patterns and costs.
+        Reorder points and EOQ are computed for all items at once with numpy.
+        Items that provide `usage_variance` get a statistical safety stock
+        (z * sigma * sqrt(lead time)); the rest keep the 50% lead-time buffer.
         """
+        if not inventory_data:
+            return {
+                "items": [],
+                "recommendations": [],
+                "total_items_to_reorder": 0,
+                "high_priority_items": 0
+            }
+
+        service_level_z = demand_forecast.get("service_level_z", 1.65)
+
+        current_stock = np.array([float(item.get("current_stock", 0)) for item in inventory_data])
+        min_threshold = np.array([float(item.get("min_threshold", 0)) for item in inventory_data])
+        usage_rate = np.array([float(item.get("daily_usage", 0)) for item in inventory_data])
+        lead_time = np.array([float(item.get("supplier_lead_time", 3)) for item in inventory_data])
+        order_cost = np.array([float(item.get("order_cost", 10)) for item in inventory_data])
+        holding_cost = np.array([float(item.get("holding_cost", 2)) for item in inventory_data])
+        has_variance = np.array([item.get("usage_variance") is not None for item in inventory_data])
+        usage_std = np.sqrt(np.array([float(item.get("usage_variance") or 0) for item in inventory_data]))
+
+        # Calculate optimal stock levels
+        safety_stock = np.where(
+            has_variance,
+            service_level_z * usage_std * np.sqrt(lead_time),
+            usage_rate * lead_time * 1.5  # 50% safety buffer
+        )
+        reorder_point = usage_rate * lead_time + safety_stock
+
+        # Economic Order Quantity, monthly supply as fallback when holding cost is unknown
+        annual_demand = usage_rate * 365
+        safe_holding = np.where(holding_cost > 0, holding_cost, 1)
+        eoq = np.where(
+            holding_cost > 0,
+            np.sqrt(2 * annual_demand * order_cost / safe_holding),
+            annual_demand / 12
+        )
+        eoq = np.maximum(1, np.floor(eoq))
+
+        needs_reorder = current_stock < reorder_point
+        high_urgency = needs_reorder & (current_stock < min_threshold)
+        days_of_cover = np.where(usage_rate > 0, current_stock / np.where(usage_rate > 0, usage_rate, 1), np.inf)
+
+        items = []
         recommendations = []
-        
-        for item in inventory_data:
-            current_stock = item.get("current_stock", 0)
-            min_threshold = item.get("min_threshold", 0)
-            usage_rate = item.get("daily_usage", 0)
-            lead_time_days = item.get("supplier_lead_time", 3)
-            
-            # Calculate optimal stock levels
-            safety_stock = usage_rate * lead_time_days * 1.5  # 50% safety buffer
-            reorder_point = usage_rate * lead_time_days + safety_stock
-            optimal_order_quantity = BusinessOptimizer._calculate_eoq(
-                annual_demand=usage_rate * 365,
-                order_cost=item.get("order_cost", 10),
-                holding_cost=item.get("holding_cost", 2)
-            )
-            
-            if current_stock < reorder_point:
+        for i, item in enumerate(inventory_data):
+            policy = {
+                "item_id": item.get("id"),
+                "item": item["name"],
+                "current_stock": round(float(current_stock[i]), 3),
+                "daily_usage": round(float(usage_rate[i]), 3),
+                "usage_std": round(float(usage_std[i]), 3),
+                "lead_time_days": round(float(lead_time[i]), 2),
+                "safety_stock": round(float(safety_stock[i]), 3),
+                "reorder_point": round(float(reorder_point[i]), 3),
+                "economic_order_quantity": int(eoq[i]),
+                "days_of_cover": round(float(days_of_cover[i]), 1) if np.isfinite(days_of_cover[i]) else None
+            }
+            items.append(policy)
+
+            if needs_reorder[i]:
                 recommendations.append({
                     "item": item["name"],
                     "action": "reorder",
-                    "current_stock": current_stock,
-                    "reorder_point": reorder_point,
-                    "suggested_quantity": optimal_order_quantity,
-                    "urgency": "high" if current_stock < min_threshold else "medium"
+                    "current_stock": policy["current_stock"],
+                    "reorder_point": policy["reorder_point"],
+                    "suggested_quantity": policy["economic_order_quantity"],
+                    "urgency": "high" if high_urgency[i] else "medium"
                 })
-        
+
         return {
+            "items": items,
             "recommendations": recommendations,
-            "total_items_to_reorder": len([r for r in recommendations if r["action"] == "reorder"]),
-            "high_priority_items": len([r for r in recommendations if r.get("urgency") == "high"])
+            "total_items_to_reorder": int(needs_reorder.sum()),
+            "high_priority_items": int(high_urgency.sum())
         }
     
     @staticmethod
@@ -342,6 +388,73 @@ class BusinessOptimizer:
             "optimal_zones": len([z for z in zone_analysis if z["efficiency_score"] > 1.0])
         }
     
+    @staticmethod
+    def optimize_supplier_basket(
+        costs: np.ndarray,
+        fixed_costs: np.ndarray,
+        exhaustive_limit: int = 12
+    ) -> Tuple[np.ndarray, float, str]:
+        """
+        Pick which supplier to buy each item from, minimizing line costs plus a
+        fixed cost (shipping, lead-time penalty) per supplier used.
+
+        `costs` is (items x suppliers) with np.inf where a supplier does not
+        sell the item; `fixed_costs` is (suppliers,). Up to `exhaustive_limit`
+        suppliers every supplier subset is evaluated (vectorized, exact);
+        beyond that a greedy drop heuristic starts from all suppliers and
+        closes the one that saves most until no closure saves money.
+        Returns the supplier column per item (-1 if nobody sells it), the
+        total cost and the method used.
+        """
+        costs = np.asarray(costs, dtype=float)
+        fixed_costs = np.asarray(fixed_costs, dtype=float)
+        n_items, n_suppliers = costs.shape
+        assignment = np.full(n_items, -1, dtype=int)
+
+        coverable = np.isfinite(costs).any(axis=1) if n_suppliers else np.zeros(n_items, dtype=bool)
+        if not coverable.any():
+            return assignment, 0.0, "none"
+        covered_costs = costs[coverable]
+
+        if n_suppliers <= exhaustive_limit:
+            method = "exhaustive"
+            masks = ((np.arange(1, 2 ** n_suppliers)[:, None] >> np.arange(n_suppliers)) & 1).astype(bool)
+            chunk = max(1, 2_000_000 // max(covered_costs.size, 1))
+            best_total, best_mask = np.inf, None
+            for start in range(0, len(masks), chunk):
+                block = masks[start:start + chunk]
+                line_costs = np.where(block[:, None, :], covered_costs[None, :, :], np.inf).min(axis=2)
+                totals = line_costs.sum(axis=1) + block @ fixed_costs
+                i = int(np.argmin(totals))
+                if totals[i] < best_total:
+                    best_total, best_mask = float(totals[i]), block[i]
+            open_suppliers = best_mask
+        else:
+            method = "greedy"
+            open_suppliers = np.isfinite(covered_costs).any(axis=0)
+            while open_suppliers.sum() > 1:
+                masked = np.where(open_suppliers[None, :], covered_costs, np.inf)
+                order = np.argsort(masked, axis=1)
+                best = masked[np.arange(len(masked)), order[:, 0]]
+                second = masked[np.arange(len(masked)), order[:, 1]]
+                # Saving from closing j: its fixed cost minus re-routing its items
+                extra = np.zeros(n_suppliers)
+                np.add.at(extra, order[:, 0], second - best)
+                savings = np.where(open_suppliers, fixed_costs - extra, -np.inf)
+                j = int(np.argmax(savings))
+                if not savings[j] > 0:
+                    break
+                open_suppliers = open_suppliers.copy()
+                open_suppliers[j] = False
+
+        masked = np.where(open_suppliers[None, :], covered_costs, np.inf)
+        chosen = masked.argmin(axis=1)
+        assignment[coverable] = chosen
+        used = np.zeros(n_suppliers, dtype=bool)
+        used[chosen] = True
+        total = float(masked[np.arange(len(masked)), chosen].sum() + fixed_costs[used].sum())
+        return assignment, total, method
+    
     @staticmethod
     def _calculate_eoq(annual_demand: float, order_cost: float, holding_cost: float) -> int:
         """
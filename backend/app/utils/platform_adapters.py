@@ -0,0 +1,157 @@
+"""
+Webhook payload adapters: each maps one delivery platform's order payload to
+OrderCreate. Platform menus carry the POS menu item id as their external
+code (Uber Eats `external_data`, PedidosYa `integrationCode`, Bis `sku`).
+"""
+
+from typing import Any, Dict, List, Optional
+from decimal import Decimal, InvalidOperation
+
+from ..schemas.orders import OrderCreate, OrderItemCreate, Platform, PaymentMethod
+
+
+def _object(value: Any, field: str) -> Dict[str, Any]:
+    """A nested JSON object (missing counts as empty)"""
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{field} must be an object")
+    return value
+
+
+def _list(value: Any, field: str) -> List[Any]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"{field} must be a list")
+    return value
+
+
+def _amount(value: Any, field: str, cents: bool = False) -> Decimal:
+    """Money amount from a JSON number or numeric string ("12.50", not "12,50")"""
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid amount for {field}: {value!r}")
+    try:
+        amount = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid amount for {field}: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount for {field}: {value!r}")
+    return amount / 100 if cents else amount
+
+
+def _menu_item_id(code: Any) -> int:
+    try:
+        return int(str(code).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"Unknown menu item code {code!r}")
+
+
+def _phone(value: Any) -> Optional[str]:
+    # Platforms send masked or proxy numbers; keep only what the schema accepts
+    if not value:
+        return None
+    digits = "".join(c for c in str(value) if c.isdigit() or c == "+")
+    return digits if 7 <= len(digits.lstrip("+")) <= 20 else None
+
+
+def _payment(value: Optional[str]) -> PaymentMethod:
+    return PaymentMethod.CASH if (value or "").lower() in ("cash", "efectivo") else PaymentMethod.CARD
+
+
+def uber_eats_order_id(payload: Dict[str, Any]) -> Optional[str]:
+    order_id = payload.get("id")
+    return str(order_id) if order_id is not None else None
+
+
+def adapt_uber_eats(payload: Dict[str, Any]) -> OrderCreate:
+    """Uber Eats order: prices in cents under cart.items[].price.unit_price.amount"""
+    eater = _object(payload.get("eater"), "eater")
+    payment = _object(payload.get("payment"), "payment")
+    items = []
+    for item in _list(_object(payload.get("cart"), "cart").get("items"), "cart.items"):
+        item = _object(item, "cart item")
+        price = _object(_object(item.get("price"), "price").get("unit_price"), "unit_price")
+        items.append(OrderItemCreate(
+            menu_item_id=_menu_item_id(item.get("external_data")),
+            quantity=item.get("quantity"),
+            unit_price=_amount(price.get("amount"), "unit_price", cents=True),
+            special_instructions=item.get("special_instructions")
+        ))
+    delivery = _object((_list(payload.get("deliveries"), "deliveries") or [None])[0], "delivery")
+    return OrderCreate(
+        customer_name=" ".join(filter(None, [eater.get("first_name"), eater.get("last_name")])) or "Uber Eats",
+        customer_phone=_phone(_object(eater.get("phone"), "phone").get("number")),
+        customer_address=_object(delivery.get("location"), "location").get("street_address"),
+        platform=Platform.UBER_EATS,
+        platform_order_id=uber_eats_order_id(payload),
+        payment_method=_payment(payment.get("type")),
+        delivery_fee=_amount(payment.get("delivery_fee", 0), "delivery_fee", cents=True),
+        items=items
+    )
+
+
+def pedidos_ya_order_id(payload: Dict[str, Any]) -> Optional[str]:
+    code = payload.get("code") or payload.get("id")
+    return str(code) if code is not None else None
+
+
+def adapt_pedidos_ya(payload: Dict[str, Any]) -> OrderCreate:
+    """PedidosYa order: details[] with product.integrationCode and unitPrice"""
+    user = _object(payload.get("user"), "user")
+    items = []
+    for detail in _list(payload.get("details"), "details"):
+        detail = _object(detail, "detail")
+        items.append(OrderItemCreate(
+            menu_item_id=_menu_item_id(_object(detail.get("product"), "product").get("integrationCode")),
+            quantity=detail.get("quantity"),
+            unit_price=_amount(detail.get("unitPrice"), "unitPrice"),
+            special_instructions=detail.get("notes")
+        ))
+    return OrderCreate(
+        customer_name=" ".join(filter(None, [user.get("name"), user.get("lastName")])) or "PedidosYa",
+        customer_phone=_phone(user.get("phone")),
+        customer_address=_object(payload.get("address"), "address").get("description"),
+        platform=Platform.PEDIDOS_YA,
+        platform_order_id=pedidos_ya_order_id(payload),
+        payment_method=_payment(_object(payload.get("payment"), "payment").get("type")),
+        delivery_fee=_amount(payload.get("shippingAmount", 0), "shippingAmount"),
+        items=items
+    )
+
+
+def bis_order_id(payload: Dict[str, Any]) -> Optional[str]:
+    order_id = payload.get("order_id")
+    return str(order_id) if order_id is not None else None
+
+
+def adapt_bis(payload: Dict[str, Any]) -> OrderCreate:
+    """Bis order: flat items[] with sku, qty and price"""
+    customer = _object(payload.get("customer"), "customer")
+    items = []
+    for item in _list(payload.get("items"), "items"):
+        item = _object(item, "item")
+        items.append(OrderItemCreate(
+            menu_item_id=_menu_item_id(item.get("sku")),
+            quantity=item.get("qty"),
+            unit_price=_amount(item.get("price"), "price"),
+            special_instructions=item.get("comment")
+        ))
+    return OrderCreate(
+        customer_name=customer.get("name") or "Bis",
+        customer_phone=_phone(customer.get("phone")),
+        customer_address=customer.get("address"),
+        platform=Platform.BIS,
+        platform_order_id=bis_order_id(payload),
+        payment_method=_payment(payload.get("payment_method")),
+        delivery_fee=_amount(payload.get("delivery_fee", 0), "delivery_fee"),
+        items=items
+    )
+
+
+# platform -> (order id extractor, adapter)
+ADAPTERS: Dict[str, Any] = {
+    Platform.UBER_EATS.value: (uber_eats_order_id, adapt_uber_eats),
+    Platform.PEDIDOS_YA.value: (pedidos_ya_order_id, adapt_pedidos_ya),
+    Platform.BIS.value: (bis_order_id, adapt_bis)
+}
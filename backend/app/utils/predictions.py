@@ -1,7 +1,8 @@
 from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 import statistics
+import numpy as np
 from ..models.orders import Order
 
 
@@ -234,6 +235,40 @@ class DemandPredictor:
             "predictions": predictions
         }
     
+    @staticmethod
+    def predict_item_demand(
+        history: np.ndarray,
+        history_start: date,
+        start_date: date,
+        prediction_days: int
+    ) -> np.ndarray:
+        """
+        Weekday-seasonal demand forecast for every menu item at once.
+        `history` is a (days x menu items) matrix of quantities sold per day
+        starting at `history_start`; returns a (prediction_days x menu items)
+        matrix of expected quantities starting at `start_date`.
+        """
+        history = np.asarray(history, dtype=float)
+        n_days, n_items = history.shape
+        if n_days == 0 or n_items == 0:
+            return np.zeros((prediction_days, n_items))
+        
+        # Average quantity per weekday, falling back to the overall mean
+        weekdays = (np.arange(n_days) + history_start.weekday()) % 7
+        weekday_counts = np.bincount(weekdays, minlength=7)
+        weekday_totals = np.zeros((7, n_items))
+        np.add.at(weekday_totals, weekdays, history)
+        
+        overall_mean = history.mean(axis=0)
+        weekday_profile = np.where(
+            weekday_counts[:, None] > 0,
+            weekday_totals / np.maximum(weekday_counts, 1)[:, None],
+            overall_mean[None, :]
+        )
+        
+        future_weekdays = (np.arange(prediction_days) + start_date.weekday()) % 7
+        return weekday_profile[future_weekdays]
+    
     @staticmethod
     def predict_next_period(orders: List[Order], period: str) -> Dict[str, Any]:
         """
@@ -0,0 +1,136 @@
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+
+# Conversion factors from recipe unit to inventory unit
+UNIT_CONVERSIONS = {
+    ("g", "kg"): 0.001,
+    ("kg", "g"): 1000.0,
+    ("mg", "g"): 0.001,
+    ("mg", "kg"): 0.000001,
+    ("ml", "l"): 0.001,
+    ("ml", "liters"): 0.001,
+    ("l", "ml"): 1000.0,
+    ("liters", "ml"): 1000.0,
+    ("l", "liters"): 1.0,
+    ("liters", "l"): 1.0,
+}
+
+
+def convert_quantity(quantity: float, from_unit: Optional[str], to_unit: Optional[str]) -> float:
+    """
+    Convert a recipe quantity into the inventory item's unit.
+    Unknown unit pairs are assumed to already be expressed in the same unit.
+    """
+    if not from_unit or not to_unit:
+        return quantity
+    from_unit = from_unit.strip().lower()
+    to_unit = to_unit.strip().lower()
+    if from_unit == to_unit:
+        return quantity
+    return quantity * UNIT_CONVERSIONS.get((from_unit, to_unit), 1.0)
+
+
+def sub_recipe_order(recipes: Dict[int, Optional[List[Dict[str, Any]]]]) -> List[int]:
+    """
+    Prepared item ids ordered so every item comes after the sub-preparations
+    it uses (`recipes` maps prepared item id to its recipe). Cycles in the
+    sub-recipe graph are broken at the repeated edge.
+    """
+    order = []
+    state: Dict[int, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(item_id: int) -> None:
+        state[item_id] = 1
+        for entry in recipes[item_id] or []:
+            child = entry.get("ingredient_id")
+            if child in recipes and state.get(child) is None:
+                visit(child)
+        state[item_id] = 2
+        order.append(item_id)
+
+    for item_id in sorted(recipes):
+        if state.get(item_id) is None:
+            visit(item_id)
+    return order
+
+
+class RecipeMatrix:
+    """
+    Sparse menu-item x ingredient matrix built from MenuItem.recipe.
+    Row i holds the inventory quantity of every ingredient used by one unit
+    of menu item i, so demand (periods x menu items) @ matrix gives the
+    projected ingredient consumption (periods x ingredients).
+    """
+
+    def __init__(self, menu_item_ids: List[int], ingredient_ids: List[int], matrix: sparse.spmatrix):
+        self.menu_item_ids = list(menu_item_ids)
+        self.ingredient_ids = list(ingredient_ids)
+        self.item_index = {item_id: i for i, item_id in enumerate(self.menu_item_ids)}
+        self.ingredient_index = {ingredient_id: j for j, ingredient_id in enumerate(self.ingredient_ids)}
+        self.matrix = sparse.csr_matrix(matrix)
+        self._by_ingredient = self.matrix.tocsc()
+
+    @classmethod
+    def from_recipes(
+        cls,
+        recipes: Iterable[Tuple[int, Optional[List[Dict[str, Any]]]]],
+        ingredient_units: Optional[Dict[int, str]] = None
+    ) -> "RecipeMatrix":
+        """
+        Build the matrix from (menu_item_id, recipe) pairs. Recipe entries are
+        dicts with ingredient_id, quantity and unit; duplicate entries are summed.
+        With `ingredient_units` (inventory id -> unit), ingredients missing from
+        it are dropped and quantities are converted to the inventory unit.
+        """
+        menu_item_ids = []
+        ingredient_index = {}
+        rows, cols, values = [], [], []
+
+        for menu_item_id, recipe in recipes:
+            row = len(menu_item_ids)
+            menu_item_ids.append(menu_item_id)
+            for ingredient in recipe or []:
+                ingredient_id = ingredient.get("ingredient_id")
+                if ingredient_id is None:
+                    continue
+                if ingredient_units is not None and ingredient_id not in ingredient_units:
+                    continue  # Ingredient no longer exists in inventory
+                col = ingredient_index.setdefault(ingredient_id, len(ingredient_index))
+                rows.append(row)
+                cols.append(col)
+                values.append(convert_quantity(
+                    float(ingredient.get("quantity", 0)),
+                    ingredient.get("unit"),
+                    ingredient_units.get(ingredient_id) if ingredient_units is not None else None
+                ))
+
+        matrix = sparse.coo_matrix(
+            (values, (rows, cols)),
+            shape=(len(menu_item_ids), len(ingredient_index)),
+            dtype=float
+        )
+        return cls(menu_item_ids, list(ingredient_index.keys()), matrix)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.matrix.shape
+
+    def consumption(self, demand: np.ndarray) -> np.ndarray:
+        """
+        Project ingredient consumption from menu item demand.
+        `demand` is (periods x menu items) or a single (menu items,) vector.
+        """
+        demand = np.asarray(demand, dtype=float)
+        if demand.ndim == 1:
+            return np.asarray(self.matrix.T @ demand).ravel()
+        return np.asarray(self.matrix.T @ demand.T).T
+
+    def menu_items_using(self, ingredient_ids: Iterable[int]) -> List[int]:
+        """Menu item ids whose recipe contains any of the given ingredients"""
+        cols = [self.ingredient_index[i] for i in ingredient_ids if i in self.ingredient_index]
+        if not cols:
+            return []
+        rows = np.unique(self._by_ingredient[:, cols].nonzero()[0])
+        return [self.menu_item_ids[r] for r in rows]
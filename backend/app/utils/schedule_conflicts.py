@@ -0,0 +1,156 @@
+from typing import Any, Dict, Iterable, List, Tuple
+from datetime import date, datetime, time, timedelta
+import threading
+
+from .intervals import IntervalTree
+
+
+MINUTES_PER_DAY = 1440
+
+
+def _minute_of(day: date, moment: time) -> int:
+    return day.toordinal() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def _to_datetime(minute: int) -> datetime:
+    day, offset = divmod(minute, MINUTES_PER_DAY)
+    return datetime.combine(date.fromordinal(day), time(offset // 60, offset % 60))
+
+
+def shift_span(schedule_date: date, start_time: time, end_time: time) -> Tuple[int, int]:
+    """Absolute [start, end) minutes of a shift; shifts ending at or before their start cross midnight"""
+    start = _minute_of(schedule_date, start_time)
+    end = _minute_of(schedule_date, end_time)
+    if end <= start:
+        end += MINUTES_PER_DAY
+    return start, end
+
+
+def on_duty_spans(shift: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """Shift span minus its break (if any), as [start, end) minute ranges"""
+    start, end = shift_span(shift["schedule_date"], shift["start_time"], shift["end_time"])
+    if not shift.get("break_start") or not shift.get("break_end"):
+        return [(start, end)]
+
+    break_start = _minute_of(shift["schedule_date"], shift["break_start"])
+    if break_start < start:
+        break_start += MINUTES_PER_DAY
+    break_end = _minute_of(shift["schedule_date"], shift["break_end"])
+    while break_end <= break_start:
+        break_end += MINUTES_PER_DAY
+    break_start, break_end = max(break_start, start), min(break_end, end)
+    if break_start >= break_end:
+        return [(start, end)]
+    return [(a, b) for a, b in ((start, break_start), (break_end, end)) if a < b]
+
+
+class ScheduleConflictChecker:
+    """
+    In-memory roster index for conflict and coverage checks.
+
+    Each staff member has an interval tree of whole shifts (breaks included,
+    since a break does not free someone for another shift) and each position
+    has an interval tree of on-duty time (breaks excluded). Adding a shift and
+    checking it for double-booking are O(log n) instead of a roster rescan.
+    """
+
+    def __init__(self, shifts: Iterable[Dict[str, Any]] = ()):
+        self._staff_trees: Dict[int, IntervalTree] = {}
+        self._position_trees: Dict[str, IntervalTree] = {}
+        self._shifts: Dict[Any, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        for shift in shifts:
+            self.add(shift)
+
+    def __len__(self) -> int:
+        return len(self._shifts)
+
+    def conflicts(self, shift: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Existing shifts of the same staff member overlapping `shift` (ignoring itself)"""
+        start, end = shift_span(shift["schedule_date"], shift["start_time"], shift["end_time"])
+        with self._lock:
+            tree = self._staff_trees.get(shift["staff_id"])
+            overlaps = tree.overlapping(start, end) if tree else []
+        return [
+            {
+                "schedule_id": key,
+                "staff_id": shift["staff_id"],
+                "schedule_date": existing["schedule_date"],
+                "start_time": existing["start_time"],
+                "end_time": existing["end_time"],
+                "overlap_minutes": min(end, other_end) - max(start, other_start)
+            }
+            for other_start, other_end, key, existing in overlaps
+            if key != shift.get("id")
+        ]
+
+    def add(self, shift: Dict[str, Any]) -> None:
+        """
+        Index a shift with keys id, staff_id, position, schedule_date,
+        start_time, end_time and optional break_start / break_end
+        """
+        start, end = shift_span(shift["schedule_date"], shift["start_time"], shift["end_time"])
+        with self._lock:
+            if shift["id"] in self._shifts:
+                self.remove(shift["id"])
+            self._shifts[shift["id"]] = shift
+            self._staff_trees.setdefault(shift["staff_id"], IntervalTree()).insert(start, end, shift["id"], shift)
+            tree = self._position_trees.setdefault(shift["position"], IntervalTree())
+            for piece, (piece_start, piece_end) in enumerate(on_duty_spans(shift)):
+                tree.insert(piece_start, piece_end, (shift["id"], piece), shift)
+
+    def remove(self, shift_id: Any) -> bool:
+        with self._lock:
+            shift = self._shifts.pop(shift_id, None)
+            if shift is None:
+                return False
+            start, _ = shift_span(shift["schedule_date"], shift["start_time"], shift["end_time"])
+            self._staff_trees[shift["staff_id"]].remove(start, shift_id)
+            for piece, (piece_start, _) in enumerate(on_duty_spans(shift)):
+                self._position_trees[shift["position"]].remove(piece_start, (shift_id, piece))
+            return True
+
+    def double_bookings(self) -> List[Dict[str, Any]]:
+        """Every pair of overlapping shifts of the same staff member, reported once"""
+        with self._lock:
+            shifts = list(self._shifts.values())
+        found = []
+        for shift in shifts:
+            for conflict in self.conflicts(shift):
+                if shift["id"] < conflict["schedule_id"]:
+                    found.append({
+                        "schedule_id": shift["id"],
+                        "conflicts_with": conflict["schedule_id"],
+                        "staff_id": shift["staff_id"],
+                        "overlap_minutes": conflict["overlap_minutes"]
+                    })
+        return found
+
+    def coverage_gaps(
+        self,
+        position: str,
+        start_date: date,
+        end_date: date,
+        opening_hour: int,
+        closing_hour: int,
+        min_gap_minutes: int = 1
+    ) -> List[Dict[str, Any]]:
+        """Periods inside opening hours with nobody of `position` on duty, day by day"""
+        gaps = []
+        with self._lock:
+            tree = self._position_trees.get(position) or IntervalTree()
+            day = start_date
+            while day <= end_date:
+                window_start = day.toordinal() * MINUTES_PER_DAY + opening_hour * 60
+                window_end = day.toordinal() * MINUTES_PER_DAY + min(closing_hour, 24) * 60
+                for gap_start, gap_end in tree.gaps(window_start, window_end):
+                    if gap_end - gap_start >= min_gap_minutes:
+                        gaps.append({
+                            "position": position,
+                            "date": day,
+                            "start": _to_datetime(gap_start),
+                            "end": _to_datetime(gap_end),
+                            "minutes": gap_end - gap_start
+                        })
+                day += timedelta(days=1)
+        return gaps
@@ -0,0 +1,73 @@
+from typing import List, Optional
+from datetime import date, timedelta
+import calendar
+
+
+class ScheduleRecurrence:
+    """
+    rrule-style expansion of purchase schedule recurrences. Occurrences are
+    computed arithmetically (first match, then fixed steps or one per month),
+    so the cost depends on the number of occurrences and not on the number of
+    days in the range.
+    """
+
+    @staticmethod
+    def occurrences(
+        frequency: str,
+        start_date: date,
+        end_date: date,
+        day_of_week: Optional[int] = None,
+        day_of_month: Optional[int] = None,
+        anchor: Optional[date] = None
+    ) -> List[date]:
+        """
+        Dates in [start_date, end_date] on which the schedule falls.
+
+        weekly / biweekly: every (other) `day_of_week`; biweekly parity is
+        fixed by `anchor` (the first matching weekday on/after it, usually
+        the schedule's creation date).
+        monthly: `day_of_month`, clamped to the last day of short months.
+        """
+        if end_date < start_date:
+            return []
+
+        if frequency in ("weekly", "biweekly"):
+            if day_of_week is None:
+                return []
+            step = 7 if frequency == "weekly" else 14
+            first = ScheduleRecurrence._next_weekday(start_date, day_of_week)
+
+            if frequency == "biweekly" and anchor is not None:
+                base = ScheduleRecurrence._next_weekday(anchor, day_of_week)
+                if base > end_date:
+                    return []
+                if base >= start_date:
+                    first = base
+                else:
+                    periods = -(-(start_date - base).days // step)  # ceil
+                    first = base + timedelta(days=periods * step)
+
+            if first > end_date:
+                return []
+            count = (end_date - first).days // step + 1
+            return [first + timedelta(days=i * step) for i in range(count)]
+
+        if frequency == "monthly":
+            if day_of_month is None:
+                return []
+            result = []
+            year, month = start_date.year, start_date.month
+            while (year, month) <= (end_date.year, end_date.month):
+                day = min(day_of_month, calendar.monthrange(year, month)[1])
+                occurrence = date(year, month, day)
+                if start_date <= occurrence <= end_date:
+                    result.append(occurrence)
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            return result
+
+        return []
+
+    @staticmethod
+    def _next_weekday(day: date, weekday: int) -> date:
+        """First date on or after `day` falling on `weekday` (0=Monday)"""
+        return day + timedelta(days=(weekday - day.weekday()) % 7)
@@ -0,0 +1,274 @@
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, timedelta
+import time
+import numpy as np
+
+
+class ShiftScheduler:
+    """
+    Demand-driven shift scheduler.
+
+    Coverage requirements are given per role as (days, 24) arrays of staff
+    needed in each hour. Candidate shifts are contiguous blocks of one of
+    `shift_lengths` hours inside the opening window, at most one per staff
+    member per day, and weekly hours are capped by `max_hours_per_week`.
+
+    The solver is a cost-weighted greedy set cover (deficit hours covered per
+    dollar) followed by local search moves that never reopen a coverage gap:
+    dropping redundant shifts, shrinking them to the cheapest template that
+    still covers the hours only they cover, and handing them to a cheaper
+    eligible staff member. Greedy fill and improvement alternate until
+    nothing changes or the time budget runs out.
+    """
+
+    def __init__(
+        self,
+        requirements: Dict[str, np.ndarray],
+        staff: List[Dict[str, Any]],
+        start_date: date,
+        shift_lengths: Tuple[int, ...] = (4, 6, 8),
+        opening_hour: int = 11,
+        closing_hour: int = 23,
+        non_preferred_penalty: float = 0.15,
+        default_hourly_rate: float = 3.0,
+        existing: Optional[List[Tuple[int, int, int, int]]] = None
+    ):
+        """
+        `staff` entries need id, position and optionally skills, hourly_rate,
+        max_hours_per_week and preferred_days (1=Monday ... 7=Sunday).
+        `existing` holds already scheduled shifts as (staff_id, day index,
+        start hour, end hour); they occupy the day, count towards weekly hours
+        and cover their staff member's position.
+        """
+        self.roles = list(requirements)
+        self.start_date = start_date
+        self.required = np.stack([np.asarray(requirements[role], dtype=np.int64) for role in self.roles]) \
+            if self.roles else np.zeros((0, 0, 24), dtype=np.int64)
+        self.n_days = self.required.shape[1]
+        self.n_weeks = -(-self.n_days // 7)
+        self.staff = staff
+
+        closing_hour = min(closing_hour, 24)
+        templates = []
+        for length in sorted(set(shift_lengths)):
+            for start in range(opening_hour, closing_hour - length + 1):
+                templates.append((start, start + length))
+        if not templates and closing_hour > opening_hour:
+            templates.append((opening_hour, closing_hour))
+        self.templates = templates
+        self.template_hours = np.array([end - start for start, end in templates], dtype=np.int64)
+        self.template_mask = np.zeros((len(templates), 24), dtype=bool)
+        for t, (start, end) in enumerate(templates):
+            self.template_mask[t, start:end] = True
+
+        n_staff = len(staff)
+        self.eligible = np.zeros((n_staff, len(self.roles)), dtype=bool)
+        self.rates = np.zeros(n_staff)
+        self.max_hours = np.zeros(n_staff, dtype=np.int64)
+        preferred = np.ones((n_staff, self.n_days), dtype=bool)
+        weekdays = np.array([(start_date + timedelta(days=d)).isoweekday() for d in range(self.n_days)])
+        for s, member in enumerate(staff):
+            abilities = {member.get("position")} | set(member.get("skills") or [])
+            for r, role in enumerate(self.roles):
+                self.eligible[s, r] = role in abilities
+            self.rates[s] = float(member.get("hourly_rate") or default_hourly_rate)
+            self.max_hours[s] = int(member.get("max_hours_per_week") or 40)
+            if member.get("preferred_days"):
+                preferred[s] = np.isin(weekdays, list(member["preferred_days"]))
+        self.preferred = preferred
+
+        # cost[s, d, t]: labor cost of staff s working template t on day d
+        self.cost = (
+            self.rates[:, None, None]
+            * self.template_hours[None, None, :]
+            * np.where(preferred, 1.0, 1.0 + non_preferred_penalty)[:, :, None]
+        )
+        self.week_of_day = np.arange(self.n_days) // 7
+
+        self.coverage = np.zeros_like(self.required)
+        self.busy = np.zeros((n_staff, self.n_days), dtype=bool)
+        self.hours_used = np.zeros((n_staff, self.n_weeks), dtype=np.int64)
+        self.assignments: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+        index = {member["id"]: s for s, member in enumerate(staff)}
+        for staff_id, day, start, end in existing or []:
+            s = index.get(staff_id)
+            if s is None or not 0 <= day < self.n_days:
+                continue
+            self.busy[s, day] = True
+            self.hours_used[s, self.week_of_day[day]] += max(end - start, 0)
+            if staff[s].get("position") in self.roles:
+                self.coverage[self.roles.index(staff[s]["position"]), day, max(start, 0):min(end, 24)] += 1
+
+    def solve(self, time_budget: float = 5.0, local_search: bool = True) -> Dict[str, Any]:
+        """Build the schedule within `time_budget` seconds and summarize it"""
+        started = time.perf_counter()
+        deadline = started + time_budget
+        rounds = 0
+        stopped = "converged"
+
+        self._greedy_fill()
+        if local_search:
+            while True:
+                if time.perf_counter() >= deadline:
+                    stopped = "time_budget"
+                    break
+                rounds += 1
+                improved = self._improve(deadline)
+                filled = self._greedy_fill()
+                if not improved and not filled:
+                    break
+
+        return self._summary(rounds, stopped, time.perf_counter() - started, local_search)
+
+    def _greedy_fill(self) -> bool:
+        """Add shifts with the best deficit-hours-per-dollar until none helps"""
+        if not self.roles or not self.templates or not len(self.staff):
+            return False
+
+        added = False
+        while True:
+            deficit = (self.required - self.coverage > 0).astype(np.int64)
+            gains = deficit @ self.template_mask.T.astype(np.int64)  # (roles, days, templates)
+            if not gains.any():
+                return added
+
+            best_gain = np.zeros(self.cost.shape, dtype=np.int64)
+            best_role = np.zeros(self.cost.shape, dtype=np.int64)
+            for r in range(len(self.roles)):
+                role_gain = np.where(self.eligible[:, r][:, None, None], gains[r][None], 0)
+                better = role_gain > best_gain
+                best_gain = np.where(better, role_gain, best_gain)
+                best_role = np.where(better, r, best_role)
+
+            feasible = (
+                ~self.busy[:, :, None]
+                & (
+                    self.hours_used[:, self.week_of_day][:, :, None] + self.template_hours[None, None, :]
+                    <= self.max_hours[:, None, None]
+                )
+                & (best_gain > 0)
+            )
+            if not feasible.any():
+                return added
+
+            # Ties go to the shift covering more deficit hours
+            score = np.where(feasible, best_gain / self.cost + 1e-9 * best_gain, -np.inf)
+            s, d, t = np.unravel_index(int(np.argmax(score)), score.shape)
+            self._assign(int(s), int(d), int(t), int(best_role[s, d, t]))
+            added = True
+
+    def _improve(self, deadline: float) -> bool:
+        """One pass of drop / shrink / reassign moves over all shifts"""
+        improved = False
+        for (s, d), (t, r) in sorted(self.assignments.items(), key=lambda x: -self.cost[x[0][0], x[0][1], x[1][0]]):
+            if time.perf_counter() >= deadline:
+                break
+            if self.assignments.get((s, d)) != (t, r):
+                continue
+
+            # Hours where this shift is the last one meeting the requirement
+            needed = self.template_mask[t] & (self.coverage[r, d] <= self.required[r, d])
+            self._unassign(s, d)
+            if not needed.any():
+                improved = True
+                continue
+
+            covering = self.template_mask[:, needed].all(axis=1)
+            candidates = np.where(self.eligible[:, r] & ~self.busy[:, d])[0]
+            best = (self.cost[s, d, t], s, t)
+            for candidate in candidates:
+                fits = covering & (
+                    self.hours_used[candidate, self.week_of_day[d]] + self.template_hours <= self.max_hours[candidate]
+                )
+                if not fits.any():
+                    continue
+                costs = np.where(fits, self.cost[candidate, d], np.inf)
+                option = int(np.argmin(costs))
+                if costs[option] < best[0] - 1e-9:
+                    best = (costs[option], int(candidate), option)
+
+            _, new_s, new_t = best
+            self._assign(new_s, d, new_t, r)
+            if (new_s, new_t) != (s, t):
+                improved = True
+        return improved
+
+    def _assign(self, s: int, d: int, t: int, r: int) -> None:
+        self.assignments[(s, d)] = (t, r)
+        self.busy[s, d] = True
+        self.hours_used[s, self.week_of_day[d]] += self.template_hours[t]
+        self.coverage[r, d] += self.template_mask[t]
+
+    def _unassign(self, s: int, d: int) -> None:
+        t, r = self.assignments.pop((s, d))
+        self.busy[s, d] = False
+        self.hours_used[s, self.week_of_day[d]] -= self.template_hours[t]
+        self.coverage[r, d] -= self.template_mask[t]
+
+    def _summary(self, rounds: int, stopped: str, elapsed: float, local_search: bool) -> Dict[str, Any]:
+        shifts = []
+        for (s, d), (t, r) in sorted(self.assignments.items(), key=lambda x: (x[0][1], self.templates[x[1][0]], x[0][0])):
+            start, end = self.templates[t]
+            shifts.append({
+                "staff_id": self.staff[s]["id"],
+                "date": self.start_date + timedelta(days=d),
+                "start_hour": start,
+                "end_hour": end,
+                "role": self.roles[r],
+                "hours": end - start,
+                "cost": round(float(self.cost[s, d, t]), 2),
+                "preferred_day": bool(self.preferred[s, d])
+            })
+
+        missing = np.clip(self.required - self.coverage, 0, None)
+        uncovered = [
+            {
+                "date": self.start_date + timedelta(days=int(d)),
+                "hour": int(h),
+                "role": self.roles[r],
+                "missing": int(missing[r, d, h])
+            }
+            for r, d, h in zip(*np.nonzero(missing))
+        ]
+        required_hours = int(self.required.sum())
+
+        return {
+            "method": "greedy+local_search" if local_search else "greedy",
+            "stopped": stopped,
+            "rounds": rounds,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "shifts": shifts,
+            "total_cost": round(float(sum(shift["cost"] for shift in shifts)), 2),
+            "total_hours": int(sum(shift["hours"] for shift in shifts)),
+            "required_staff_hours": required_hours,
+            "uncovered_staff_hours": int(missing.sum()),
+            "coverage_rate": round((1 - missing.sum() / required_hours) * 100, 2) if required_hours else 100.0,
+            "uncovered": uncovered
+        }
+
+    @staticmethod
+    def requirements_from_demand(
+        demand: np.ndarray,
+        start_date: date,
+        days: int,
+        orders_per_staff_hour: Dict[str, float],
+        minimum_on_duty: Optional[Dict[str, int]] = None,
+        opening_hour: int = 11,
+        closing_hour: int = 23
+    ) -> Dict[str, np.ndarray]:
+        """
+        Turn a (7, 24) weekday x hour demand curve (average orders, 0=Monday)
+        into per-role staff requirements for `days` days from `start_date`
+        """
+        weekdays = [(start_date + timedelta(days=d)).weekday() for d in range(days)]
+        curve = np.asarray(demand, dtype=float)[weekdays]  # (days, 24)
+        open_hours = np.zeros(24, dtype=bool)
+        open_hours[opening_hour:min(closing_hour, 24)] = True
+
+        requirements = {}
+        for role, capacity in orders_per_staff_hour.items():
+            needed = np.ceil(curve / capacity) if capacity > 0 else np.zeros_like(curve)
+            needed = np.maximum(needed, (minimum_on_duty or {}).get(role, 0))
+            requirements[role] = np.where(open_hours[None, :], needed, 0).astype(np.int64)
+        return requirements
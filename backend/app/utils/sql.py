@@ -0,0 +1,91 @@
+from typing import List, Dict, Any
+from sqlalchemy import func, cast, literal, Integer, DateTime
+from sqlalchemy.orm import Session
+
+
+def dialect_name(db: Session) -> str:
+    """Return the SQL dialect of the session's bind (postgresql, sqlite, ...)"""
+    return db.get_bind().dialect.name
+
+
+def seconds_between(db: Session, start, end):
+    """
+    Portable SQL expression for the number of seconds between two
+    datetime/time columns (end - start)
+    """
+    if dialect_name(db) == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400.0
+    return func.extract("epoch", end - start)
+
+
+def days_between(db: Session, start, end):
+    """Portable SQL expression for the number of days between two datetimes"""
+    return seconds_between(db, start, end) / 86400.0
+
+
+def hours_since(db: Session, origin, column):
+    """
+    Portable SQL expression for the whole number of hours from `origin`
+    (a datetime) to a datetime column, for hourly buckets over a range
+    """
+    hours = seconds_between(db, literal(origin, DateTime()), column) / 3600
+    if dialect_name(db) == "sqlite":
+        return cast(hours, Integer)  # Truncates; callers filter column >= origin
+    return cast(func.floor(hours), Integer)
+
+
+def hour_of(db: Session, column):
+    """Portable SQL expression for the hour (0-23) of a datetime column"""
+    if dialect_name(db) == "sqlite":
+        return cast(func.strftime("%H", column), Integer)
+    return cast(func.extract("hour", column), Integer)
+
+
+def month_of(db: Session, column):
+    """Portable SQL expression for the 'YYYY-MM' month of a datetime column"""
+    if dialect_name(db) == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def weekday_of(db: Session, column):
+    """
+    Portable SQL expression for the weekday of a datetime column using
+    Python's convention (0=Monday, 6=Sunday)
+    """
+    if dialect_name(db) == "sqlite":
+        sunday_based = cast(func.strftime("%w", column), Integer)
+    else:
+        sunday_based = cast(func.extract("dow", column), Integer)
+    return (sunday_based + 6) % 7
+
+
+def dialect_insert(db: Session, model):
+    """
+    INSERT construct of the session's dialect, which supports
+    ON CONFLICT clauses (PostgreSQL and SQLite)
+    """
+    dialect = dialect_name(db)
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT not supported for dialect {dialect}")
+    return insert(model.__table__)
+
+
+def upsert(db: Session, model, rows: List[Dict[str, Any]], index_elements: List[str], update_columns: List[str]) -> None:
+    """
+    Bulk INSERT ... ON CONFLICT DO UPDATE for PostgreSQL and SQLite.
+    `rows` are executed as a single executemany statement.
+    """
+    if not rows:
+        return
+
+    stmt = dialect_insert(db, model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: getattr(stmt.excluded, column) for column in update_columns}
+    )
+    db.execute(stmt, rows)
@@ -0,0 +1,19 @@
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+from fastapi.encoders import jsonable_encoder
+
+
+def json_array_stream(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Encode rows as a JSON array chunk by chunk, for StreamingResponse bodies
+    that should not be built in memory
+    """
+    yield "["
+    first = True
+    for row in rows:
+        if not first:
+            yield ","
+        yield json.dumps(jsonable_encoder(row))
+        first = False
+    yield "]"
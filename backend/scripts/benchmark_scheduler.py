@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark del planificador de turnos (ShiftScheduler)
+Delizzia POS - Sistema de Punto de Venta
+
+Genera una plantilla sintética (por defecto 50 empleados x 4 semanas) con
+picos de almuerzo y cena, y compara la solución greedy con greedy + búsqueda
+local: costo, cobertura, tiempo y brecha contra una cota inferior.
+
+Uso:
+    python scripts/benchmark_scheduler.py [--staff 50] [--weeks 4] [--budget 5] [--seed 7]
+"""
+
+import sys
+import time
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Agregar el directorio padre al path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.scheduling import ShiftScheduler
+
+
+POSITIONS = {"cook": 0.35, "assistant": 0.25, "delivery": 0.3, "cashier": 0.1}
+ORDERS_PER_STAFF_HOUR = {"cook": 6.0, "assistant": 10.0, "delivery": 3.0, "cashier": 15.0}
+MINIMUM_ON_DUTY = {"cook": 1, "cashier": 1}
+
+
+def synthetic_demand(scale: float) -> np.ndarray:
+    """Curva día x hora con picos de almuerzo (13h) y cena (20h), más fuerte el fin de semana"""
+    hours = np.arange(24)
+    profile = 0.6 * np.exp(-((hours - 13) ** 2) / 2.0) + np.exp(-((hours - 20) ** 2) / 3.0)
+    weekday_factor = np.array([0.8, 0.8, 0.9, 1.0, 1.3, 1.5, 1.2])
+    return scale * weekday_factor[:, None] * profile[None, :]
+
+
+def synthetic_staff(count: int, rng: np.random.Generator) -> list:
+    positions = rng.choice(list(POSITIONS), size=count, p=list(POSITIONS.values()))
+    staff = []
+    for i, position in enumerate(positions):
+        skills = ["assistant"] if position == "cook" and rng.random() < 0.5 else []
+        staff.append({
+            "id": i + 1,
+            "position": str(position),
+            "skills": skills,
+            "hourly_rate": round(float(rng.uniform(2.8, 4.5)), 2),
+            "max_hours_per_week": int(rng.choice([20, 30, 40, 40, 48])),
+            "preferred_days": sorted(rng.choice(range(1, 8), size=int(rng.integers(3, 7)), replace=False).tolist())
+        })
+    return staff
+
+
+def lower_bound(requirements: dict, staff: list) -> float:
+    """Horas-persona requeridas por rol al costo del empleado elegible más barato"""
+    bound = 0.0
+    for role, required in requirements.items():
+        rates = [m["hourly_rate"] for m in staff if m["position"] == role or role in m["skills"]]
+        if rates:
+            bound += float(required.sum()) * min(rates)
+    return bound
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del planificador de turnos")
+    parser.add_argument("--staff", type=int, default=50)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--budget", type=float, default=5.0, help="Presupuesto de tiempo (segundos)")
+    parser.add_argument("--scale", type=float, default=18.0, help="Pedidos por hora en el pico de la cena")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    today = date.today()
+    start_date = today + timedelta(days=(7 - today.weekday()) % 7)
+    days = args.weeks * 7
+
+    staff = synthetic_staff(args.staff, rng)
+    requirements = ShiftScheduler.requirements_from_demand(
+        synthetic_demand(args.scale), start_date, days, ORDERS_PER_STAFF_HOUR, MINIMUM_ON_DUTY
+    )
+    bound = lower_bound(requirements, staff)
+
+    print(f"📅 {args.staff} empleados x {args.weeks} semanas, "
+          f"{sum(int(r.sum()) for r in requirements.values())} horas-persona requeridas")
+    print(f"{'método':<22}{'costo':>10}{'brecha':>9}{'cobertura':>11}{'turnos':>8}{'rondas':>8}{'tiempo':>11}")
+
+    for local_search in (False, True):
+        scheduler = ShiftScheduler(requirements, staff, start_date)
+        started = time.perf_counter()
+        result = scheduler.solve(time_budget=args.budget, local_search=local_search)
+        elapsed = time.perf_counter() - started
+        gap = (result["total_cost"] / bound - 1) * 100 if bound else 0.0
+        print(f"{result['method']:<22}{result['total_cost']:>10.2f}{gap:>8.1f}%"
+              f"{result['coverage_rate']:>10.2f}%{len(result['shifts']):>8}{result['rounds']:>8}"
+              f"{elapsed * 1000:>9.0f}ms  ({result['stopped']})")
+
+    print(f"cota inferior: {bound:.2f}")
+
+
+if __name__ == "__main__":
+    main()
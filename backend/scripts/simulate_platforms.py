@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Simulador de plataformas de delivery (webhooks de pedidos)
+Delizzia POS - Sistema de Punto de Venta
+
+Levanta la API en el mismo proceso (sin red) y envía ráfagas de webhooks con
+el formato de Uber Eats, PedidosYa y Bis, incluyendo un porcentaje de
+reintentos duplicados. Mide el throughput y la latencia de confirmación
+(p50 / p99) y, una vez vaciada la cola, muestra las estadísticas de ingesta.
+
+Por defecto usa una base SQLite temporal con un menú de prueba; con
+--database-url se puede apuntar a otra base (se usan sus productos activos).
+
+Uso:
+    python scripts/simulate_platforms.py [--bursts 5] [--burst-size 200] [--pause 1]
+                                         [--duplicates 0.05] [--concurrency 50] [--seed 7]
+"""
+
+import os
+import sys
+import json
+import time
+import hmac
+import random
+import asyncio
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+
+# Agregar el directorio padre al path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+FIRST_NAMES = ["Ana", "Luis", "María", "Carlos", "Sofía", "Diego", "Valentina", "Jorge"]
+LAST_NAMES = ["Rojas", "Pérez", "Gómez", "Andrade", "Torres", "Vega"]
+STREETS = ["Av. Amazonas", "Calle Larga", "Av. 6 de Diciembre", "Calle García Moreno"]
+
+
+def uber_eats_payload(order_id: str, lines) -> dict:
+    return {
+        "id": order_id,
+        "eater": {"first_name": random.choice(FIRST_NAMES), "last_name": random.choice(LAST_NAMES),
+                  "phone": {"number": "+593 99 %07d" % random.randint(0, 9999999)}},
+        "cart": {"items": [
+            {"external_data": str(item_id), "quantity": quantity,
+             "price": {"unit_price": {"amount": int(price * 100), "currency_code": "USD"}}}
+            for item_id, price, quantity in lines
+        ]},
+        "deliveries": [{"location": {"street_address": f"{random.choice(STREETS)} {random.randint(100, 999)}"}}],
+        "payment": {"type": "card", "delivery_fee": 199}
+    }
+
+
+def pedidos_ya_payload(order_id: str, lines) -> dict:
+    return {
+        "code": order_id,
+        "user": {"name": random.choice(FIRST_NAMES), "lastName": random.choice(LAST_NAMES)},
+        "details": [
+            {"product": {"integrationCode": str(item_id)}, "quantity": quantity, "unitPrice": price}
+            for item_id, price, quantity in lines
+        ],
+        "address": {"description": f"{random.choice(STREETS)} {random.randint(100, 999)}"},
+        "payment": {"type": random.choice(["cash", "online"])},
+        "shippingAmount": 1.5
+    }
+
+
+def bis_payload(order_id: str, lines) -> dict:
+    return {
+        "order_id": order_id,
+        "customer": {"name": f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}",
+                     "address": f"{random.choice(STREETS)} {random.randint(100, 999)}"},
+        "items": [{"sku": str(item_id), "qty": quantity, "price": price} for item_id, price, quantity in lines],
+        "payment_method": random.choice(["cash", "card"]),
+        "delivery_fee": 1.0
+    }
+
+
+PAYLOADS = {"uber_eats": uber_eats_payload, "pedidos_ya": pedidos_ya_payload, "bis": bis_payload}
+PLATFORM_SHARE = {"uber_eats": 0.45, "pedidos_ya": 0.4, "bis": 0.15}
+
+
+def prepare_database() -> list:
+    """Crea las tablas y, si hace falta, un usuario y un menú de prueba; devuelve (id, precio) del menú"""
+    from decimal import Decimal
+    from app.core.database import SessionLocal, create_tables
+    from app.models.users import User
+    from app.models.menu import MenuItem, MenuCategory
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.role == "owner").first():
+            db.add(User(username="simulador", email="simulador@delizzia.local", hashed_password="!",
+                        full_name="Simulador de plataformas", role="owner"))
+        if not db.query(MenuItem).filter(MenuItem.is_available == True).first():
+            category = MenuCategory(name="Pizzas")
+            db.add(category)
+            db.flush()
+            for name, price, prep in (("Margherita", 9, 12), ("Pepperoni", 11, 12), ("Cuatro quesos", 12, 14),
+                                      ("Hawaiana", 10, 12), ("Calzone", 11, 16), ("Tiramisú", 5, 3)):
+                db.add(MenuItem(name=name, category_id=category.id, price=Decimal(price),
+                                cost=Decimal(price) / 3, preparation_time=prep))
+        db.commit()
+        return [(item.id, float(item.price)) for item in db.query(MenuItem).filter(MenuItem.is_available == True)]
+    finally:
+        db.close()
+
+
+def make_orders(args, menu: list) -> list:
+    """(plataforma, cuerpo JSON) por ráfaga; los duplicados reenvían un pedido ya enviado"""
+    bursts, sent, sequence = [], [], 0
+    platforms, weights = zip(*PLATFORM_SHARE.items())
+    for _ in range(args.bursts):
+        burst = []
+        for _ in range(args.burst_size):
+            if sent and random.random() < args.duplicates:
+                burst.append(random.choice(sent))
+                continue
+            sequence += 1
+            platform = random.choices(platforms, weights)[0]
+            lines = [(item_id, price, random.randint(1, 2))
+                     for item_id, price in random.sample(menu, random.randint(1, min(3, len(menu))))]
+            body = json.dumps(PAYLOADS[platform](f"SIM-{platform[:2].upper()}-{sequence:06d}", lines)).encode()
+            burst.append((platform, body))
+            sent.append((platform, body))
+        bursts.append(burst)
+    return bursts
+
+
+def signature(platform: str, body: bytes) -> dict:
+    from app.core.config import settings
+    secret = settings.PLATFORM_WEBHOOK_SECRETS.get(platform)
+    if not secret:
+        return {}
+    return {"X-Webhook-Signature": hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()}
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+async def run(args) -> None:
+    import httpx
+    from app.main import app
+    from app.services.platform_ingestion import order_ingestion
+
+    menu = prepare_database()
+    bursts = make_orders(args, menu)
+    latencies, statuses = [], {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def send(client, platform: str, body: bytes) -> None:
+        async with semaphore:
+            headers = {"Content-Type": "application/json", **signature(platform, body)}
+            started = time.perf_counter()
+            response = await client.post(f"/api/platforms/webhooks/{platform}", content=body, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://simulador") as client:
+            started = time.perf_counter()
+            for index, burst in enumerate(bursts):
+                await asyncio.gather(*(send(client, platform, body) for platform, body in burst))
+                if index < len(bursts) - 1:
+                    await asyncio.sleep(args.pause)
+            sent_in = time.perf_counter() - started
+
+            # Esperar a que la cola se vacíe
+            while True:
+                stats = order_ingestion.stats()
+                done = stats["created"] + stats["duplicates"] + stats["rejected"]
+                if stats["queued"] == 0 and stats["waiting_retry"] == 0 and done >= stats["received"]:
+                    break
+                await asyncio.sleep(0.05)
+            drained_in = time.perf_counter() - started
+
+    total = sum(len(burst) for burst in bursts)
+    active = sent_in - args.pause * (len(bursts) - 1)
+    print(f"Webhooks enviados:      {total} en {len(bursts)} ráfagas ({args.duplicates:.0%} duplicados aprox.)")
+    print(f"Respuestas:             {dict(sorted(statuses.items()))}")
+    print(f"Throughput de ingreso:  {total / max(active, 1e-9):,.0f} webhooks/s (sin contar pausas)")
+    print(f"Confirmación (cliente): p50 {percentile(latencies, 0.5):.2f} ms · p99 {percentile(latencies, 0.99):.2f} ms")
+    print(f"Cola vaciada en:        {drained_in:.2f} s desde el primer webhook")
+    print()
+    print("Estadísticas de ingesta:")
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula ráfagas de webhooks de plataformas de delivery")
+    parser.add_argument("--bursts", type=int, default=5, help="Número de ráfagas")
+    parser.add_argument("--burst-size", type=int, default=200, help="Webhooks por ráfaga")
+    parser.add_argument("--pause", type=float, default=1.0, help="Segundos entre ráfagas")
+    parser.add_argument("--duplicates", type=float, default=0.05, help="Fracción de reintentos duplicados")
+    parser.add_argument("--concurrency", type=int, default=50, help="Webhooks en vuelo a la vez")
+    parser.add_argument("--database-url", help="Base de datos a usar (por defecto una SQLite temporal)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tempfile.mkdtemp()) / 'simulacion.db'}"
+    # Solo la ingesta: sin tareas programadas y aceptando webhooks sin firma si no hay secretos
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    os.environ.setdefault("ENVIRONMENT", "development")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from app.models import Staff, WorkSchedule
+from app.services.labor_analytics import LaborAnalyticsService
+
+
+def test_worked_hours_leave_out_the_scheduled_break(db):
+    cook = Staff(employee_number="E1", first_name="Ana", last_name="Rojas", position="cook",
+                 department="kitchen", hire_date=date(2024, 1, 1), hourly_rate=Decimal("10"))
+    db.add(cook)
+    db.flush()
+    # Planned 10:00-18:00 with a 14:00-15:00 break; punched 11:00-14:30
+    db.add(WorkSchedule(staff_id=cook.id, schedule_date=date(2024, 5, 6), start_time=time(10), end_time=time(18),
+                        break_start=time(14), break_end=time(15),
+                        actual_start_time=datetime(2024, 5, 6, 11), actual_end_time=datetime(2024, 5, 6, 14, 30)))
+    db.commit()
+
+    for basis in ("worked", "auto"):
+        metrics = LaborAnalyticsService.get_labor_metrics(db, date(2024, 5, 6), date(2024, 5, 6), basis=basis)
+        assert metrics["totals"]["labor_hours"] == 3.0
+        assert metrics["totals"]["labor_cost"] == 30.0
+
+    scheduled = LaborAnalyticsService.get_labor_metrics(db, date(2024, 5, 6), date(2024, 5, 6), basis="scheduled")
+    assert scheduled["totals"]["labor_hours"] == 7.0
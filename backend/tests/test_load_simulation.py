@@ -0,0 +1,44 @@
+from app.services.kitchen import KitchenService
+
+
+# Four ovens and 24 slot-minutes per order serve about 10 orders an hour
+RUSH = {"uber_eats": 14, "pedidos_ya": 10, "phone": 2}
+LEVELS = ["normal", "busy", "overloaded"]
+
+
+def simulate(seed: int = 7):
+    return KitchenService.simulate_load(RUSH, minutes=240, items_per_order=2.0, prep_minutes=12.0, seed=seed)
+
+
+def test_simulation_is_reproducible_with_a_seed():
+    assert simulate()["timeline"] == simulate()["timeline"]
+
+
+def test_rush_raises_level_and_pauses_platforms():
+    result = simulate()
+    levels = [minute["level"] for minute in result["timeline"]]
+
+    assert levels[0] == "normal"
+    assert "overloaded" in levels
+    # Escalates through busy, never jumping straight to overloaded
+    assert levels.index("busy") < levels.index("overloaded")
+
+    overloaded = [minute for minute in result["timeline"] if minute["level"] == "overloaded"]
+    assert all({"uber_eats", "pedidos_ya"} <= set(minute["paused_platforms"]) for minute in overloaded)
+    assert result["diverted"]["uber_eats"] > 0 and result["diverted"]["pedidos_ya"] > 0
+    # Phone orders are not pausable
+    assert result["diverted"]["phone"] == 0
+
+
+def test_level_steps_back_down_once_platforms_are_paused():
+    timeline = simulate()["timeline"]
+    first_overload = next(i for i, minute in enumerate(timeline) if minute["level"] == "overloaded")
+    later = [minute["level"] for minute in timeline[first_overload:]]
+
+    assert "busy" in later
+    # Hysteresis: no flapping between levels minute to minute
+    changes = sum(1 for before, after in zip(later, later[1:]) if before != after)
+    assert changes < len(later) / 10
+    # Automatic pauses lift once the kitchen is no longer overloaded
+    step_down = first_overload + later.index("busy")
+    assert any(not minute["paused_platforms"] for minute in timeline[step_down:])
@@ -0,0 +1,80 @@
+from decimal import Decimal
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import User, MenuCategory, MenuItem, Order, PlatformWebhook
+from app.services import platform_ingestion
+from app.services.platform_ingestion import OrderIngestionQueue
+from app.utils.platform_adapters import adapt_bis, adapt_uber_eats
+
+
+def bis_order(order_id, menu_item_id, **overrides):
+    return {
+        "order_id": order_id,
+        "customer": {"name": "Ana Rojas"},
+        "items": [{"sku": str(menu_item_id), "qty": 1, "price": 9}],
+        **overrides
+    }
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    # A file database, so the batch and its order-number transaction use separate connections
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingestion.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    monkeypatch.setattr(platform_ingestion, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def menu_item_id(session_factory):
+    db = session_factory()
+    db.add(User(username="owner", email="owner@example.com", hashed_password="x", full_name="Owner", role="owner"))
+    category = MenuCategory(name="Pizzas")
+    db.add(category)
+    db.flush()
+    item = MenuItem(name="Margherita", category_id=category.id, price=Decimal("9"), cost=Decimal("3"), preparation_time=12)
+    db.add(item)
+    db.commit()
+    item_id = item.id
+    db.close()
+    return item_id
+
+
+def test_adapters_turn_malformed_amounts_into_value_errors():
+    with pytest.raises(ValueError):
+        adapt_bis(bis_order("B1", 1, items=[{"sku": "1", "qty": 1, "price": "12,50"}]))
+    with pytest.raises(ValueError):
+        adapt_uber_eats({"id": "U1", "eater": "bob", "cart": {"items": []}})
+
+
+def test_poison_payload_does_not_hold_back_its_batch(session_factory, menu_item_id):
+    payloads = {
+        "G1": bis_order("G1", menu_item_id),
+        "B1": bis_order("B1", menu_item_id, items=[{"sku": str(menu_item_id), "qty": 1, "price": "12,50"}]),
+        "B2": bis_order("B2", menu_item_id, customer="bob")
+    }
+    db = session_factory()
+    rows = {
+        order_id: PlatformWebhook(platform="bis", platform_order_id=order_id, payload=payload, received_at=datetime.now())
+        for order_id, payload in payloads.items()
+    }
+    db.add_all(rows.values())
+    db.commit()
+    batch = [(rows[order_id].id, "bis", payload, None, 0) for order_id, payload in payloads.items()]
+
+    queue = OrderIngestionQueue(workers=1, max_batch=50, wait_ms=0, max_queue=100)
+    assert queue._commit_batch(batch) == []
+
+    db.expire_all()
+    statuses = dict(db.query(PlatformWebhook.platform_order_id, PlatformWebhook.status).all())
+    assert statuses == {"G1": "processed", "B1": "rejected", "B2": "rejected"}
+    assert db.query(Order.platform_order_id).all() == [("G1",)]
+    assert queue.created == 1 and queue.rejected == 2
+    db.close()
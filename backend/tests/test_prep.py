@@ -0,0 +1,26 @@
+from datetime import date
+
+from app.services.prep import PrepListService
+
+
+def test_prep_lists_are_cached_per_service_date(db, monkeypatch):
+    generated = []
+
+    def generate(db, service_date):
+        generated.append(service_date)
+        return {"service_date": service_date}
+
+    monkeypatch.setattr(PrepListService, "generate_prep_list", staticmethod(generate))
+    PrepListService.invalidate()
+
+    monday, tuesday = date(2024, 5, 6), date(2024, 5, 7)
+    assert PrepListService.get_prep_list(db, monday)["service_date"] == monday
+    assert PrepListService.get_prep_list(db, tuesday)["service_date"] == tuesday
+    # Looking up another date does not evict the first one
+    assert PrepListService.get_prep_list(db, monday)["service_date"] == monday
+    assert generated == [monday, tuesday]
+
+    PrepListService.invalidate()
+    PrepListService.get_prep_list(db, monday)
+    assert generated == [monday, tuesday, monday]
+    PrepListService.invalidate()
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+from app.api.purchases import read_purchase_orders
+from app.models import User, Supplier, InventoryItem, PurchaseOrder, PurchaseOrderItem
+from app.schemas.purchases import PurchaseOrder as PurchaseOrderSchema
+from app.services.purchases import PurchaseService
+
+
+@pytest.fixture
+def purchase_orders(db):
+    user = User(username="owner", email="owner@example.com", hashed_password="x", full_name="Owner", role="owner")
+    suppliers = [Supplier(name=f"Supplier {i}") for i in range(5)]
+    db.add(user)
+    db.add_all(suppliers)
+    db.flush()
+    items = [
+        InventoryItem(name=f"Item {i}", category="dry", unit="kg", cost_per_unit=Decimal("2"),
+                      primary_supplier_id=suppliers[i % 5].id)
+        for i in range(10)
+    ]
+    db.add_all(items)
+    db.flush()
+
+    now = datetime.now()
+    orders = []
+    for i in range(50):
+        order = PurchaseOrder(
+            purchase_number=f"PO{i:04d}", supplier_id=suppliers[i % 5].id, subtotal=Decimal("30"),
+            total_cost=Decimal("33.6"), order_date=now - timedelta(hours=i), created_by=user.id
+        )
+        db.add(order)
+        db.flush()
+        for item in items[i % 7:i % 7 + 3]:
+            db.add(PurchaseOrderItem(
+                purchase_order_id=order.id, inventory_item_id=item.id, quantity_ordered=Decimal("5"),
+                unit="kg", unit_cost=Decimal("2"), total_cost=Decimal("10")
+            ))
+        orders.append(order)
+    db.commit()
+    ids = [order.id for order in orders]
+    db.expunge_all()  # Nothing cached: every attribute must come from the counted queries
+    return ids
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+def detail_queries(engine, db, ids):
+    """Queries to load and serialize purchase orders with supplier and items"""
+    db.expunge_all()
+    with QueryCounter(engine) as counter:
+        orders = PurchaseService.get_purchase_orders(db, ids)
+        serialized = [PurchaseOrderSchema.model_validate(order) for order in orders]
+    assert len(serialized) == len(ids)
+    assert all(order.supplier is not None and len(order.items) == 3 for order in serialized)
+    return counter.count
+
+
+def list_queries(engine, db, limit):
+    db.expunge_all()
+    with QueryCounter(engine) as counter:
+        page = read_purchase_orders(skip=0, limit=limit, db=db, current_user=None)
+    assert len(page) == limit
+    return counter.count
+
+
+def test_purchase_order_details_take_fixed_queries(engine, db, purchase_orders):
+    one = detail_queries(engine, db, purchase_orders[:1])
+    fifty = detail_queries(engine, db, purchase_orders)
+    assert one == fifty == 2  # Orders joined with supplier, then items by SELECT ... IN
+
+
+def test_purchase_order_list_takes_fixed_queries(engine, db, purchase_orders):
+    assert list_queries(engine, db, 1) == list_queries(engine, db, 50) == 1
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+import pytest
+
+from app.models import InventoryItem, MenuCategory, MenuItem
+from app.services.recipes import RecipeService
+from app.utils.recipes import RecipeMatrix
+
+
+@pytest.fixture
+def kitchen(db):
+    tomato = InventoryItem(name="Tomato", category="vegetables", unit="kg", cost_per_unit=Decimal("2"))
+    basil = InventoryItem(name="Basil", category="vegetables", unit="kg", cost_per_unit=Decimal("0"))
+    flour = InventoryItem(name="Flour", category="dry", unit="kg", cost_per_unit=Decimal("1"))
+    db.add_all([tomato, basil, flour])
+    db.flush()
+    # Prepared items: sauce from tomatoes, and a pizza base from sauce and flour
+    sauce = InventoryItem(name="Sauce", category="prepared", unit="l", cost_per_unit=Decimal("1.5"),
+                          recipe=[{"ingredient_id": tomato.id, "quantity": 800, "unit": "g"}])
+    db.add(sauce)
+    db.flush()
+    base = InventoryItem(name="Base", category="prepared", unit="pieces", cost_per_unit=Decimal("0.5"),
+                         recipe=[{"ingredient_id": sauce.id, "quantity": 100, "unit": "ml"},
+                                 {"ingredient_id": flour.id, "quantity": 250, "unit": "g"}])
+    category = MenuCategory(name="Pizzas")
+    db.add_all([base, category])
+    db.flush()
+    marinara = MenuItem(name="Marinara", category_id=category.id, price=Decimal("8"), cost=Decimal("1"),
+                        recipe=[{"ingredient_id": base.id, "quantity": 1, "unit": "pieces"}])
+    margherita = MenuItem(name="Margherita", category_id=category.id, price=Decimal("9"), cost=Decimal("3.2"),
+                          recipe=[{"ingredient_id": base.id, "quantity": 1, "unit": "pieces"},
+                                  {"ingredient_id": basil.id, "quantity": 10, "unit": "g"}])
+    db.add_all([marinara, margherita])
+    db.commit()
+    return {"tomato": tomato, "sauce": sauce, "base": base, "marinara": marinara, "margherita": margherita}
+
+
+def test_raw_ingredient_cost_flows_through_prepared_items(db, kitchen):
+    kitchen["tomato"].cost_per_unit = Decimal("3")
+    db.commit()
+
+    updated = RecipeService.recalculate_menu_costs(db, [kitchen["tomato"].id])
+    db.commit()
+    db.expire_all()
+
+    assert kitchen["sauce"].cost_per_unit == Decimal("2.4")  # 0.8 kg x 3
+    assert kitchen["base"].cost_per_unit == Decimal("0.49")  # 0.1 l x 2.4 + 0.25 kg x 1
+    assert updated == [kitchen["marinara"].id]
+    assert kitchen["marinara"].cost == Decimal("0.49")
+
+
+def test_menu_item_with_uncosted_ingredient_keeps_its_cost(db, kitchen):
+    RecipeService.recalculate_menu_costs(db, [kitchen["tomato"].id])
+    db.commit()
+    db.expire_all()
+
+    # Basil has no cost, so a recipe figure would be too low
+    assert kitchen["margherita"].cost == Decimal("3.2")
+
+
+def test_recipe_matrix_drops_every_ingredient_when_inventory_is_empty():
+    recipes = [(1, [{"ingredient_id": 7, "quantity": 200, "unit": "g"}])]
+
+    assert RecipeMatrix.from_recipes(recipes, {}).ingredient_ids == []
+    assert RecipeMatrix.from_recipes(recipes).ingredient_ids == [7]
@@ -0,0 +1,24 @@
+from datetime import date, datetime, time
+
+from app.models import Staff, WorkSchedule
+from app.services.time_clock import TimeClockService
+
+
+def test_worked_minutes_leave_out_the_scheduled_break(db):
+    cook = Staff(employee_number="E1", first_name="Ana", last_name="Rojas", position="cook",
+                 department="kitchen", hire_date=date(2024, 1, 1))
+    db.add(cook)
+    db.flush()
+    db.add(WorkSchedule(staff_id=cook.id, schedule_date=date(2024, 5, 6), start_time=time(10), end_time=time(18),
+                        break_start=time(14), break_end=time(15)))
+    db.commit()
+
+    # Clocked out halfway through the break: only its first half is unpaid
+    results = TimeClockService.record_punches(db, [
+        {"staff_id": cook.id, "punch_type": "in", "punched_at": datetime(2024, 5, 6, 10), "idempotency_key": "in-1"},
+        {"staff_id": cook.id, "punch_type": "out", "punched_at": datetime(2024, 5, 6, 14, 30), "idempotency_key": "out-1"}
+    ])
+    db.commit()
+
+    assert [result["status"] for result in results] == ["recorded", "recorded"]
+    assert results[1]["worked_minutes"] == 240